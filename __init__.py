@@ -4,7 +4,14 @@ A tool for visualizing and comparing different sorting algorithms in real-time.
 """
 
 from .algorithms import AlgorithmRegistry, initialize_algorithms
-from .ui import MainWindow
 
 __version__ = '1.0.0'
-__all__ = ['AlgorithmRegistry', 'initialize_algorithms', 'MainWindow']
\ No newline at end of file
+__all__ = ['AlgorithmRegistry', 'initialize_algorithms', 'MainWindow']
+
+def __getattr__(name):
+    # The UI pulls in PyQt6 and matplotlib, so headless users such as the
+    # benchmark runner only pay for it when MainWindow is actually requested
+    if name == 'MainWindow':
+        from .ui import MainWindow
+        return MainWindow
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
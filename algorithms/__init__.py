@@ -1,16 +1,90 @@
-from .base import SortingAlgorithm, AlgorithmRegistry
-from .implementations import (
-    bubble_sort,
-    insertion_sort,
-    selection_sort,
-    initialize_algorithms
+import importlib
+
+from . import tracing
+from .base import SortingAlgorithm, AlgorithmRegistry, load_function
+from .steps import (
+    StepEvent,
+    ArrayState,
+    StepRunner,
+    RunResult,
+    iter_events,
+    run_to_completion,
+    swap,
+    write,
+    compare,
+    worker
 )
+from .distributions import DISTRIBUTIONS, generate, generate_array
+from .reference import Verification, reference_sort, verify_sorted
+from .tracking import AccessCounter, AccessCounts, TrackedArray
+from .custom import CustomAlgorithm
+from .store import AlgorithmStore, StoredAlgorithm
+from .sandbox import SandboxPool, SandboxLimits, SandboxError
+from .shared_array import SharedArray, SharedArrayWorker, play_shared
+from .trace import Trace, TraceCursor, record_trace
+from .trace_file import TraceWriter, MappedTrace, write_trace_file, record_trace_file
+from .catalog import ENTRY_POINT_GROUP, initialize_algorithms, register_plugins
 
 __all__ = [
     'SortingAlgorithm',
     'AlgorithmRegistry',
+    'load_function',
+    'StepEvent',
+    'ArrayState',
+    'StepRunner',
+    'RunResult',
+    'iter_events',
+    'run_to_completion',
+    'swap',
+    'write',
+    'compare',
+    'worker',
+    'DISTRIBUTIONS',
+    'generate',
+    'generate_array',
+    'Verification',
+    'reference_sort',
+    'verify_sorted',
+    'AccessCounter',
+    'AccessCounts',
+    'TrackedArray',
+    'CustomAlgorithm',
+    'AlgorithmStore',
+    'StoredAlgorithm',
+    'SandboxPool',
+    'SandboxLimits',
+    'SandboxError',
+    'SharedArray',
+    'SharedArrayWorker',
+    'play_shared',
+    'sort_file',
+    'Trace',
+    'TraceCursor',
+    'record_trace',
+    'TraceWriter',
+    'MappedTrace',
+    'write_trace_file',
+    'record_trace_file',
     'bubble_sort',
     'insertion_sort',
     'selection_sort',
-    'initialize_algorithms'
-]
\ No newline at end of file
+    'ENTRY_POINT_GROUP',
+    'initialize_algorithms',
+    'register_plugins',
+    'tracing'
+]
+
+# Modules holding algorithms are only imported when something from them is used
+_LAZY_EXPORTS = {
+    'bubble_sort': 'implementations',
+    'insertion_sort': 'implementations',
+    'selection_sort': 'implementations',
+    'sort_file': 'external',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(f'.{_LAZY_EXPORTS[name]}', __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,20 +1,82 @@
-from typing import List
+import importlib
+from typing import Callable, Iterable, List, Optional, Union
+
+import numpy as np
+
+from .reference import reference_sort
+from .steps import RunResult, run_to_completion
+from .tracking import AccessCounter
+
+
+def load_function(target: str) -> Callable:
+    """Import the function a "module:function" reference points to"""
+    module_name, _, attribute = target.partition(':')
+    if not attribute:
+        raise ValueError(f"Expected 'module:function', got {target!r}")
+    value = importlib.import_module(module_name)
+    for part in attribute.split('.'):
+        value = getattr(value, part)
+    return value
+
 
 class SortingAlgorithm:
     """Base class for sorting algorithms"""
-    def __init__(self, name: str, function: callable, complexity: str):
+    def __init__(self, name: str, function: Union[Callable, str], complexity: Optional[str],
+                 reference: Optional[str] = None):
         self.name = name
-        self.function = function
-        self.complexity = complexity
+        # A "module:function" reference is only imported when first needed
+        self._function = function
+        # None takes the label from the function's `complexity` attribute once loaded
+        self._complexity = complexity
+        # np.sort kind of the algorithm's native-speed counterpart
+        self.reference = reference
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the algorithm's function has been imported"""
+        return not isinstance(self._function, str)
+
+    @property
+    def function(self) -> Callable:
+        if isinstance(self._function, str):
+            self._function = load_function(self._function)
+        return self._function
+
+    @property
+    def complexity(self) -> str:
+        if self._complexity is None:
+            self._complexity = getattr(self.function, 'complexity', "Unknown complexity")
+        return self._complexity
+
+    def run(self, data: Iterable[int], counter: Optional[AccessCounter] = None) -> RunResult:
+        """Run the algorithm to completion without visualizing intermediate states"""
+        return run_to_completion(self.function, data, counter)
+
+    def run_reference(self, data: Iterable[int]) -> np.ndarray:
+        """Sort with the algorithm's NumPy counterpart"""
+        if self.reference is None:
+            raise ValueError(f"{self.name} has no reference sort")
+        return reference_sort(data, self.reference)
 
 class AlgorithmRegistry:
     """Registry to manage all available sorting algorithms"""
     def __init__(self):
         self._algorithms = {}
 
-    def register(self, name: str, function: callable, complexity: str) -> None:
-        """Register a new sorting algorithm"""
-        self._algorithms[name] = SortingAlgorithm(name, function, complexity)
+    def register(self, name: str, function: Union[Callable, str], complexity: Optional[str],
+                 reference: Optional[str] = None) -> None:
+        """
+        Register a new sorting algorithm.
+
+        Args:
+            name: Name shown in the GUI and accepted by the benchmark runner
+            function: Generator function, or a "module:function" reference to
+                import on first use
+            complexity: Time complexity label, or None to take it from the
+                function's `complexity` attribute
+            reference: np.sort kind of the algorithm's native counterpart
+        """
+        self._algorithms[name] = SortingAlgorithm(name, function, complexity, reference)
 
     def get_algorithm(self, name: str) -> SortingAlgorithm:
         """Get a sorting algorithm by name"""
@@ -24,5 +86,8 @@ class AlgorithmRegistry:
         """Get list of all registered algorithm names"""
         return list(self._algorithms.keys())
 
+    def __contains__(self, name: str) -> bool:
+        return name in self._algorithms
+
     def __getitem__(self, name: str) -> SortingAlgorithm:
-        return self._algorithms[name]
\ No newline at end of file
+        return self._algorithms[name]
@@ -0,0 +1,94 @@
+"""
+Catalog of the algorithms registered at startup.
+
+Algorithms are registered by reference, as "module:function" strings, so
+filling the registry imports none of them: each module is imported the first
+time one of its algorithms is run. Besides the built-ins listed here,
+installed packages can contribute algorithms through the
+``sorting_visualizer.algorithms`` entry point group:
+
+    # pyproject.toml of a plugin package
+    [project.entry-points."sorting_visualizer.algorithms"]
+    "Gnome Sort" = "gnome_sort.sorts:gnome_sort"
+
+The entry point's name is shown in the GUI; a ``complexity`` attribute on
+the function, if any, is used as its complexity label once it is loaded.
+"""
+
+import logging
+from typing import List
+
+from .base import AlgorithmRegistry
+
+logger = logging.getLogger(__name__)
+
+ENTRY_POINT_GROUP = 'sorting_visualizer.algorithms'
+
+_IMPLEMENTATIONS = f'{__package__}.implementations'
+_PARALLEL = f'{__package__}.parallel'
+_EXTERNAL = f'{__package__}.external'
+
+# Each algorithm's NumPy counterpart: the same kind of sort where NumPy has
+# one, heap sort for selection sort, the stable sort (radix sort or Timsort
+# inside NumPy) for stable ones and introsort for the other quick sorts
+BUILTIN_ALGORITHMS = [
+    ("Bubble Sort", f"{_IMPLEMENTATIONS}:bubble_sort", "O(n²)", "stable"),
+    ("Insertion Sort", f"{_IMPLEMENTATIONS}:insertion_sort", "O(n²) worst/avg, O(n) best", "stable"),
+    ("Selection Sort", f"{_IMPLEMENTATIONS}:selection_sort", "O(n²)", "heapsort"),
+    ("Quick Sort", f"{_IMPLEMENTATIONS}:quick_sort", "O(n log n)", "quicksort"),
+    ("Merge Sort", f"{_IMPLEMENTATIONS}:merge_sort", "O(n log n)", "mergesort"),
+    ("Heap Sort", f"{_IMPLEMENTATIONS}:heap_sort", "O(n log n)", "heapsort"),
+    ("LSD Radix Sort", f"{_IMPLEMENTATIONS}:lsd_radix_sort", "O(d(n + b)), b = 256", "stable"),
+    ("MSD Radix Sort", f"{_IMPLEMENTATIONS}:msd_radix_sort", "O(d(n + b)), b = 256", "stable"),
+    ("Counting Sort", f"{_IMPLEMENTATIONS}:counting_sort", "O(n + k)", "stable"),
+    ("Bucket Sort", f"{_IMPLEMENTATIONS}:bucket_sort", "O(n + k) avg, O(n²) worst", "stable"),
+    ("Shell Sort (Ciura)", f"{_IMPLEMENTATIONS}:shell_sort", "≈O(n^1.3) empirical", "quicksort"),
+    ("Timsort", f"{_IMPLEMENTATIONS}:timsort", "O(n log n), O(n) best", "stable"),
+    ("Introsort", f"{_IMPLEMENTATIONS}:introsort", "O(n log n)", "quicksort"),
+    ("Pdqsort", f"{_IMPLEMENTATIONS}:pdqsort", "O(n log n), O(n) best", "quicksort"),
+    ("Parallel Merge Sort", f"{_PARALLEL}:parallel_merge_sort",
+     "O(n log n), O(n log n / p) per worker", "mergesort"),
+    ("Parallel Sample Sort", f"{_PARALLEL}:parallel_sample_sort",
+     "O(n log n), O(n log n / p) per worker", "stable"),
+    ("External Merge Sort", f"{_EXTERNAL}:external_merge_sort",
+     "O(n log n), O(log_k r) passes", "mergesort"),
+]
+
+
+def _entry_points():
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:  # Python < 3.8 has no importlib.metadata
+        return []
+    try:
+        return entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # Python < 3.10 returns a dict of all groups
+        return entry_points().get(ENTRY_POINT_GROUP, [])
+
+
+def register_plugins(registry: AlgorithmRegistry) -> List[str]:
+    """
+    Register the algorithms of installed plugin packages, without importing them.
+
+    Plugins cannot replace an algorithm that is already registered.
+
+    Returns:
+        List[str]: Names of the algorithms registered
+    """
+    names = []
+    for entry_point in _entry_points():
+        if entry_point.name in registry:
+            logger.warning("Ignoring plugin algorithm %r from %s: the name is taken",
+                           entry_point.name, entry_point.value)
+            continue
+        registry.register(entry_point.name, entry_point.value, None)
+        names.append(entry_point.name)
+    return names
+
+
+def initialize_algorithms(registry: AlgorithmRegistry, plugins: bool = True) -> None:
+    """Register all sorting algorithms, and those of installed plugins unless plugins is False"""
+    for name, target, complexity, reference in BUILTIN_ALGORITHMS:
+        registry.register(name, target, complexity, reference)
+    if plugins:
+        register_plugins(registry)
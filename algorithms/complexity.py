@@ -0,0 +1,217 @@
+"""
+Empirical time complexity estimation.
+
+Runs a sorting algorithm on random inputs of geometrically growing size and
+fits the measured operation counts and timings against candidate growth
+curves. Kept free of GUI imports so it can run inside sandbox workers.
+"""
+
+import ast
+import math
+import random
+import time
+from typing import Callable, Dict, List, NamedTuple
+
+from .custom import CustomAlgorithm
+from .tracking import AccessCounter, instrument
+
+# Growth curves the measurements are fitted against
+CANDIDATES: Dict[str, Callable[[int], float]] = {
+    "O(n)": lambda n: n,
+    "O(n log n)": lambda n: n * math.log2(n),
+    "O(n²)": lambda n: n ** 2,
+    "O(n³)": lambda n: n ** 3,
+}
+
+
+class Fit(NamedTuple):
+    """Least squares fit of measurements against one growth curve"""
+    label: str
+    coefficient: float
+    error: float  # RMS relative residual
+
+
+class ComplexityEstimate(NamedTuple):
+    """Result of an empirical complexity analysis"""
+    label: str
+    confidence: float
+    sizes: List[int]
+    operations: List[int]
+    timings: List[float]
+    operation_fits: List[Fit]
+    time_fits: List[Fit]
+
+    def format(self) -> str:
+        return f"{self.label} ({self.confidence:.0%} confidence)"
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+def fit_growth(sizes: List[int], values: List[float]) -> List[Fit]:
+    """
+    Fit values ≈ c·f(n) for every candidate curve f, best fit first.
+
+    Residuals are weighted by 1/value so small and large sizes count equally.
+    """
+    fits = []
+    for label, curve in CANDIDATES.items():
+        # Weighted least squares through the origin: minimize Σ((y - c·f) / y)²
+        ratios = [curve(n) / y for n, y in zip(sizes, values)]
+        coefficient = sum(ratios) / sum(r * r for r in ratios)
+        error = math.sqrt(sum((1 - coefficient * r) ** 2 for r in ratios) / len(ratios))
+        fits.append(Fit(label, coefficient, error))
+    return sorted(fits, key=lambda fit: fit.error)
+
+
+def fit_confidence(fits: List[Fit], points: int) -> float:
+    """How clearly the best fit beats the runner-up, scaled down for few sizes"""
+    best, runner_up = fits[0], fits[1]
+    if runner_up.error == 0:
+        return 0.0
+    separation = 1 - best.error / runner_up.error
+    return separation * min(points / 6, 1.0)
+
+
+class ComplexityAnalyzer:
+    """
+    Estimates an algorithm's time complexity by running it.
+
+    The algorithm is run headlessly on random inputs of geometrically growing
+    size. Operation counts (comparisons and writes on an instrumented array)
+    and wall times are each fitted against the candidate growth curves, and
+    the curve with the smallest relative error is reported. Algorithms that
+    only work on a real list are fitted on their timings alone. Every run is
+    bounded by a shared time budget, so slow algorithms only limit how large
+    the measured sizes get.
+    """
+
+    def __init__(self, time_budget: float = 2.0, min_size: int = 16, max_size: int = 8192,
+                 growth: int = 2, seed: int = 0):
+        """
+        Args:
+            time_budget: Seconds the whole analysis may take
+            min_size: First input size
+            max_size: Largest input size
+            growth: Ratio between consecutive sizes
+            seed: Seed for the random inputs
+        """
+        self.time_budget = time_budget
+        self.min_size = min_size
+        self.max_size = max_size
+        self.growth = growth
+        self.seed = seed
+
+    def estimate_complexity(self, function: Callable) -> ComplexityEstimate:
+        """Measure a sorting algorithm generator function and fit its growth"""
+        deadline = time.perf_counter() + self.time_budget
+        rng = random.Random(self.seed)
+        sizes, operations, timings = [], [], []
+        # Cleared when the algorithm cannot run on an instrumented array
+        counted = True
+
+        n = self.min_size
+        while n <= self.max_size:
+            # Skip sizes that would not finish in the remaining budget, assuming
+            # the run time keeps growing as it did between the last two sizes
+            if len(timings) >= 2:
+                predicted = timings[-1] * max(timings[-1] / max(timings[-2], 1e-9), self.growth)
+                if time.perf_counter() + 2 * predicted > deadline:
+                    break
+            data = [rng.randint(1, max(n, 100)) for _ in range(n)]
+            try:
+                if counted:
+                    try:
+                        operations.append(max(self._count_operations(function, data, deadline), 1))
+                    except (AttributeError, TypeError):
+                        # Uses something a TrackedArray lacks, such as storing
+                        # floats; the timed run still tells a real error apart
+                        counted = False
+                        operations.clear()
+                timing = self._time(function, data, deadline)
+            except _OutOfTime:
+                if len(operations) > len(sizes):
+                    operations.pop()
+                break
+            sizes.append(n)
+            timings.append(max(timing, 1e-9))
+            n *= self.growth
+
+        if len(sizes) < 3:
+            return ComplexityEstimate("O(?)", 0.0, sizes, operations, timings, [], [])
+
+        time_fits = fit_growth(sizes, timings)
+        if not counted:
+            return ComplexityEstimate(time_fits[0].label, fit_confidence(time_fits, len(sizes)),
+                                      sizes, operations, timings, [], time_fits)
+        operation_fits = fit_growth(sizes, operations)
+        confidence = fit_confidence(operation_fits, len(sizes))
+        # Operation counts are exact; timings only corroborate them
+        if time_fits[0].label != operation_fits[0].label:
+            confidence *= 0.5
+        return ComplexityEstimate(operation_fits[0].label, confidence, sizes,
+                                  operations, timings, operation_fits, time_fits)
+
+    @staticmethod
+    def _consume(generator, deadline: float) -> None:
+        for _ in generator:
+            if time.perf_counter() > deadline:
+                generator.close()
+                raise _OutOfTime()
+
+    def _count_operations(self, function: Callable, data: List[int], deadline: float) -> int:
+        """Comparisons plus writes of one instrumented run"""
+        counter = AccessCounter()
+        self._consume(function(instrument(data, counter)), deadline)
+        # Reads are left out: copies made for snapshots would dominate them
+        return counter.comparisons + counter.writes
+
+    def _time(self, function: Callable, data: List[int], deadline: float) -> float:
+        """Wall time of one uninstrumented run"""
+        start = time.perf_counter()
+        self._consume(function(list(data)), deadline)
+        return time.perf_counter() - start
+
+
+def _loop_depth(node: ast.AST) -> int:
+    """Deepest nesting of loops and comprehensions below a node"""
+    deepest = 0
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        depth = _loop_depth(child)
+        if isinstance(child, (ast.For, ast.AsyncFor, ast.While, ast.comprehension)):
+            depth += 1
+        deepest = max(deepest, depth)
+    return deepest
+
+
+def static_estimate(code: str) -> str:
+    """
+    Rough complexity label read from the source without running it.
+
+    Every loop of the first function is assumed to run over the input, so
+    the label follows the deepest loop nesting, with a log n factor for
+    functions that call themselves. Cheap enough to run on every edit, and
+    only a first guess until the empirical analysis finishes.
+
+    Raises:
+        SyntaxError: If the code cannot be parsed
+    """
+    function = next((node for node in ast.parse(code).body
+                     if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef))), None)
+    if function is None:
+        return "O(?)"
+    depth = max(_loop_depth(function), 1)
+    recursive = any(isinstance(node, ast.Call) and isinstance(node.func, ast.Name)
+                    and node.func.id == function.name for node in ast.walk(function))
+    label = "n" if depth == 1 else "n²" if depth == 2 else "n³" if depth == 3 else f"n^{depth}"
+    if recursive:
+        label += " log n"
+    return f"O({label})"
+
+
+def analyze_code(code: str, time_budget: float = 2.0) -> ComplexityEstimate:
+    """Estimate the complexity of custom algorithm source code"""
+    return ComplexityAnalyzer(time_budget).estimate_complexity(CustomAlgorithm(code))
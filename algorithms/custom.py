@@ -0,0 +1,91 @@
+"""
+User-supplied sorting algorithms defined by source code.
+
+A CustomAlgorithm carries only its source, and optionally the marshalled
+code object compiled from it, so it can be sent to a sandbox worker process
+and run there; the GUI process never executes it.
+"""
+
+import ast
+import inspect
+import marshal
+from typing import Callable, Optional
+
+from . import tracing
+from .steps import swap, write, compare
+
+# Helpers available to custom algorithm code
+STEP_HELPERS = {'swap': swap, 'write': write, 'compare': compare}
+
+
+def find_algorithm_name(code: str) -> Optional[str]:
+    """
+    Name of the first top-level function in the code, found without running it.
+
+    Raises:
+        SyntaxError: If the code cannot be parsed
+    """
+    for node in ast.parse(code).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            return node.name
+    return None
+
+
+@tracing.traced("compile custom algorithm")
+def compile_code(code: str) -> bytes:
+    """
+    Compile custom algorithm code, without running it, into a marshalled code object.
+
+    Raises:
+        SyntaxError: If the code cannot be parsed
+    """
+    return marshal.dumps(compile(code, "<custom algorithm>", "exec"))
+
+
+@tracing.traced("load custom algorithm")
+def compile_algorithm(code: str, compiled: Optional[bytes] = None) -> Optional[Callable]:
+    """
+    Execute custom algorithm code and return the first function it defines.
+
+    Args:
+        code: Source of the algorithm
+        compiled: Marshalled code object of the source, made by the running
+            Python version, to skip compiling it again
+
+    Raises:
+        SyntaxError: If the code cannot be parsed
+    """
+    namespace = dict(STEP_HELPERS)
+    if compiled is not None:
+        exec(marshal.loads(compiled), namespace)
+    else:
+        exec(compile(code, "<custom algorithm>", "exec"), namespace)
+    for name, obj in namespace.items():
+        if inspect.isfunction(obj) and obj is not STEP_HELPERS.get(name):
+            return obj
+    return None
+
+
+class CustomAlgorithm:
+    """Sorting algorithm generator compiled lazily from source code"""
+
+    def __init__(self, code: str, compiled: Optional[bytes] = None):
+        self.code = code
+        self.compiled = compiled
+        self._function: Optional[Callable] = None
+
+    def __call__(self, arr):
+        if self._function is None:
+            self._function = compile_algorithm(self.code, self.compiled)
+            if self._function is None:
+                raise ValueError("No function found in the code")
+        return self._function(arr)
+
+    def __getstate__(self):
+        # Only the source and code object travel; each process builds its own function
+        return {'code': self.code, 'compiled': self.compiled}
+
+    def __setstate__(self, state):
+        self.code = state['code']
+        self.compiled = state.get('compiled')
+        self._function = None
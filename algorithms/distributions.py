@@ -0,0 +1,130 @@
+"""
+Seeded input distributions for the visualizer and the benchmark runner.
+
+Every distribution is generated with vectorized NumPy operations from a
+``numpy.random.Generator``, so the same (distribution, size, seed) always
+gives the same array and 10^7 elements take a fraction of a second. Values lie in
+1..max(size, 100): small arrays keep readable bar heights and large ones are
+not dominated by duplicates.
+"""
+
+from typing import Callable, Dict, List
+
+import numpy as np
+
+# Smallest upper bound of the values, so short arrays still vary visibly
+MIN_VALUE_RANGE = 100
+
+
+def _high(size: int) -> int:
+    return max(size, MIN_VALUE_RANGE)
+
+
+def uniform_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Uniformly random values"""
+    return rng.integers(1, _high(size) + 1, size, dtype=np.int64)
+
+
+def gaussian_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Normally distributed values around the middle of the range"""
+    high = _high(size)
+    values = np.rint(rng.normal(high / 2, high / 6, size))
+    return np.clip(values, 1, high).astype(np.int64)
+
+
+def sorted_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Already sorted values; the worst case of the last-element pivot quick sort"""
+    return np.sort(uniform_values(size, rng))
+
+
+def reversed_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Values sorted in descending order"""
+    return sorted_values(size, rng)[::-1].copy()
+
+
+def nearly_sorted_values(size: int, rng: np.random.Generator, swaps: int = None) -> np.ndarray:
+    """
+    Sorted values with k random swaps.
+
+    Args:
+        swaps: Number of swaps, by default one per 20 elements and at least one
+    """
+    values = sorted_values(size, rng)
+    swaps = min(max(size // 20, 1) if swaps is None else swaps, size // 2)
+    # Distinct indices, so the swaps never overlap and the result stays a permutation
+    pairs = rng.choice(size, 2 * swaps, replace=False).reshape(2, swaps)
+    values[pairs[0]], values[pairs[1]] = values[pairs[1]], values[pairs[0]].copy()
+    return values
+
+
+def organ_pipe_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Ascending to a peak in the middle, then descending"""
+    values = sorted_values(size, rng)
+    return np.concatenate([values[0::2], values[1::2][::-1]])
+
+
+def sawtooth_values(size: int, rng: np.random.Generator, teeth: int = 4) -> np.ndarray:
+    """Several ascending runs, each starting over from the bottom of the range"""
+    tooth = max(-(-size // teeth), 1)
+    return (np.arange(size, dtype=np.int64) % tooth) * _high(size) // tooth + 1
+
+
+def few_unique_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """Random values drawn from a handful of distinct keys"""
+    keys = rng.integers(1, _high(size) + 1, 4, dtype=np.int64)
+    return rng.choice(keys, size)
+
+
+def all_equal_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """The same value everywhere"""
+    return np.full(size, _high(size) // 2, dtype=np.int64)
+
+
+def median_of_3_killer_values(size: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    Musser's median-of-3 killer: a permutation of 1..size on which quick sort
+    with a median of first, middle and last pivot partitions off only two
+    elements per level and takes quadratic time.
+    """
+    # The construction needs half the length to be even; the rest are appended
+    m = size - size % 4
+    k = m // 2
+    i = np.arange(1, k + 1, dtype=np.int64)
+    first = np.where(i % 2 == 1, i, k + i - 1)
+    return np.concatenate([first, 2 * i, np.arange(m + 1, size + 1, dtype=np.int64)])
+
+
+DISTRIBUTIONS: Dict[str, Callable[[int, np.random.Generator], np.ndarray]] = {
+    'uniform': uniform_values,
+    'gaussian': gaussian_values,
+    'sorted': sorted_values,
+    'reversed': reversed_values,
+    'nearly-sorted': nearly_sorted_values,
+    'organ-pipe': organ_pipe_values,
+    'sawtooth': sawtooth_values,
+    'few-unique': few_unique_values,
+    'all-equal': all_equal_values,
+    'median-of-3-killer': median_of_3_killer_values,
+}
+
+
+def generate_array(distribution: str, size: int, seed: int) -> np.ndarray:
+    """
+    Generate an input reproducibly.
+
+    Args:
+        distribution: Name of a distribution in DISTRIBUTIONS
+        size: Number of elements
+        seed: Seed for numpy.random.default_rng
+
+    Returns:
+        np.ndarray: int64 array of the values
+    """
+    if distribution not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    return DISTRIBUTIONS[distribution](size, np.random.default_rng(seed))
+
+
+def generate(distribution: str, size: int, seed: int) -> List[int]:
+    """Generate an input reproducibly as a list, as the sorting algorithms take it"""
+    return generate_array(distribution, size, seed).tolist()
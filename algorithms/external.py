@@ -0,0 +1,161 @@
+"""
+External merge sort.
+
+Data that does not fit in memory is sorted in two phases: run formation
+reads it in chunks of run_size elements, sorts each chunk in memory and
+spills it to a temporary file as a sorted run; merge passes then stream up
+to fan_in runs at a time through a heap into one longer run, until a single
+run is left. Runs are stored as raw int64 and read back in blocks, so memory
+use is bounded by run_size plus one block per merged run.
+
+``sort_file`` applies this to binary int64 files of any size.
+``external_merge_sort`` is the visualizable version: it treats the array as
+the data on disk, spilling real run files, and shows each run being formed
+and each merge pass writing its output back over the runs it consumed.
+"""
+
+import contextlib
+import heapq
+import os
+import tempfile
+from array import array
+from typing import Generator, Iterable, Iterator, List, Optional
+
+from .implementations import merge_sort
+from .steps import StepEvent, write, offset_events
+
+# Elements sorted in memory per run by sort_file (8 MiB of int64)
+RUN_SIZE = 1 << 20
+
+# Runs merged at once in each merge pass
+FAN_IN = 16
+
+# Elements read from a run file at a time
+BLOCK_SIZE = 1 << 13
+
+# Runs and fan-in of the visualized sort, small enough to show several passes
+VISUAL_RUNS = 8
+VISUAL_FAN_IN = 4
+
+
+def _spill(values: Iterable[int], directory: str) -> str:
+    """Write a run to a new file in directory and return its path"""
+    handle, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with os.fdopen(handle, 'wb') as stream:
+        buffer = array('q')
+        for value in values:
+            buffer.append(value)
+            if len(buffer) >= BLOCK_SIZE:
+                buffer.tofile(stream)
+                del buffer[:]
+        buffer.tofile(stream)
+    return path
+
+
+def _read_run(path: str) -> Iterator[int]:
+    """Stream the values of a run file, one block in memory at a time"""
+    with open(path, 'rb') as stream:
+        while True:
+            block = array('q')
+            try:
+                block.fromfile(stream, BLOCK_SIZE)
+            except EOFError:
+                # Short final block: fromfile keeps what it could read
+                pass
+            if not block:
+                return
+            yield from block
+
+
+def _merge_runs(paths: List[str]) -> Iterator[int]:
+    """k-way merge of run files through a heap, deleting each file once merged"""
+    try:
+        yield from heapq.merge(*(_read_run(path) for path in paths))
+    finally:
+        # Closed early, the generator may only be finalized after the
+        # temporary directory holding the runs is gone
+        for path in paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+
+def sort_file(input_path: str, output_path: str, run_size: int = RUN_SIZE,
+              fan_in: int = FAN_IN, temp_dir: Optional[str] = None) -> int:
+    """
+    Sort a file of native-endian int64 values that may not fit in memory.
+
+    Args:
+        input_path: File to sort
+        output_path: File to write the sorted values to
+        run_size: Elements sorted in memory per run
+        fan_in: Runs merged at once per merge pass
+        temp_dir: Directory for the run files (default: the system's)
+
+    Returns:
+        int: Number of values sorted
+    """
+    count = 0
+    with tempfile.TemporaryDirectory(dir=temp_dir) as directory:
+        runs = []
+        with open(input_path, 'rb') as stream:
+            while True:
+                chunk = array('q')
+                try:
+                    chunk.fromfile(stream, run_size)
+                except EOFError:
+                    pass
+                if not chunk:
+                    break
+                count += len(chunk)
+                runs.append(_spill(sorted(chunk), directory))
+
+        while len(runs) > fan_in:
+            runs = [_spill(_merge_runs(runs[k:k + fan_in]), directory)
+                    for k in range(0, len(runs), fan_in)]
+
+        with open(output_path, 'wb') as stream:
+            buffer = array('q')
+            for value in _merge_runs(runs):
+                buffer.append(value)
+                if len(buffer) >= BLOCK_SIZE:
+                    buffer.tofile(stream)
+                    del buffer[:]
+            buffer.tofile(stream)
+    return count
+
+
+def external_merge_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    External merge sort with the array standing in for the data on disk.
+
+    The array is cut into VISUAL_RUNS runs that are merge sorted in memory
+    and spilled to temporary files. Each merge pass then merges groups of
+    VISUAL_FAN_IN neighbouring runs from their files, writing the output over
+    the part of the array the group covers, until one run spans the array.
+    """
+    arr = arr.copy()
+    n = len(arr)
+    run_size = max(-(-n // VISUAL_RUNS), 1)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Run formation: (start, end, path) of every sorted run
+        runs = []
+        for start in range(0, n, run_size):
+            end = min(start + run_size, n)
+            arr[start:end] = yield from offset_events(merge_sort(arr[start:end]), start)
+            runs.append((start, end, _spill(arr[start:end], directory)))
+
+        # Merge passes
+        while len(runs) > 1:
+            merged_runs = []
+            for k in range(0, len(runs), VISUAL_FAN_IN):
+                group = runs[k:k + VISUAL_FAN_IN]
+                start, end = group[0][0], group[-1][1]
+                for position, value in enumerate(_merge_runs([path for _, _, path in group]), start):
+                    arr[position] = value
+                    yield write(position, value)
+                if len(runs) > VISUAL_FAN_IN:
+                    # Not the last pass: the merged run is spilled again for the next one
+                    merged_runs.append((start, end, _spill(arr[start:end], directory)))
+            runs = merged_runs
+    return arr
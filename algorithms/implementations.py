@@ -1,99 +1,150 @@
-from typing import List, Generator, Tuple
+from typing import List, Generator
 
-def bubble_sort(arr: List[int]) -> Generator[Tuple[List[int], int], None, None]:
+from .steps import StepEvent, swap, write, compare
+
+def bubble_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
     """Implementation of bubble sort algorithm"""
     n = len(arr)
     arr = arr.copy()
-    steps = 0
-    yield arr.copy(), steps
     
     for i in range(n):
         for j in range(0, n-i-1):
+            yield compare(j, j+1)
             if arr[j] > arr[j+1]:
-                steps += 1
                 arr[j], arr[j+1] = arr[j+1], arr[j]
-                yield arr.copy(), steps
-    yield arr, steps
+                yield swap(j, j+1)
+    return arr
 
-def insertion_sort(arr: List[int]) -> Generator[Tuple[List[int], int], None, None]:
+def insertion_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
     """Implementation of insertion sort algorithm"""
     arr = arr.copy()
-    steps = 0
-    yield arr.copy(), steps
     
     for i in range(1, len(arr)):
         key = arr[i]
         j = i-1
-        while j >= 0 and key < arr[j]:
+        while j >= 0:
+            yield compare(j+1, j)
+            if not key < arr[j]:
+                break
             arr[j+1] = arr[j]
+            yield write(j+1, arr[j])
             j -= 1
-        steps += 1
-        arr[j+1] = key
-        yield arr.copy(), steps
-    yield arr, steps
+        if j+1 != i:
+            arr[j+1] = key
+            yield write(j+1, key)
+    return arr
 
-def selection_sort(arr: List[int]) -> Generator[Tuple[List[int], int], None, None]:
+def selection_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
     """Implementation of selection sort algorithm"""
     arr = arr.copy()
-    steps = 0
-    yield arr.copy(), steps
     
     for i in range(len(arr)):
         min_idx = i
         for j in range(i+1, len(arr)):
+            yield compare(j, min_idx)
             if arr[j] < arr[min_idx]:
                 min_idx = j
         if min_idx != i:
-            steps += 1
             arr[i], arr[min_idx] = arr[min_idx], arr[i]
-            yield arr.copy(), steps
-    yield arr, steps
+            yield swap(i, min_idx)
+    return arr
+
+def _sift_down(arr: List[int], start: int, root: int, size: int) -> Generator[StepEvent, None, None]:
+    """Sift a node down the max heap stored in arr[start:start + size]"""
+    while True:
+        largest = root
+        left = 2 * root + 1
+        right = left + 1
+        
+        if left < size:
+            yield compare(start + left, start + largest)
+            if arr[start + left] > arr[start + largest]:
+                largest = left
+        
+        if right < size:
+            yield compare(start + right, start + largest)
+            if arr[start + right] > arr[start + largest]:
+                largest = right
+        
+        if largest == root:
+            return
+        arr[start + root], arr[start + largest] = arr[start + largest], arr[start + root]
+        yield swap(start + root, start + largest)
+        root = largest
 
-def quick_sort(arr: List[int]) -> Generator[Tuple[List[int], int], None, None]:
-    """Implementation of quick sort algorithm with visualization"""
+def _heap_sort_range(arr: List[int], start: int, end: int) -> Generator[StepEvent, None, None]:
+    """Heap sort arr[start:end] in place"""
+    n = end - start
+    
+    # Build max heap
+    for i in range(n // 2 - 1, -1, -1):
+        yield from _sift_down(arr, start, i, n)
+    
+    # Extract elements from heap one by one
+    for i in range(n - 1, 0, -1):
+        arr[start], arr[start + i] = arr[start + i], arr[start]
+        yield swap(start, start + i)
+        yield from _sift_down(arr, start, 0, i)
+
+def quick_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    Introsort-style quick sort with visualization.
+    
+    Uses a median-of-three pivot and an explicit stack instead of recursion,
+    and heap sorts any range whose partitions have nested deeper than
+    2·log2(n), so sorted, reversed and duplicate-heavy inputs stay O(n log n)
+    at any size.
+    """
     arr = arr.copy()
-    steps = 0
-    yield arr.copy(), steps
+    n = len(arr)
     
-    def partition(low: int, high: int) -> Generator[Tuple[List[int], int], None, int]:
-        nonlocal steps
+    # Ranges still to sort, with the partition depth they may still use
+    stack = [(0, n - 1, 2 * n.bit_length())]
+    while stack:
+        low, high, depth = stack.pop()
+        if low >= high:
+            continue
+        if depth == 0:
+            yield from _heap_sort_range(arr, low, high + 1)
+            continue
+        
+        # Order the first, middle and last elements and use the median as pivot
+        mid = (low + high) // 2
+        for i, j in ((low, mid), (low, high), (mid, high)):
+            yield compare(j, i)
+            if arr[j] < arr[i]:
+                arr[i], arr[j] = arr[j], arr[i]
+                yield swap(i, j)
+        arr[mid], arr[high] = arr[high], arr[mid]
+        yield swap(mid, high)
+        
+        # Partition around the pivot at arr[high]
         pivot = arr[high]
         i = low - 1
-        
         for j in range(low, high):
+            yield compare(j, high)
             if arr[j] <= pivot:
                 i += 1
                 arr[i], arr[j] = arr[j], arr[i]
-                steps += 1
-                yield arr.copy(), steps
-        
-        arr[i + 1], arr[high] = arr[high], arr[i + 1]
-        steps += 1
-        yield arr.copy(), steps
-        return i + 1
-    
-    def quick_sort_helper(low: int, high: int):
-        if low < high:
-            # Find pivot element
-            pivot_idx = yield from partition(low, high)
-            
-            # Sort elements before and after partition
-            yield from quick_sort_helper(low, pivot_idx - 1)
-            yield from quick_sort_helper(pivot_idx + 1, high)
+                yield swap(i, j)
+        pivot_idx = i + 1
+        arr[pivot_idx], arr[high] = arr[high], arr[pivot_idx]
+        yield swap(pivot_idx, high)
+        
+        # Sort the smaller side first so the stack stays O(log n)
+        left, right = (low, pivot_idx - 1), (pivot_idx + 1, high)
+        if left[1] - left[0] < right[1] - right[0]:
+            left, right = right, left
+        stack.append((*left, depth - 1))
+        stack.append((*right, depth - 1))
     
-    # Start the recursive sorting process
-    yield from quick_sort_helper(0, len(arr) - 1)
-    yield arr, steps
+    return arr
 
-def merge_sort(arr: List[int]) -> Generator[Tuple[List[int], int], None, None]:
+def merge_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
     """Implementation of merge sort algorithm with visualization"""
     arr = arr.copy()
-    steps = 0
-    yield arr.copy(), steps
     
     def merge(left: int, mid: int, right: int):
-        nonlocal steps
-        
         # Create temporary arrays
         left_part = arr[left:mid + 1]
         right_part = arr[mid + 1:right + 1]
@@ -102,95 +153,713 @@ def merge_sort(arr: List[int]) -> Generator[Tuple[List[int], int], None, None]:
         k = left
         
         while i < len(left_part) and j < len(right_part):
+            yield compare(left + i, mid + 1 + j)
             if left_part[i] <= right_part[j]:
                 arr[k] = left_part[i]
                 i += 1
             else:
                 arr[k] = right_part[j]
                 j += 1
+            yield write(k, arr[k])
             k += 1
-            steps += 1
-            yield arr.copy(), steps
         
         # Check for remaining elements
         while i < len(left_part):
             arr[k] = left_part[i]
             i += 1
+            yield write(k, arr[k])
             k += 1
-            steps += 1
-            yield arr.copy(), steps
             
         while j < len(right_part):
             arr[k] = right_part[j]
             j += 1
+            yield write(k, arr[k])
             k += 1
-            steps += 1
-            yield arr.copy(), steps
     
-    def merge_sort_helper(left: int, right: int):
-        if left < right:
-            mid = (left + right) // 2
-            
-            # Sort first and second halves
-            yield from merge_sort_helper(left, mid)
-            yield from merge_sort_helper(mid + 1, right)
-            
-            # Merge the sorted halves
+    # Top-down order on an explicit stack: each range is pushed once to be
+    # merged and again, above it, to have its halves sorted first
+    stack = [(0, len(arr) - 1, False)]
+    while stack:
+        left, right, halves_sorted = stack.pop()
+        if left >= right:
+            continue
+        mid = (left + right) // 2
+        if halves_sorted:
             yield from merge(left, mid, right)
+        else:
+            stack.append((left, right, True))
+            stack.append((mid + 1, right, False))
+            stack.append((left, mid, False))
     
-    # Start the recursive sorting process
-    yield from merge_sort_helper(0, len(arr) - 1)
-    yield arr, steps
+    return arr
 
-def heap_sort(arr: List[int]) -> Generator[Tuple[List[int], int], None, None]:
+def heap_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
     """Implementation of heap sort algorithm with visualization"""
     arr = arr.copy()
-    steps = 0
-    yield arr.copy(), steps
+    yield from _heap_sort_range(arr, 0, len(arr))
+    return arr
+
+# Digit width of the radix sorts: 256 buckets per pass
+RADIX_BITS = 8
+RADIX = 1 << RADIX_BITS
+RADIX_MASK = RADIX - 1
+
+def _insertion_sort_range(arr: List[int], begin: int, end: int) -> Generator[StepEvent, None, None]:
+    """Insertion sort arr[begin:end] in place"""
+    for i in range(begin + 1, end):
+        key = arr[i]
+        j = i - 1
+        while j >= begin:
+            yield compare(j + 1, j)
+            if not key < arr[j]:
+                break
+            arr[j + 1] = arr[j]
+            yield write(j + 1, arr[j])
+            j -= 1
+        if j + 1 != i:
+            arr[j + 1] = key
+            yield write(j + 1, key)
+
+def _write_back(arr: List[int], start: int, values: List[int]) -> Generator[StepEvent, None, None]:
+    """Copy values into arr from start on, reporting the elements that change"""
+    for k, value in enumerate(values, start):
+        if arr[k] != value:
+            arr[k] = value
+            yield write(k, value)
+
+def lsd_radix_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    Least significant digit radix sort, one byte per pass.
     
-    def heapify(n: int, i: int):
-        nonlocal steps
-        largest = i
-        left = 2 * i + 1
-        right = 2 * i + 2
+    Each pass is a stable counting sort on one digit of the value's offset
+    from the minimum, so negative values are handled too.
+    """
+    arr = arr.copy()
+    if len(arr) < 2:
+        return arr
+    low = min(arr)
+    span = max(arr) - low
+    
+    shift = 0
+    while span >> shift:
+        # Bucket start positions from the digit counts
+        starts = [0] * (RADIX + 1)
+        for value in arr:
+            starts[((value - low) >> shift & RADIX_MASK) + 1] += 1
+        for digit in range(RADIX):
+            starts[digit + 1] += starts[digit]
         
-        if left < n and arr[left] > arr[largest]:
-            largest = left
-            
-        if right < n and arr[right] > arr[largest]:
-            largest = right
+        output = [0] * len(arr)
+        for value in arr:
+            digit = (value - low) >> shift & RADIX_MASK
+            output[starts[digit]] = value
+            starts[digit] += 1
+        yield from _write_back(arr, 0, output)
+        shift += RADIX_BITS
+    return arr
+
+def msd_radix_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    Most significant digit radix sort, one byte per level.
+    
+    Buckets are refined on an explicit stack; buckets of at most
+    16 elements are finished with insertion sort.
+    """
+    arr = arr.copy()
+    if len(arr) < 2:
+        return arr
+    low = min(arr)
+    span = max(arr) - low
+    top = max(span.bit_length() - 1, 0) // RADIX_BITS * RADIX_BITS
+    
+    stack = [(0, len(arr), top)]
+    while stack:
+        begin, end, shift = stack.pop()
+        if end - begin <= 16:
+            yield from _insertion_sort_range(arr, begin, end)
+            continue
+        
+        buckets = [[] for _ in range(RADIX)]
+        for k in range(begin, end):
+            buckets[(arr[k] - low) >> shift & RADIX_MASK].append(arr[k])
+        yield from _write_back(arr, begin, [value for bucket in buckets for value in bucket])
+        
+        # Refine each bucket on the next digit down
+        if shift:
+            start = begin
+            for bucket in buckets:
+                if len(bucket) > 1:
+                    stack.append((start, start + len(bucket), shift - RADIX_BITS))
+                start += len(bucket)
+    return arr
+
+# Most counters counting sort allocates beyond one per element
+COUNTING_SORT_MAX_RANGE = 1 << 20
+
+def counting_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    Counting sort: tallies every value, then writes them out in order.
+    
+    Inputs whose values span more than max(COUNTING_SORT_MAX_RANGE, n)
+    would need too many counters and are heap sorted instead.
+    """
+    arr = arr.copy()
+    if len(arr) < 2:
+        return arr
+    low = min(arr)
+    span = max(arr) - low + 1
+    if span > max(COUNTING_SORT_MAX_RANGE, len(arr)):
+        yield from _heap_sort_range(arr, 0, len(arr))
+        return arr
+    counts = [0] * span
+    for value in arr:
+        counts[value - low] += 1
+    
+    k = 0
+    for offset, count in enumerate(counts):
+        value = low + offset
+        for _ in range(count):
+            if arr[k] != value:
+                arr[k] = value
+                yield write(k, value)
+            k += 1
+    return arr
+
+def bucket_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    Bucket sort with one bucket per element over the value range.
+    
+    The buckets are written back in order and then insertion sorted in place,
+    which takes linear time when the values are spread evenly.
+    """
+    arr = arr.copy()
+    n = len(arr)
+    if n < 2:
+        return arr
+    low = min(arr)
+    span = max(arr) - low + 1
+    
+    buckets = [[] for _ in range(n)]
+    for value in arr:
+        buckets[(value - low) * n // span].append(value)
+    yield from _write_back(arr, 0, [value for bucket in buckets for value in bucket])
+    
+    start = 0
+    for bucket in buckets:
+        yield from _insertion_sort_range(arr, start, start + len(bucket))
+        start += len(bucket)
+    return arr
+
+# Ciura's empirically best gaps, extended by a factor of 2.25 for large arrays
+CIURA_GAPS = [1, 4, 10, 23, 57, 132, 301, 701]
+
+def shell_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """Shell sort with Ciura's gap sequence"""
+    arr = arr.copy()
+    n = len(arr)
+    gaps = list(CIURA_GAPS)
+    while gaps[-1] * 2.25 < n:
+        gaps.append(int(gaps[-1] * 2.25))
+    
+    for gap in reversed(gaps):
+        if gap >= n:
+            continue
+        # Gapped insertion sort
+        for i in range(gap, n):
+            key = arr[i]
+            j = i
+            while j >= gap:
+                yield compare(j, j - gap)
+                if not key < arr[j - gap]:
+                    break
+                arr[j] = arr[j - gap]
+                yield write(j, arr[j])
+                j -= gap
+            if j != i:
+                arr[j] = key
+                yield write(j, key)
+    return arr
+
+# Timsort tuning from CPython's listsort
+MIN_MERGE = 32
+MIN_GALLOP = 7
+
+def _min_run(n: int) -> int:
+    """Run length between 16 and 32 that splits n into a power of two runs or just under"""
+    r = 0
+    while n >= MIN_MERGE:
+        r |= n & 1
+        n >>= 1
+    return n + r
+
+def _gallop(arr: List[int], key: int, begin: int, end: int, right: bool,
+            origin: int) -> Generator[StepEvent, None, int]:
+    """
+    Find where key belongs in sorted arr[begin:end] by galloping then bisecting.
+    
+    Args:
+        right: Place key after equal elements rather than before them
+        origin: Index of key in the array, for the comparison events
+    
+    Returns:
+        int: Insertion index
+    """
+    def before(k: int) -> bool:
+        # Whether key goes before arr[k]
+        return key < arr[k] if right else not arr[k] < key
+    
+    # Exponential search for a bracket, then binary search inside it
+    last, offset = begin, 1
+    while begin + offset - 1 < end:
+        yield compare(origin, begin + offset - 1)
+        if before(begin + offset - 1):
+            break
+        last = begin + offset
+        offset *= 2
+    hi = min(begin + offset - 1, end)
+    lo = last
+    while lo < hi:
+        mid = (lo + hi) // 2
+        yield compare(origin, mid)
+        if before(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+def timsort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    Timsort: natural runs extended by binary insertion, merged with galloping.
+    
+    Follows CPython's listsort: descending runs are reversed, short runs are
+    extended to a minimum length, and a stack of pending runs is merged to
+    keep its lengths growing faster than the Fibonacci numbers. Merges
+    switch to galloping after MIN_GALLOP consecutive wins of one side.
+    """
+    arr = arr.copy()
+    n = len(arr)
+    min_run = _min_run(n)
+    runs = []
+    min_gallop = MIN_GALLOP
+    
+    def merge_at(i: int):
+        nonlocal min_gallop
+        base_a, len_a = runs[i]
+        base_b, len_b = runs[i + 1]
+        runs[i] = (base_a, len_a + len_b)
+        del runs[i + 1]
+        
+        # Elements of A already below B[0] and of B already above A[-1] stay put
+        start = yield from _gallop(arr, arr[base_b], base_a, base_b, True, base_b)
+        len_a -= start - base_a
+        base_a = start
+        if len_a == 0:
+            return
+        end_b = yield from _gallop(arr, arr[base_b - 1], base_b, base_b + len_b, False, base_b - 1)
+        len_b = end_b - base_b
+        if len_b == 0:
+            return
+        
+        # Merge from a copy of A, galloping through whichever side keeps winning
+        temp = arr[base_a:base_b]
+        i = j = 0
+        k = base_a
+        while i < len_a and j < len_b:
+            wins_a = wins_b = 0
+            while i < len_a and j < len_b and max(wins_a, wins_b) < min_gallop:
+                yield compare(base_b + j, base_a + i)
+                if arr[base_b + j] < temp[i]:
+                    arr[k] = arr[base_b + j]
+                    j += 1
+                    wins_b += 1
+                    wins_a = 0
+                else:
+                    arr[k] = temp[i]
+                    i += 1
+                    wins_a += 1
+                    wins_b = 0
+                yield write(k, arr[k])
+                k += 1
             
-        if largest != i:
-            arr[i], arr[largest] = arr[largest], arr[i]
-            steps += 1
-            yield arr.copy(), steps
-            yield from heapify(n, largest)
+            while i < len_a and j < len_b:
+                # Copy the run of A up to B[j] in one go, then the run of B below A[i].
+                # A's copy lives outside the array, so its probes are shown at
+                # the slot each element would be copied to
+                key = arr[base_b + j]
+                lo, hi = i, len_a
+                while lo < hi:
+                    mid = (lo + hi) // 2
+                    yield compare(base_b + j, k + mid - i)
+                    if key < temp[mid]:
+                        hi = mid
+                    else:
+                        lo = mid + 1
+                count_a = lo - i
+                for value in temp[i:lo]:
+                    arr[k] = value
+                    yield write(k, value)
+                    k += 1
+                i = lo
+                if i == len_a:
+                    break
+                
+                end = yield from _gallop(arr, temp[i], base_b + j, base_b + len_b, False, k)
+                count_b = end - (base_b + j)
+                for source in range(base_b + j, end):
+                    arr[k] = arr[source]
+                    yield write(k, arr[k])
+                    k += 1
+                j += count_b
+                
+                if count_a < MIN_GALLOP and count_b < MIN_GALLOP:
+                    # Galloping stopped paying off; make it harder to re-enter
+                    min_gallop += 1
+                    break
+                min_gallop = max(min_gallop - 1, 1)
+        
+        # The rest of A; the rest of B is already in place
+        for value in temp[i:len_a]:
+            arr[k] = value
+            yield write(k, value)
+            k += 1
     
-    # Build max heap
+    start = 0
+    while start < n:
+        # Find the next natural run, reversing it if strictly descending
+        end = start + 1
+        if end < n:
+            yield compare(end, start)
+            if arr[end] < arr[start]:
+                end += 1
+                while end < n:
+                    yield compare(end, end - 1)
+                    if not arr[end] < arr[end - 1]:
+                        break
+                    end += 1
+                lo, hi = start, end - 1
+                while lo < hi:
+                    arr[lo], arr[hi] = arr[hi], arr[lo]
+                    yield swap(lo, hi)
+                    lo += 1
+                    hi -= 1
+            else:
+                end += 1
+                while end < n:
+                    yield compare(end, end - 1)
+                    if arr[end] < arr[end - 1]:
+                        break
+                    end += 1
+        
+        # Extend short runs with binary insertion sort
+        forced = min(start + min_run, n)
+        for i in range(end, forced):
+            key = arr[i]
+            lo, hi = start, i
+            while lo < hi:
+                mid = (lo + hi) // 2
+                yield compare(i, mid)
+                if key < arr[mid]:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            for k in range(i, lo, -1):
+                arr[k] = arr[k - 1]
+                yield write(k, arr[k])
+            if lo != i:
+                arr[lo] = key
+                yield write(lo, key)
+        end = max(end, forced)
+        runs.append((start, end - start))
+        start = end
+        
+        # Restore the run length invariants
+        while len(runs) > 1:
+            i = len(runs) - 2
+            if (i > 0 and runs[i - 1][1] <= runs[i][1] + runs[i + 1][1]) or \
+                    (i > 1 and runs[i - 2][1] <= runs[i - 1][1] + runs[i][1]):
+                if runs[i - 1][1] < runs[i + 1][1]:
+                    i -= 1
+            elif runs[i][1] > runs[i + 1][1]:
+                break
+            yield from merge_at(i)
+    
+    # Merge whatever is left, newest first
+    while len(runs) > 1:
+        i = len(runs) - 2
+        if i > 0 and runs[i - 1][1] < runs[i + 1][1]:
+            i -= 1
+        yield from merge_at(i)
+    return arr
+
+# Partitions smaller than this are left for introsort's final insertion sort pass
+INTROSORT_THRESHOLD = 16
+
+def introsort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    Introsort as in the C++ standard library.
+    
+    Hoare partitions around a median-of-three pivot down to ranges of 16
+    elements, heap sorts ranges that nest deeper than 2·log2(n) and
+    finishes with one insertion sort pass over the nearly sorted array.
+    """
+    arr = arr.copy()
     n = len(arr)
-    for i in range(n // 2 - 1, -1, -1):
-        yield from heapify(n, i)
+    
+    stack = [(0, n, 2 * n.bit_length())]
+    while stack:
+        begin, end, depth = stack.pop()
+        if end - begin <= INTROSORT_THRESHOLD:
+            continue
+        if depth == 0:
+            yield from _heap_sort_range(arr, begin, end)
+            continue
         
-    # Extract elements from heap one by one
-    for i in range(n - 1, 0, -1):
-        arr[0], arr[i] = arr[i], arr[0]
-        steps += 1
-        yield arr.copy(), steps
-        yield from heapify(i, 0)
-    
-    yield arr, steps
-
-# Add new algorithms to the registry in initialize_algorithms function
-def initialize_algorithms(registry):
-    """Register all sorting algorithms"""
-    algorithms = [
-        ("Bubble Sort", bubble_sort, "O(n²)"),
-        ("Insertion Sort", insertion_sort, "O(n²) worst/avg, O(n) best"),
-        ("Selection Sort", selection_sort, "O(n²)"),
-        ("Quick Sort", quick_sort, "O(n²) worst, O(n log n) avg"),
-        ("Merge Sort", merge_sort, "O(n log n)"),
-        ("Heap Sort", heap_sort, "O(n log n)")
-    ]
-    
-    for name, func, complexity in algorithms:
-        registry.register(name, func, complexity)
\ No newline at end of file
+        # Move the median of the second, middle and last elements to the front
+        a, b, c = begin + 1, (begin + end) // 2, end - 1
+        yield compare(a, b)
+        if arr[a] < arr[b]:
+            yield compare(b, c)
+            if arr[b] < arr[c]:
+                median = b
+            else:
+                yield compare(a, c)
+                median = c if arr[a] < arr[c] else a
+        else:
+            yield compare(a, c)
+            if arr[a] < arr[c]:
+                median = a
+            else:
+                yield compare(b, c)
+                median = c if arr[b] < arr[c] else b
+        arr[begin], arr[median] = arr[median], arr[begin]
+        yield swap(begin, median)
+        
+        # Hoare partition around arr[begin]
+        pivot = arr[begin]
+        i, j = begin + 1, end
+        while True:
+            while i < end:
+                yield compare(i, begin)
+                if not arr[i] < pivot:
+                    break
+                i += 1
+            j -= 1
+            while j > begin:
+                yield compare(begin, j)
+                if not pivot < arr[j]:
+                    break
+                j -= 1
+            if i >= j:
+                break
+            arr[i], arr[j] = arr[j], arr[i]
+            yield swap(i, j)
+            i += 1
+        
+        stack.append((i, end, depth - 1))
+        stack.append((begin, i, depth - 1))
+    
+    yield from _insertion_sort_range(arr, 0, n)
+    return arr
+
+# pdqsort tuning from the reference implementation
+PDQ_INSERTION_THRESHOLD = 24
+PDQ_NINTHER_THRESHOLD = 128
+PDQ_PARTIAL_INSERTION_LIMIT = 8
+
+def _sort3(arr: List[int], a: int, b: int, c: int) -> Generator[StepEvent, None, None]:
+    """Order arr[a] <= arr[b] <= arr[c]"""
+    for i, j in ((a, b), (b, c), (a, b)):
+        yield compare(j, i)
+        if arr[j] < arr[i]:
+            arr[i], arr[j] = arr[j], arr[i]
+            yield swap(i, j)
+
+def _partial_insertion_sort(arr: List[int], begin: int, end: int) -> Generator[StepEvent, None, bool]:
+    """Insertion sort arr[begin:end] unless that moves more than a few elements"""
+    moved = 0
+    for i in range(begin + 1, end):
+        yield compare(i, i - 1)
+        if arr[i] < arr[i - 1]:
+            key = arr[i]
+            j = i
+            while True:
+                arr[j] = arr[j - 1]
+                yield write(j, arr[j])
+                j -= 1
+                if j == begin:
+                    break
+                yield compare(i, j - 1)
+                if not key < arr[j - 1]:
+                    break
+            arr[j] = key
+            yield write(j, key)
+            moved += i - j
+        if moved > PDQ_PARTIAL_INSERTION_LIMIT:
+            return False
+    return True
+
+def _partition_right(arr: List[int], begin: int, end: int) -> Generator[StepEvent, None, tuple]:
+    """
+    Partition around arr[begin], with elements equal to it going right.
+    
+    Returns:
+        tuple: Final pivot position and whether the range was already partitioned
+    """
+    pivot = arr[begin]
+    first, last = begin + 1, end
+    while first < end:
+        yield compare(first, begin)
+        if not arr[first] < pivot:
+            break
+        first += 1
+    while last > first:
+        last -= 1
+        yield compare(last, begin)
+        if arr[last] < pivot:
+            break
+    else:
+        last = first
+    already_partitioned = first >= last
+    
+    while first < last:
+        arr[first], arr[last] = arr[last], arr[first]
+        yield swap(first, last)
+        first += 1
+        while first < end:
+            yield compare(first, begin)
+            if not arr[first] < pivot:
+                break
+            first += 1
+        last -= 1
+        while last > begin:
+            yield compare(last, begin)
+            if arr[last] < pivot:
+                break
+            last -= 1
+    
+    pivot_pos = first - 1
+    if pivot_pos != begin:
+        arr[begin], arr[pivot_pos] = arr[pivot_pos], arr[begin]
+        yield swap(begin, pivot_pos)
+    return pivot_pos, already_partitioned
+
+def _partition_left(arr: List[int], begin: int, end: int) -> Generator[StepEvent, None, int]:
+    """Partition around arr[begin], with elements equal to it going left; returns the pivot position"""
+    pivot = arr[begin]
+    first, last = begin, end
+    while last > begin + 1:
+        last -= 1
+        yield compare(begin, last)
+        if not pivot < arr[last]:
+            break
+    else:
+        last = begin
+    while first < last:
+        first += 1
+        yield compare(begin, first)
+        if pivot < arr[first]:
+            break
+    
+    while first < last:
+        arr[first], arr[last] = arr[last], arr[first]
+        yield swap(first, last)
+        last -= 1
+        while last > begin:
+            yield compare(begin, last)
+            if not pivot < arr[last]:
+                break
+            last -= 1
+        first += 1
+        while first < last:
+            yield compare(begin, first)
+            if pivot < arr[first]:
+                break
+            first += 1
+    
+    if last != begin:
+        arr[begin], arr[last] = arr[last], arr[begin]
+        yield swap(begin, last)
+    return last
+
+def pdqsort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    Pattern-defeating quicksort (Orson Peters).
+    
+    A quick sort that finishes small ranges with insertion sort, detects
+    already partitioned ranges and tries a bounded insertion sort on them,
+    gives runs of elements equal to an earlier pivot their own partition,
+    and breaks up patterns with a few swaps after an unbalanced partition,
+    falling back to heap sort once that has happened log2(n) times.
+    """
+    arr = arr.copy()
+    n = len(arr)
+    
+    # (begin, end, unbalanced partitions still allowed, whether nothing lies to the left)
+    stack = [(0, n, n.bit_length(), True)]
+    while stack:
+        begin, end, bad_allowed, leftmost = stack.pop()
+        while True:
+            size = end - begin
+            if size < PDQ_INSERTION_THRESHOLD:
+                yield from _insertion_sort_range(arr, begin, end)
+                break
+            
+            # Median of three, or pseudo-median of nine for large ranges, to the front
+            half = size // 2
+            if size > PDQ_NINTHER_THRESHOLD:
+                yield from _sort3(arr, begin, begin + half, end - 1)
+                yield from _sort3(arr, begin + 1, begin + half - 1, end - 2)
+                yield from _sort3(arr, begin + 2, begin + half + 1, end - 3)
+                yield from _sort3(arr, begin + half - 1, begin + half, begin + half + 1)
+                arr[begin], arr[begin + half] = arr[begin + half], arr[begin]
+                yield swap(begin, begin + half)
+            else:
+                yield from _sort3(arr, begin + half, begin, end - 1)
+            
+            # A pivot equal to the element before the range (an earlier pivot)
+            # means the range starts with a run of equal elements: split those off
+            if not leftmost:
+                yield compare(begin - 1, begin)
+                if not arr[begin - 1] < arr[begin]:
+                    begin = (yield from _partition_left(arr, begin, end)) + 1
+                    continue
+            
+            pivot_pos, already_partitioned = yield from _partition_right(arr, begin, end)
+            left_size = pivot_pos - begin
+            right_size = end - (pivot_pos + 1)
+            
+            if left_size < size // 8 or right_size < size // 8:
+                bad_allowed -= 1
+                if bad_allowed == 0:
+                    yield from _heap_sort_range(arr, begin, end)
+                    break
+                # Swap a few elements around to break up the pattern
+                swaps = []
+                if left_size >= PDQ_INSERTION_THRESHOLD:
+                    quarter = left_size // 4
+                    swaps += [(begin, begin + quarter), (pivot_pos - 1, pivot_pos - quarter)]
+                    if left_size > PDQ_NINTHER_THRESHOLD:
+                        swaps += [(begin + 1, begin + quarter + 1), (begin + 2, begin + quarter + 2),
+                                  (pivot_pos - 2, pivot_pos - quarter - 1),
+                                  (pivot_pos - 3, pivot_pos - quarter - 2)]
+                if right_size >= PDQ_INSERTION_THRESHOLD:
+                    quarter = right_size // 4
+                    swaps += [(pivot_pos + 1, pivot_pos + 1 + quarter), (end - 1, end - quarter)]
+                    if right_size > PDQ_NINTHER_THRESHOLD:
+                        swaps += [(pivot_pos + 2, pivot_pos + 2 + quarter),
+                                  (pivot_pos + 3, pivot_pos + 3 + quarter),
+                                  (end - 2, end - 1 - quarter), (end - 3, end - 2 - quarter)]
+                for i, j in swaps:
+                    arr[i], arr[j] = arr[j], arr[i]
+                    yield swap(i, j)
+            elif already_partitioned:
+                # Likely already sorted: finish cheaply if both sides need few moves
+                if (yield from _partial_insertion_sort(arr, begin, pivot_pos)) and \
+                        (yield from _partial_insertion_sort(arr, pivot_pos + 1, end)):
+                    break
+            
+            # Sort the left side later and keep going on the right
+            stack.append((begin, pivot_pos, bad_allowed, leftmost))
+            begin = pivot_pos + 1
+            leftmost = False
+    return arr
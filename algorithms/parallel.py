@@ -0,0 +1,219 @@
+"""
+Parallel sorting algorithms.
+
+The work is split into PARALLEL_WORKERS independent tasks: segments that are
+sorted on their own, or slices of a merge. Each task runs its part of the
+algorithm in a pool process and sends back its result along with the events
+it produced, already shifted to array positions. The generator then replays
+the tasks' events interleaved, each batch preceded by a WORKER event, so the
+visualization can show the segments progressing side by side and colour them
+by worker.
+
+Inputs below PARALLEL_MIN_SIZE, machines with a single core and runs that are
+already inside a daemon process (such as the GUI's StepWorker, which cannot
+start children) do the same tasks in-process, with the same events.
+"""
+
+import multiprocessing
+import os
+import random
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Callable, Generator, Iterator, List, Optional, Sequence, Tuple
+
+from .implementations import merge_sort
+from .steps import StepEvent, NO_WORKER, compare, write, worker, offset_events, _capture_return
+
+# Number of tasks per phase, and so of worker ids shown by the visualization
+PARALLEL_WORKERS = 4
+
+# Inputs smaller than this are not worth starting processes for
+PARALLEL_MIN_SIZE = 1 << 15
+
+# Events replayed from one task before switching to the next
+INTERLEAVE = 32
+
+# Splitter candidates sampled per bucket by sample sort
+OVERSAMPLING = 16
+
+# (result, events) of one task
+TaskResult = Tuple[List[int], List[StepEvent]]
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _pool() -> Optional[ProcessPoolExecutor]:
+    """The shared process pool, or None if this process cannot use one"""
+    global _executor
+    if (os.cpu_count() or 1) < 2 or multiprocessing.current_process().daemon:
+        return None
+    if _executor is None:
+        # Spawned rather than forked so a GUI's Qt state is never copied
+        _executor = ProcessPoolExecutor(
+            max_workers=min(PARALLEL_WORKERS, os.cpu_count()),
+            mp_context=multiprocessing.get_context('spawn')
+        )
+    return _executor
+
+
+def _run_tasks(function: Callable, tasks: Sequence[tuple], size: int) -> List[TaskResult]:
+    """Run one phase's tasks, in the pool when the input is large enough"""
+    pool = _pool() if size >= PARALLEL_MIN_SIZE else None
+    if pool is None:
+        return [function(*task) for task in tasks]
+    return list(pool.map(function, *zip(*tasks)))
+
+
+def _interleave(batches: List[List[StepEvent]]) -> Iterator[StepEvent]:
+    """Replay the events of each task in turns, tagged with the task's worker id"""
+    position = 0
+    while any(position < len(events) for events in batches):
+        for worker_id, events in enumerate(batches):
+            if position < len(events):
+                yield worker(worker_id)
+                yield from events[position:position + INTERLEAVE]
+        position += INTERLEAVE
+    yield worker(NO_WORKER)
+
+
+def _sort_segment(values: List[int], offset: int) -> TaskResult:
+    """Merge sort one segment; runs in a pool worker"""
+    returned = []
+    events = list(_capture_return(offset_events(merge_sort(values), offset), returned))
+    return returned[0], events
+
+
+def _co_rank(k: int, left: Sequence[int], right: Sequence[int]) -> int:
+    """
+    Number of elements of left among the first k of the stable merge of left and right.
+
+    Splitting a merge at co-ranks of evenly spaced output positions gives
+    slices that can be merged independently.
+    """
+    lo, hi = max(0, k - len(right)), min(k, len(left))
+    while lo < hi:
+        i = (lo + hi) // 2
+        j = k - i
+        if j > 0 and i < len(left) and left[i] <= right[j - 1]:
+            lo = i + 1
+        else:
+            hi = i
+    return lo
+
+
+def _merge_slice(left: List[int], right: List[int], left_origin: int, right_origin: int,
+                 output: int) -> TaskResult:
+    """
+    Merge one slice of a merge; runs in a pool worker.
+
+    Args:
+        left: Slice of the left run
+        right: Slice of the right run
+        left_origin: Array position of left[0]
+        right_origin: Array position of right[0]
+        output: Array position the merged slice starts at
+    """
+    merged = []
+    events = []
+    i = j = 0
+    while i < len(left) and j < len(right):
+        events.append(compare(left_origin + i, right_origin + j))
+        if left[i] <= right[j]:
+            merged.append(left[i])
+            i += 1
+        else:
+            merged.append(right[j])
+            j += 1
+        events.append(write(output + len(merged) - 1, merged[-1]))
+    for value in chain(left[i:], right[j:]):
+        merged.append(value)
+        events.append(write(output + len(merged) - 1, value))
+    return merged, events
+
+
+def _segment_bounds(n: int, parts: int) -> List[int]:
+    return [k * n // parts for k in range(parts + 1)]
+
+
+def parallel_merge_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    Merge sort across a process pool.
+
+    The array is cut into PARALLEL_WORKERS segments that are merge sorted in
+    parallel, then merged pairwise level by level. Every merge is split at
+    co-ranks into slices that are merged in parallel as well, so all workers
+    stay busy up to and including the final merge.
+    """
+    arr = arr.copy()
+    n = len(arr)
+    bounds = _segment_bounds(n, PARALLEL_WORKERS)
+
+    tasks = [(arr[lo:hi], lo) for lo, hi in zip(bounds, bounds[1:])]
+    results = _run_tasks(_sort_segment, tasks, n)
+    yield from _interleave([events for _, events in results])
+    arr = [value for result, _ in results for value in result]
+
+    # Sorted runs as (start, end); merge neighbours until one is left
+    runs = list(zip(bounds, bounds[1:]))
+    while len(runs) > 1:
+        pairs = [runs[k:k + 2] for k in range(0, len(runs), 2)]
+        slices_per_merge = max(1, PARALLEL_WORKERS // len(pairs))
+        tasks = []
+        for pair in pairs:
+            if len(pair) == 1:
+                continue
+            (lo, mid), (_, hi) = pair
+            left, right = arr[lo:mid], arr[mid:hi]
+            cuts = _segment_bounds(hi - lo, slices_per_merge)
+            ranks = [_co_rank(k, left, right) for k in cuts]
+            for (k0, i0), (k1, i1) in zip(zip(cuts, ranks), zip(cuts[1:], ranks[1:])):
+                j0, j1 = k0 - i0, k1 - i1
+                tasks.append((left[i0:i1], right[j0:j1], lo + i0, mid + j0, lo + k0))
+        results = _run_tasks(_merge_slice, tasks, n)
+        yield from _interleave([events for _, events in results])
+        for task, (merged, _) in zip(tasks, results):
+            output = task[4]
+            arr[output:output + len(merged)] = merged
+        runs = [(pair[0][0], pair[-1][1]) for pair in pairs]
+    return arr
+
+
+def parallel_sample_sort(arr: List[int]) -> Generator[StepEvent, None, List[int]]:
+    """
+    Sample sort across a process pool.
+
+    Splitters drawn from a random sample cut the value range into
+    PARALLEL_WORKERS buckets of about equal size; the elements are moved to
+    their bucket's part of the array and every bucket is merge sorted by its
+    own worker. Runs of equal values can make one bucket take most elements.
+    """
+    arr = arr.copy()
+    n = len(arr)
+    if n < 2:
+        return arr
+
+    # Seeded by the input size so runs are repeatable
+    rng = random.Random(n)
+    sample = sorted(rng.choice(arr) for _ in range(OVERSAMPLING * PARALLEL_WORKERS))
+    splitters = [sample[k * OVERSAMPLING] for k in range(1, PARALLEL_WORKERS)]
+
+    buckets = [[] for _ in range(PARALLEL_WORKERS)]
+    for value in arr:
+        buckets[bisect_right(splitters, value)].append(value)
+    k = 0
+    for bucket in buckets:
+        for value in bucket:
+            if arr[k] != value:
+                arr[k] = value
+                yield write(k, value)
+            k += 1
+
+    tasks = []
+    start = 0
+    for bucket in buckets:
+        tasks.append((bucket, start))
+        start += len(bucket)
+    results = _run_tasks(_sort_segment, tasks, n)
+    yield from _interleave([events for _, events in results])
+    return [value for result, _ in results for value in result]
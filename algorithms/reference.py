@@ -0,0 +1,90 @@
+"""
+NumPy reference sorts and result verification.
+
+Every built-in algorithm has a native counterpart: the ``np.sort`` kind that
+does the same job at compiled speed, so benchmarks can show how far the
+Python implementations are from it on arrays far too large to step through.
+
+Verification is vectorized as well: an output is valid if it is
+non-decreasing and holds exactly the input's values, checked with a
+``bincount`` when the values span a small range and a sort otherwise.
+"""
+
+from typing import Iterable, NamedTuple, Optional
+
+import numpy as np
+
+# np.sort kinds; 'mergesort' and 'stable' are currently the same stable sort
+REFERENCE_KINDS = ('quicksort', 'mergesort', 'heapsort', 'stable')
+
+# Value spans up to this multiple of the length are counted rather than sorted
+_BINCOUNT_SPAN_FACTOR = 4
+
+
+class Verification(NamedTuple):
+    """Outcome of checking an algorithm's output against its input"""
+    is_sorted: bool
+    is_permutation: bool
+    # First index i with result[i] > result[i + 1]
+    first_unsorted: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.is_sorted and self.is_permutation
+
+    def format(self) -> str:
+        problems = []
+        if not self.is_sorted:
+            problems.append(f"out of order at index {self.first_unsorted}")
+        if not self.is_permutation:
+            problems.append("not a permutation of the input")
+        return "; ".join(problems) or "sorted"
+
+
+def as_array(data: Iterable[int]) -> np.ndarray:
+    """Input as an int64 ndarray, without copying one that already is"""
+    if isinstance(data, np.ndarray) and data.dtype == np.int64:
+        return data
+    return np.asarray(data if isinstance(data, np.ndarray) else list(data), dtype=np.int64)
+
+
+def reference_sort(data: Iterable[int], kind: str = 'quicksort') -> np.ndarray:
+    """Sort with NumPy's native implementation of a sort kind"""
+    if kind not in REFERENCE_KINDS:
+        raise ValueError(f"Unknown reference sort kind: {kind}")
+    return np.sort(as_array(data), kind=kind)
+
+
+def _same_values(result: np.ndarray, original: np.ndarray, result_sorted: bool) -> bool:
+    if len(result) != len(original):
+        return False
+    if len(result) == 0:
+        return True
+    low = min(result.min(), original.min())
+    span = int(max(result.max(), original.max())) - int(low) + 1
+    if span <= _BINCOUNT_SPAN_FACTOR * len(result):
+        return np.array_equal(np.bincount(result - low, minlength=span),
+                              np.bincount(original - low, minlength=span))
+    expected = np.sort(original)
+    return np.array_equal(result if result_sorted else np.sort(result), expected)
+
+
+def verify_sorted(result: Iterable[int], original: Iterable[int]) -> Verification:
+    """
+    Check that result is the sorted order of original.
+
+    Args:
+        result: Final array produced by an algorithm
+        original: The algorithm's input
+
+    Returns:
+        Verification: Whether result is sorted and holds the same values
+    """
+    result, original = as_array(result), as_array(original)
+    descents = np.flatnonzero(result[1:] < result[:-1])
+    is_sorted = len(descents) == 0
+    return Verification(
+        is_sorted,
+        _same_values(result, original, is_sorted),
+        None if is_sorted else int(descents[0])
+    )
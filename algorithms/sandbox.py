@@ -0,0 +1,276 @@
+"""
+Sandboxed execution of untrusted sorting algorithms.
+
+A SandboxPool keeps a few worker processes warm. Each job runs in one of them
+under a CPU-time and address-space limit (``resource.setrlimit``, where the
+platform supports it) and a wall-clock timeout enforced by the parent. A worker
+that is killed, times out or is cancelled is replaced by a fresh one, so a
+runaway algorithm costs its own job but never the GUI process.
+
+Algorithm runs stream the same (kind, payload) messages as a StepWorker, and
+SandboxJob has the same start/poll/cancel interface, so callers can use either.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+try:
+    import resource
+except ImportError:  # Not available on Windows; only the wall-clock timeout applies
+    resource = None
+
+from . import tracing
+from .workers import _produce, DONE, ERROR
+
+# Job kinds sent to sandbox workers
+RUN = 'run'
+CALL = 'call'
+# Message kinds only sent by sandbox workers
+RESULT = 'result'  # Return value of a CALL job
+READY = 'ready'  # Sent once at startup, before the limits apply
+
+_POLL_INTERVAL = 0.05
+
+
+class SandboxError(RuntimeError):
+    """A sandboxed job failed, was killed or timed out"""
+
+
+class SandboxLimits(NamedTuple):
+    """Resource limits applied to every sandboxed job"""
+    cpu_seconds: int = 30
+    memory_bytes: int = 1024 * 1024 * 1024
+    wall_timeout: float = 60.0
+
+
+def _apply_memory_limit(limits: SandboxLimits) -> None:
+    if resource is None or not limits.memory_bytes:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    soft = limits.memory_bytes if hard == resource.RLIM_INFINITY else min(limits.memory_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _apply_cpu_limit(limits: SandboxLimits) -> None:
+    """Allow the next job cpu_seconds on top of the CPU time used so far"""
+    if resource is None or not limits.cpu_seconds:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    # Only the soft limit moves: an unprivileged process cannot raise the hard
+    # limit again, and exceeding the soft one delivers SIGXCPU
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + limits.cpu_seconds
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _serve(jobs, results, limits: SandboxLimits) -> None:
+    """Worker process loop: run jobs until told to stop"""
+    # Starts the queue's feeder thread while its stack can still be allocated,
+    # so a job that runs out of memory can still report it
+    results.put((READY, None))
+    _apply_memory_limit(limits)
+    # Jobs are stopped by terminating the worker, never by this event
+    never_cancelled = threading.Event()
+    while True:
+        job = jobs.get()
+        if job is None:
+            return
+        kind, payload = job
+        _apply_cpu_limit(limits)
+        if kind == RUN:
+            function, data, batch_size, instrumented, traced = payload
+            if not traced:
+                tracing.disable()
+            _produce(function, data, results, never_cancelled, batch_size, instrumented, traced)
+        else:
+            function, args = payload
+            try:
+                results.put((RESULT, function(*args)))
+            except Exception as e:
+                results.put((ERROR, f"{type(e).__name__}: {e}"))
+
+
+class _Worker:
+    """One warm sandbox process with its own job and result queues"""
+
+    def __init__(self, context, limits: SandboxLimits, max_batches: int):
+        self.jobs = context.Queue()
+        self.results = context.Queue(maxsize=max_batches)
+        self.process = context.Process(target=_serve, args=(self.jobs, self.results, limits),
+                                       daemon=True)
+        self.process.start()
+        self.busy = False
+
+    def failure(self) -> Optional[str]:
+        """Why the process died, or None while it is alive"""
+        code = self.process.exitcode
+        if code is None:
+            return None
+        if resource is not None and code == -getattr(resource, 'SIGXCPU', 24):
+            return "exceeded its CPU time limit"
+        return f"was killed (exit code {code}), e.g. for exceeding its memory limit"
+
+    def kill(self) -> None:
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join(timeout=1.0)
+        for channel in (self.jobs, self.results):
+            channel.cancel_join_thread()
+            channel.close()
+
+    def stop(self) -> None:
+        try:
+            self.jobs.put(None)
+            self.process.join(timeout=0.5)
+        finally:
+            self.kill()
+
+
+class SandboxPool:
+    """Pool of warm worker processes that run untrusted algorithms under limits"""
+
+    def __init__(self, size: int = 2, limits: SandboxLimits = SandboxLimits(),
+                 max_batches: int = 64):
+        """
+        Args:
+            size: Number of idle workers kept warm
+            limits: Resource limits for every job
+            max_batches: Result queue capacity in batches before a worker blocks
+        """
+        self.size = size
+        self.limits = limits
+        self.max_batches = max_batches
+        # Spawned rather than forked so the GUI's Qt state is never copied
+        self._context = multiprocessing.get_context('spawn')
+        self._workers: List[_Worker] = []
+
+    def start(self) -> None:
+        """Spawn the warm workers ahead of the first job"""
+        while len(self._workers) < self.size:
+            self._workers.append(_Worker(self._context, self.limits, self.max_batches))
+
+    def submit(self, function: Callable, data: Iterable[int], batch_size: int = 1024,
+               instrumented: bool = False) -> "SandboxJob":
+        """Prepare a sandboxed run of a sorting algorithm; call start() on the result"""
+        return SandboxJob(self, (RUN, (function, list(data), batch_size, instrumented,
+                                       tracing.is_enabled())))
+
+    def submit_call(self, function: Callable, *args,
+                    timeout: Optional[float] = None) -> "SandboxJob":
+        """
+        Prepare a sandboxed call of a picklable function; call start() on the result.
+
+        Its poll() eventually returns (RESULT, return value) or (ERROR, message).
+        """
+        return SandboxJob(self, (CALL, (function, args)), timeout)
+
+    def call(self, function: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run a picklable function in a sandbox worker and wait for its result.
+
+        Raises:
+            SandboxError: If the function raises, is killed or times out
+        """
+        job = self.submit_call(function, *args, timeout=timeout)
+        job.start()
+        while True:
+            message = job.poll()
+            if message is None:
+                time.sleep(_POLL_INTERVAL)
+                continue
+            kind, payload = message
+            if kind == ERROR:
+                raise SandboxError(payload)
+            return payload
+
+    def shutdown(self) -> None:
+        """Stop every worker"""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            if worker.busy:
+                worker.kill()
+            else:
+                worker.stop()
+
+    def _acquire(self) -> _Worker:
+        for worker in list(self._workers):
+            if worker.busy:
+                continue
+            if worker.failure() is not None:
+                self._workers.remove(worker)
+                worker.kill()
+                continue
+            worker.busy = True
+            return worker
+        # Every warm worker is busy; grow rather than queue behind a long run
+        worker = _Worker(self._context, self.limits, self.max_batches)
+        worker.busy = True
+        self._workers.append(worker)
+        return worker
+
+    def _release(self, worker: _Worker) -> None:
+        worker.busy = False
+        idle = [w for w in self._workers if not w.busy]
+        if len(idle) > self.size:
+            self._workers.remove(worker)
+            worker.stop()
+
+    def _discard(self, worker: _Worker) -> None:
+        """Kill a worker whose job cannot finish cleanly and keep the pool warm"""
+        if worker in self._workers:
+            self._workers.remove(worker)
+        worker.kill()
+        self.start()
+
+
+class SandboxJob:
+    """One sandboxed job, polled like a StepWorker"""
+
+    def __init__(self, pool: SandboxPool, job, timeout: Optional[float] = None):
+        self._pool = pool
+        self._job = job
+        self._timeout = pool.limits.wall_timeout if timeout is None else timeout
+        self._worker: Optional[_Worker] = None
+        self._deadline = 0.0
+
+    def start(self) -> None:
+        """Hand the job to a warm worker"""
+        self._worker = self._pool._acquire()
+        self._deadline = time.perf_counter() + self._timeout
+        self._worker.jobs.put(self._job)
+
+    def poll(self):
+        """Return the next (kind, payload) message without blocking, or None"""
+        worker = self._worker
+        if worker is None:
+            return None
+        try:
+            message = worker.results.get_nowait()
+        except queue.Empty:
+            reason = worker.failure()
+            if reason is None and time.perf_counter() > self._deadline:
+                reason = f"timed out after {self._timeout:g}s"
+            if reason is None:
+                return None
+            self._pool._discard(worker)
+            self._worker = None
+            return (ERROR, f"Sandboxed algorithm {reason}")
+
+        if message[0] == READY:
+            return self.poll()
+        if message[0] in (DONE, ERROR, RESULT):
+            self._pool._release(worker)
+            self._worker = None
+        return message
+
+    def cancel(self) -> None:
+        """Stop the job, replacing its worker if it is still running"""
+        if self._worker is not None:
+            self._pool._discard(self._worker)
+            self._worker = None
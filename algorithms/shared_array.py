@@ -0,0 +1,319 @@
+"""
+Live array transport between a worker process and the GUI.
+
+Instead of sending events, the worker applies them to an int64 array in a
+``multiprocessing.shared_memory`` block and appends the ranges it changed to
+a ring-buffer log in the same block, then bumps a sequence number. At frame
+time the GUI copies only the logged ranges into its own array, so moving
+state across processes costs about as much as touching the changed elements.
+
+Block layout (int64 throughout):
+
+    header   HEADER_FIELDS counters and flags, see the indices below
+    log      max_ranges x (start, stop) ring of changed ranges
+    array    the array being sorted
+
+The worker is the only writer of the log, array and progress counters; the
+GUI only writes TARGET (how many changes it wants applied so far) and
+CANCELLED. Log entries are written before the head moves past them and the
+GUI re-checks the head after reading, so a reader never needs a lock: a value
+copied mid-update is logged again and corrected on the next frame.
+"""
+
+import multiprocessing
+import queue
+import threading
+import time
+from multiprocessing import shared_memory
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+from . import workers
+from .steps import SWAP, WRITE, COMPARE, STEPS, WORKER, iter_events
+from .tracking import AccessCounter, AccessCounts
+
+# Header field indices
+SEQ = 0          # Number of publishes so far
+LOG_HEAD = 1     # Number of ranges ever appended to the log
+TARGET = 2       # Changes the reader wants applied (written by the reader)
+APPLIED = 3      # Changes applied so far
+STEPS_FIELD = 4
+COMPARISONS = 5
+CANCELLED = 6    # Set by the reader to stop the worker
+DONE = 7
+READS = 8        # Access counts of instrumented runs
+WRITES = 9
+VALUE_COMPARISONS = 10
+SWAPS = 11
+INSTRUMENTED = 12
+HEADER_FIELDS = 13
+
+# Changes applied between publishes while the worker is not held back
+PUBLISH_INTERVAL = 256
+_WAIT_INTERVAL = 0.001
+
+
+def _views(buffer, size: int, max_ranges: int):
+    words = np.ndarray((HEADER_FIELDS + 2 * max_ranges + size,), dtype=np.int64, buffer=buffer)
+    header = words[:HEADER_FIELDS]
+    log = words[HEADER_FIELDS:HEADER_FIELDS + 2 * max_ranges].reshape(max_ranges, 2)
+    array = words[HEADER_FIELDS + 2 * max_ranges:]
+    return header, log, array
+
+
+def _ranges(indices: Iterable[int]) -> List[List[int]]:
+    """Merge indices into sorted [start, stop) ranges"""
+    ranges: List[List[int]] = []
+    for i in sorted(indices):
+        if ranges and ranges[-1][1] == i:
+            ranges[-1][1] = i + 1
+        else:
+            ranges.append([i, i + 1])
+    return ranges
+
+
+class SharedArray:
+    """Reader side of a live array: owns the shared memory block"""
+
+    def __init__(self, data: Iterable[int], max_ranges: int = 4096):
+        """
+        Args:
+            data: Initial array
+            max_ranges: Log capacity; a reader that falls further behind
+                copies the whole array instead
+        """
+        values = np.asarray(list(data), dtype=np.int64)
+        self.size = len(values)
+        self.max_ranges = max_ranges
+        nbytes = 8 * (HEADER_FIELDS + 2 * max_ranges + self.size)
+        self._memory = shared_memory.SharedMemory(create=True, size=nbytes)
+        self._header, self._log, self._array = _views(self._memory.buf, self.size, max_ranges)
+        self._header[:] = 0
+        self._array[:] = values
+        self._cursor = 0
+        self._seen = 0
+
+    @property
+    def name(self) -> str:
+        """Name a worker attaches to"""
+        return self._memory.name
+
+    @property
+    def steps(self) -> int:
+        return int(self._header[STEPS_FIELD])
+
+    @property
+    def done(self) -> bool:
+        return bool(self._header[DONE])
+
+    def counts(self) -> Optional[AccessCounts]:
+        """Access totals published by the worker, if the run is instrumented"""
+        header = self._header
+        if not header[INSTRUMENTED]:
+            return None
+        return AccessCounts(int(header[READS]), int(header[WRITES]),
+                            int(header[VALUE_COMPARISONS]), int(header[SWAPS]))
+
+    def advance(self, changes: int) -> None:
+        """Let the worker apply this many more changes"""
+        self._header[TARGET] += changes
+
+    def sync(self, dest: np.ndarray) -> Optional[List[int]]:
+        """
+        Copy what changed since the last call into dest.
+
+        Returns:
+            The indices copied, or None if the whole array was copied
+        """
+        header, log, array = self._header, self._log, self._array
+        seq = int(header[SEQ])
+        if seq == self._seen:
+            return []
+        head = int(header[LOG_HEAD])
+        entries = log[np.arange(self._cursor, head) % self.max_ranges].tolist() \
+            if head - self._cursor <= self.max_ranges else None
+        # Entries may have been overwritten while they were read
+        if entries is None or int(header[LOG_HEAD]) - self._cursor > self.max_ranges:
+            dest[:] = array
+            changed = None
+        else:
+            changed = []
+            for start, stop in entries:
+                dest[start:stop] = array[start:stop]
+                if changed is not None:
+                    changed.extend(range(start, stop))
+                if stop - start == self.size:
+                    changed = None
+        self._cursor = head
+        self._seen = seq
+        return changed
+
+    def cancel(self) -> None:
+        """Ask the worker to stop"""
+        self._header[CANCELLED] = 1
+
+    def close(self) -> None:
+        """Release and remove the shared memory block"""
+        self._header = self._log = self._array = None
+        self._memory.close()
+        self._memory.unlink()
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block owned by the reader"""
+    # Workers are spawned and share the reader's resource tracker, so this
+    # registers nothing new; the block is only removed by SharedArray.close
+    return shared_memory.SharedMemory(name=name)
+
+
+def play_shared(function: Callable, name: str, size: int, max_ranges: int = 4096,
+                instrumented: bool = False) -> None:
+    """
+    Worker side: run an algorithm on a shared array, paced by the reader.
+
+    Args:
+        function: Sorting algorithm generator function
+        name: Name of the SharedArray block
+        size: Array length
+        max_ranges: Log capacity of the block
+        instrumented: Also publish access counts from a TrackedArray run
+    """
+    memory = _attach(name)
+    header, log, array = _views(memory.buf, size, max_ranges)
+    counter = AccessCounter() if instrumented else None
+    header[INSTRUMENTED] = int(instrumented)
+    dirty = set()
+    applied = steps = comparisons = 0
+
+    def publish():
+        ranges = _ranges(dirty)
+        head = int(header[LOG_HEAD])
+        if len(ranges) > max_ranges // 4:
+            ranges = [[0, size]]
+        for start, stop in ranges:
+            log[head % max_ranges] = (start, stop)
+            head += 1
+        dirty.clear()
+        header[APPLIED] = applied
+        header[STEPS_FIELD] = steps
+        header[COMPARISONS] = comparisons
+        if counter is not None:
+            header[READS:SWAPS + 1] = counter.snapshot()
+        header[LOG_HEAD] = head
+        header[SEQ] += 1
+
+    try:
+        pending = 0
+        for op, a, b in iter_events(function, array.tolist(), counter):
+            if op == COMPARE:
+                comparisons += 1
+                continue
+            if op == STEPS:
+                steps = a
+                continue
+            if op == WORKER:
+                continue
+            # Hold back until the reader asks for more changes
+            if applied >= header[TARGET]:
+                publish()
+                pending = 0
+                while applied >= header[TARGET]:
+                    if header[CANCELLED]:
+                        return
+                    time.sleep(_WAIT_INTERVAL)
+            if op == SWAP:
+                array[a], array[b] = array[b], array[a]
+                dirty.add(a)
+                dirty.add(b)
+            elif op == WRITE:
+                array[a] = b
+                dirty.add(a)
+            applied += 1
+            steps += 1
+            pending += 1
+            if pending >= PUBLISH_INTERVAL:
+                publish()
+                pending = 0
+        publish()
+        header[DONE] = 1
+    finally:
+        # The views must go before the block can close; publish shares these
+        # names, so they are rebound rather than deleted
+        header = log = array = None
+        memory.close()
+
+
+def _play(function: Callable, name: str, size: int, max_ranges: int, instrumented: bool,
+          results) -> None:
+    """Run play_shared and report how it ended"""
+    try:
+        play_shared(function, name, size, max_ranges, instrumented)
+        results.put((workers.DONE, None))
+    except Exception as e:
+        results.put((workers.ERROR, f"{type(e).__name__}: {e}"))
+
+
+class SharedArrayWorker:
+    """
+    Runs a trusted algorithm on a SharedArray in the background, without limits.
+
+    Custom code goes through the sandbox instead; built-in and plugin
+    algorithms may run as long as the reader keeps asking for changes. Polled
+    like a StepWorker: poll() returns (DONE, None) once the final state is
+    published, or (ERROR, message).
+    """
+
+    def __init__(self, function: Callable, shared: SharedArray, instrumented: bool = False,
+                 use_process: Optional[bool] = None):
+        """
+        Args:
+            function: Sorting algorithm generator function
+            shared: Array to sort
+            instrumented: Also publish access counts from a TrackedArray run
+            use_process: Force process (True) or thread (False) execution;
+                by default a process is used whenever the function is picklable
+        """
+        if use_process is None:
+            use_process = workers.can_run_in_process(function)
+        self.use_process = use_process
+        self._shared = shared
+        args = (function, shared.name, shared.size, shared.max_ranges, instrumented)
+        if use_process:
+            # Spawned rather than forked so the GUI's Qt state is never copied
+            context = multiprocessing.get_context('spawn')
+            self._results = context.Queue()
+            self._runner = context.Process(target=_play, args=args + (self._results,),
+                                           daemon=True)
+        else:
+            self._results = queue.Queue()
+            self._runner = threading.Thread(target=_play, args=args + (self._results,),
+                                            daemon=True)
+
+    def start(self) -> None:
+        self._runner.start()
+
+    def poll(self):
+        """Return the (kind, payload) message the run ended with, or None while it runs"""
+        try:
+            return self._results.get_nowait()
+        except queue.Empty:
+            pass
+        if self._runner.is_alive():
+            return None
+        # Ended without a message, or its message arrived since the first look
+        try:
+            return self._results.get(timeout=0.1)
+        except queue.Empty:
+            code = getattr(self._runner, 'exitcode', None)
+            return (workers.ERROR, f"Worker exited unexpectedly (exit code {code})")
+
+    def cancel(self) -> None:
+        """Stop the run"""
+        self._shared.cancel()
+        if self.use_process:
+            if self._runner.is_alive():
+                self._runner.terminate()
+            self._runner.join(timeout=1.0)
+            self._results.cancel_join_thread()
+            self._results.close()
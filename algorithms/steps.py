@@ -0,0 +1,267 @@
+"""
+Step protocol shared by sorting algorithm generators and their consumers.
+
+Algorithms yield compact events (swap, write, compare) instead of full array
+snapshots, optionally attributing them to the worker that did them, and
+consumers rebuild the array state incrementally. Generators written against
+the original ``(arr, steps)`` snapshot protocol are still accepted and
+translated into events by ``iter_events``.
+"""
+
+from typing import Callable, Generator, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+from .tracking import AccessCounter, instrument, untracked
+
+# Event opcodes
+SWAP = 0
+WRITE = 1
+COMPARE = 2
+STEPS = 3  # Emitted by the snapshot adapter to sync the step counter
+WORKER = 4
+
+# Worker id of events not done by any particular worker
+NO_WORKER = -1
+
+# An event is a plain (opcode, a, b) tuple:
+#   (SWAP, i, j)        swap arr[i] and arr[j]
+#   (WRITE, i, value)   store value at arr[i]
+#   (COMPARE, i, j)     arr[i] was compared with arr[j]
+#   (STEPS, steps, 0)   set the step counter (snapshot adapter only)
+#   (WORKER, w, 0)      the following events are done by worker w, or by
+#                       no particular worker if w is NO_WORKER
+StepEvent = Tuple[int, int, int]
+
+
+def swap(i: int, j: int) -> StepEvent:
+    """Event for swapping two elements"""
+    return (SWAP, i, j)
+
+
+def write(i: int, value: int) -> StepEvent:
+    """Event for storing a value at an index"""
+    return (WRITE, i, value)
+
+
+def compare(i: int, j: int) -> StepEvent:
+    """Event for comparing two elements"""
+    return (COMPARE, i, j)
+
+
+def worker(w: int) -> StepEvent:
+    """Event attributing the following events to a worker"""
+    return (WORKER, w, 0)
+
+
+def offset_events(events: Iterable[StepEvent], offset: int) -> Generator[StepEvent, None, Optional[List[int]]]:
+    """
+    Shift the indices of events produced on a slice that starts at offset.
+
+    Returns what the events generator returns, so a sort of a slice can be
+    delegated to with ``result = yield from offset_events(sort(part), start)``.
+    """
+    iterator = iter(events)
+    while True:
+        try:
+            op, a, b = next(iterator)
+        except StopIteration as stop:
+            return stop.value
+        if op == SWAP or op == COMPARE:
+            yield (op, a + offset, b + offset)
+        elif op == WRITE:
+            yield (op, a + offset, b)
+        else:
+            yield (op, a, b)
+
+
+def is_event(item) -> bool:
+    """Check whether a yielded item is an event rather than an (arr, steps) snapshot"""
+    return len(item) == 3
+
+
+def iter_events(function: Callable, data: Iterable[int],
+                counter: Optional[AccessCounter] = None) -> Iterator[StepEvent]:
+    """
+    Run a sorting algorithm and yield its steps as events.
+
+    Algorithms using the event protocol are passed through unchanged. For
+    algorithms yielding ``(arr, steps)`` snapshots, each snapshot is diffed
+    against the previous one and the changed positions are emitted as write
+    events, followed by a STEPS event carrying the algorithm's own counter.
+
+    Args:
+        function: Sorting algorithm generator function
+        data: Input array
+        counter: Counts the run's element accesses when given, by passing
+            the algorithm a TrackedArray instead of a list
+
+    Yields:
+        StepEvent: The next event of the run
+    """
+    previous = list(data)
+    for item in function(instrument(previous, counter)):
+        if is_event(item):
+            if counter is not None and item[0] == WRITE:
+                # Keep tracked values from counting comparisons made by consumers
+                item = (WRITE, item[1], int(item[2]))
+            yield item
+            continue
+
+        arr, steps = item
+        arr = untracked(arr)
+        for i, (old, new) in enumerate(zip(previous, arr)):
+            if old != new:
+                yield (WRITE, i, new)
+        previous = list(arr)
+        yield (STEPS, steps, 0)
+
+
+class RunResult(NamedTuple):
+    """Outcome of running an algorithm to completion"""
+    array: List[int]
+    steps: int
+    comparisons: int
+    events: int
+
+
+def _capture_return(generator, result: list):
+    """Delegate to a generator and store its return value in result"""
+    result.append((yield from generator))
+
+
+def run_to_completion(function: Callable, data: Iterable[int],
+                      counter: Optional[AccessCounter] = None) -> RunResult:
+    """
+    Run a sorting algorithm without rebuilding any intermediate array state.
+
+    Events are only counted and the final array is taken from the generator's
+    return value (event protocol) or its last snapshot (snapshot protocol).
+    Event generators that do not return their array are replayed through a
+    StepRunner to recover it.
+
+    Args:
+        function: Sorting algorithm generator function
+        data: Input array
+        counter: Counts the run's element accesses when given
+
+    Returns:
+        RunResult: Final array, step and comparison counts and number of
+            items the generator yielded
+    """
+    data = list(data)
+    returned = []
+    snapshot = None
+    steps = comparisons = events = 0
+
+    for item in _capture_return(function(instrument(data, counter)), returned):
+        events += 1
+        if len(item) == 3:
+            op = item[0]
+            if op == COMPARE:
+                comparisons += 1
+            elif op == STEPS:
+                steps = item[1]
+            elif op != WORKER:
+                steps += 1
+        else:
+            snapshot, steps = item
+
+    if snapshot is not None:
+        array = untracked(snapshot)
+    elif returned[0] is not None:
+        array = untracked(returned[0])
+    else:
+        runner = StepRunner(function, data)
+        while runner.step() is not None:
+            pass
+        array = runner.state.array
+    return RunResult(array, steps, comparisons, events)
+
+
+class ArrayState:
+    """Array state rebuilt incrementally from step events"""
+    __slots__ = ('array', 'steps', 'comparisons', 'dirty', 'last_event', 'worker', 'owners')
+
+    def __init__(self, data: Iterable[int]):
+        self.array: List[int] = list(data)
+        self.steps = 0
+        self.comparisons = 0
+        self.dirty: Set[int] = set()
+        self.last_event: Optional[StepEvent] = None
+        # Worker of the current events, and the worker that last moved each
+        # element; owners stays None until a run reports a worker
+        self.worker = NO_WORKER
+        self.owners: Optional[List[int]] = None
+
+    def apply(self, event: StepEvent) -> None:
+        """Apply a single event to the array state"""
+        op, a, b = event
+        if op == SWAP:
+            arr = self.array
+            arr[a], arr[b] = arr[b], arr[a]
+            self.steps += 1
+            self.dirty.add(a)
+            self.dirty.add(b)
+            if self.owners is not None:
+                self.owners[a] = self.owners[b] = self.worker
+        elif op == WRITE:
+            self.array[a] = b
+            self.steps += 1
+            self.dirty.add(a)
+            if self.owners is not None:
+                self.owners[a] = self.worker
+        elif op == COMPARE:
+            self.comparisons += 1
+        elif op == STEPS:
+            self.steps = a
+        elif op == WORKER:
+            self.worker = a
+            if self.owners is None and a != NO_WORKER:
+                self.owners = [NO_WORKER] * len(self.array)
+        else:
+            raise ValueError(f"Unknown step event: {event!r}")
+        self.last_event = event
+
+    def take_dirty(self) -> Set[int]:
+        """Return the indices changed since the last call and reset the set"""
+        dirty = self.dirty
+        self.dirty = set()
+        return dirty
+
+
+class StepRunner:
+    """Drives a sorting algorithm and keeps an ArrayState in sync with it"""
+
+    def __init__(self, function: Callable, data: Iterable[int]):
+        data = list(data)
+        self.state = ArrayState(data)
+        self._events = iter_events(function, data)
+        self.finished = False
+
+    def step(self) -> Optional[StepEvent]:
+        """Apply the next event, returning None once the algorithm is done"""
+        if self.finished:
+            return None
+        try:
+            event = next(self._events)
+        except StopIteration:
+            self.finished = True
+            return None
+        self.state.apply(event)
+        return event
+
+    def advance(self) -> bool:
+        """
+        Apply events up to and including the next one that changes the array.
+
+        Returns:
+            bool: False once the algorithm has finished
+        """
+        event = self.step()
+        while event is not None and (event[0] == COMPARE or event[0] == WORKER):
+            event = self.step()
+        return event is not None
+
+    def close(self) -> None:
+        """Release the event source"""
+        self.finished = True
+        self._events.close()
@@ -0,0 +1,282 @@
+"""
+On-disk store of custom algorithms, kept across sessions.
+
+Layout of the store directory:
+
+    index.json                  names and per-source entries, see below
+    <hash>.py                   source of each algorithm
+    <hash>.<cache tag>.marshal  code object compiled from the source by one
+                                Python version, prefixed with its magic number
+
+Entries are keyed by the SHA-256 of the source, so saving the same code
+under another name reuses its compiled code and complexity analysis. An
+entry records the interpreter its analysis ran on: the code object and the
+analysis are only invalidated when the source or the Python version
+changes. Reading the index at startup loads no algorithm; each one's source
+and code object are read the first time it runs.
+"""
+
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+from .complexity import ComplexityEstimate
+from .custom import CustomAlgorithm, compile_code
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+_INDEX = 'index.json'
+# Identifies the interpreter that compiled a code object or ran an analysis
+_PYTHON = sys.implementation.cache_tag or sys.implementation.name
+_MAGIC = importlib.util.MAGIC_NUMBER
+
+
+def default_store_dir() -> str:
+    """Per-user data directory the GUI keeps custom algorithms in"""
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return os.path.join(base, 'sorting-visualizer', 'algorithms')
+
+
+def source_hash(code: str) -> str:
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
+def benchmark_metadata(estimate: ComplexityEstimate, seconds: float) -> Dict:
+    """JSON-serializable measurements of a complexity analysis"""
+    return {
+        'confidence': estimate.confidence,
+        'sizes': list(estimate.sizes),
+        'operations': list(estimate.operations),
+        'timings': list(estimate.timings),
+        'analysis_time': seconds,
+    }
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Replace a file in one step, so a crash never leaves it half written"""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class StoredAlgorithm(CustomAlgorithm):
+    """Custom algorithm whose source and code object are read from the store on first use"""
+
+    def __init__(self, store: 'AlgorithmStore', digest: str):
+        self._store = store
+        self.digest = digest
+        self._code: Optional[str] = None
+        self._compiled: Optional[bytes] = None
+        self._function = None
+
+    @property
+    def code(self) -> str:
+        if self._code is None:
+            self._code = self._store.read_source(self.digest)
+        return self._code
+
+    @property
+    def compiled(self) -> Optional[bytes]:
+        if self._compiled is None:
+            self._compiled = self._store.read_compiled(self.digest, self.code)
+        return self._compiled
+
+    def __reduce__(self):
+        # Sent to the sandbox as a plain CustomAlgorithm: workers never touch the store
+        return CustomAlgorithm, (self.code, self.compiled)
+
+
+class AlgorithmStore:
+    """Custom algorithms saved by name, with their compiled code and complexity analysis"""
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Args:
+            directory: Store location, created on first save; the per-user
+                data directory by default
+        """
+        self.directory = directory or default_store_dir()
+        self._index: Optional[Dict] = None
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    @property
+    def index(self) -> Dict:
+        if self._index is None:
+            self._index = self._read_index()
+        return self._index
+
+    def _read_index(self) -> Dict:
+        empty = {'version': STORE_VERSION, 'names': {}, 'entries': {}}
+        try:
+            with open(self._path(_INDEX), 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            return empty
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable algorithm store %s: %s", self.directory, e)
+            return empty
+        if index.get('version') != STORE_VERSION:
+            logger.warning("Ignoring algorithm store %s of version %r",
+                           self.directory, index.get('version'))
+            return empty
+        return index
+
+    def _write_index(self) -> None:
+        data = json.dumps(self.index, indent=2, sort_keys=True).encode('utf-8')
+        _write_atomic(self._path(_INDEX), data)
+
+    def names(self) -> List[str]:
+        """Names of the stored algorithms, in the order they were saved"""
+        return list(self.index['names'])
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index['names']
+
+    def get(self, name: str) -> Optional[StoredAlgorithm]:
+        """The stored algorithm, loaded when first run, or None if there is none"""
+        digest = self.index['names'].get(name)
+        return None if digest is None else StoredAlgorithm(self, digest)
+
+    def _entry(self, digest: str) -> Optional[Dict]:
+        """The entry of a source, if its analysis ran on this Python version"""
+        entry = self.index['entries'].get(digest)
+        if entry is None or entry.get('python') != _PYTHON:
+            return None
+        return entry
+
+    def complexity(self, name: str) -> Optional[str]:
+        """Cached complexity label of a stored algorithm, or None if it is stale or missing"""
+        digest = self.index['names'].get(name)
+        entry = None if digest is None else self._entry(digest)
+        return None if entry is None else entry.get('complexity')
+
+    def lookup(self, code: str) -> Optional[Dict]:
+        """
+        Cached analysis of some source, saved under any name.
+
+        Returns:
+            Optional[Dict]: The entry's 'complexity' label and 'benchmark'
+            metadata, or None if the source was never analyzed on this
+            Python version
+        """
+        return self._entry(source_hash(code))
+
+    def save(self, name: str, code: str, complexity: Optional[str] = None,
+             benchmark: Optional[Dict] = None) -> StoredAlgorithm:
+        """
+        Store an algorithm under a name, replacing any stored under it before.
+
+        Args:
+            name: Name the algorithm is saved under
+            code: Its source
+            complexity: Complexity label of the analysis, if one ran
+            benchmark: Measurements of the analysis, see benchmark_metadata
+
+        Raises:
+            SyntaxError: If the code cannot be compiled
+            OSError: If the store cannot be written
+        """
+        digest = source_hash(code)
+        compiled = compile_code(code)
+        os.makedirs(self.directory, exist_ok=True)
+        _write_atomic(self._path(f'{digest}.py'), code.encode('utf-8'))
+        _write_atomic(self._compiled_path(digest), _MAGIC + compiled)
+
+        entry = self.index['entries'].get(digest) or {}
+        if entry.get('python') != _PYTHON:
+            entry = {'python': _PYTHON}
+        if complexity is not None:
+            entry['complexity'] = complexity
+        if benchmark is not None:
+            entry['benchmark'] = benchmark
+        self.index['entries'][digest] = entry
+        self.index['names'][name] = digest
+        self._write_index()
+
+        algorithm = StoredAlgorithm(self, digest)
+        algorithm._code, algorithm._compiled = code, compiled
+        return algorithm
+
+    def record_analysis(self, code: str, complexity: str, benchmark: Optional[Dict] = None) -> bool:
+        """
+        Attach a complexity analysis to stored source, under every name it is saved as.
+
+        Returns:
+            bool: False if no stored algorithm has this source
+
+        Raises:
+            OSError: If the store cannot be written
+        """
+        digest = source_hash(code)
+        if digest not in self.index['entries']:
+            return False
+        entry = {'python': _PYTHON, 'complexity': complexity}
+        if benchmark is not None:
+            entry['benchmark'] = benchmark
+        self.index['entries'][digest] = entry
+        self._write_index()
+        return True
+
+    def remove(self, name: str) -> None:
+        """Forget a stored algorithm, deleting its files if no other name uses them"""
+        digest = self.index['names'].pop(name, None)
+        if digest is None:
+            return
+        if digest not in self.index['names'].values():
+            del self.index['entries'][digest]
+            for filename in os.listdir(self.directory):
+                if filename.startswith(digest):
+                    os.unlink(self._path(filename))
+        self._write_index()
+
+    def _compiled_path(self, digest: str) -> str:
+        return self._path(f'{digest}.{_PYTHON}.marshal')
+
+    def read_source(self, digest: str) -> str:
+        with open(self._path(f'{digest}.py'), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def read_compiled(self, digest: str, code: str) -> Optional[bytes]:
+        """
+        Marshalled code object of a stored source, compiled again if this
+        Python version has none.
+
+        Returns:
+            Optional[bytes]: The code object, or None if the source no
+            longer compiles, leaving the error to surface when it runs
+        """
+        path = self._compiled_path(digest)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if data[:len(_MAGIC)] == _MAGIC:
+                return data[len(_MAGIC):]
+        except OSError:
+            pass
+        try:
+            compiled = compile_code(code)
+        except SyntaxError:
+            return None
+        try:
+            _write_atomic(path, _MAGIC + compiled)
+        except OSError as e:
+            logger.warning("Could not cache compiled code in %s: %s", self.directory, e)
+        return compiled
@@ -0,0 +1,376 @@
+"""
+Recorded algorithm runs with seekable replay.
+
+A Trace stores the event stream of one run in compact typed arrays. Every
+CHECKPOINT_INTERVAL events it also records a checkpoint: the step counters
+and the values of the array slots changed since the previous checkpoint.
+Full keyframes of the array are kept at checkpoints too, at first at every
+one, and spilled to an anonymous temporary file; a trace whose keyframes
+outgrow KEYFRAME_BUDGET drops every other keyframe, but never a checkpoint.
+
+A TraceCursor replays a trace from any position. Nearby positions are
+reached by applying or undoing events one at a time. For distant ones the
+cursor rebuilds the nearest checkpoint, before or after the target, from the
+keyframe at or before it plus the changes recorded since, applied with
+numpy, and then replays the events in between. A seek thus costs one copy of
+the array, one vectorised assignment per checkpoint since the keyframe, and
+at most CHECKPOINT_INTERVAL / 2 events replayed one by one, however long
+the run.
+"""
+
+import os
+import shutil
+import tempfile
+import weakref
+from array import array
+from bisect import bisect_right
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .steps import SWAP, WRITE, COMPARE, STEPS, WORKER, StepEvent, ArrayState, iter_events
+from .tracking import AccessCounter, AccessCounts, COUNT_INTERVAL
+
+# Keyframe state: (int64 array values, steps, comparisons)
+Keyframe = Tuple[memoryview, int, int]
+
+# Events between checkpoints, and at first between keyframes
+CHECKPOINT_INTERVAL = 4096
+# Bytes of keyframe states spilled to disk per trace before they are thinned out
+KEYFRAME_BUDGET = 256 * 1024 * 1024
+
+
+def record_previous(head: ArrayState, event: StepEvent) -> int:
+    """What an event is about to overwrite in the head state, needed to undo it"""
+    op, a, _ = event
+    if op == WRITE:
+        return head.array[a]
+    if op == STEPS:
+        return head.steps
+    if op == WORKER:
+        return head.worker
+    return 0
+
+
+class KeyframeStore:
+    """Array states at every `interval` events, kept in an anonymous temporary file"""
+
+    def __init__(self, initial: List[int], interval: int):
+        self.size = len(initial)
+        self.interval = interval
+        # (steps, comparisons) of each keyframe
+        self.index = array('q')
+        self._file = tempfile.TemporaryFile()
+        self._finalizer = weakref.finalize(self, self._file.close)
+        self.add(0, initial, 0, 0)
+
+    def __len__(self) -> int:
+        return len(self.index) // 2
+
+    def __getitem__(self, j: int) -> Keyframe:
+        if not 0 <= j < len(self):
+            raise IndexError(j)
+        state_bytes = 8 * self.size
+        self._file.seek(j * state_bytes)
+        values = memoryview(self._file.read(state_bytes)).cast('q')
+        return values, self.index[2 * j], self.index[2 * j + 1]
+
+    def add(self, position: int, values: List[int], steps: int, comparisons: int) -> None:
+        """
+        Keep the state after `position` events if a keyframe is due there.
+
+        Once the states outgrow KEYFRAME_BUDGET every other one is dropped
+        and the interval doubles.
+        """
+        if position % self.interval:
+            return
+        self._file.seek(0, os.SEEK_END)
+        array('q', values).tofile(self._file)
+        self.index.extend((steps, comparisons))
+        if len(self) > 2 and len(self) * 8 * self.size > KEYFRAME_BUDGET:
+            self._thin()
+
+    def _thin(self) -> None:
+        state_bytes = 8 * self.size
+        count = len(self)
+        # Keyframe j moves to j / 2, always towards the start of the file
+        for j in range(2, count, 2):
+            self._file.seek(j * state_bytes)
+            state = self._file.read(state_bytes)
+            self._file.seek(j // 2 * state_bytes)
+            self._file.write(state)
+        self._file.truncate((count + 1) // 2 * state_bytes)
+        kept = array('q')
+        for j in range(0, count, 2):
+            kept.extend(self.index[2 * j:2 * j + 2])
+        self.index = kept
+        self.interval *= 2
+
+    def write_to(self, file) -> None:
+        """Copy the states, followed by their index, to a file"""
+        self._file.seek(0)
+        shutil.copyfileobj(self._file, file)
+        self.index.tofile(file)
+
+    def close(self) -> None:
+        """Delete the temporary file"""
+        self._finalizer()
+
+
+class Trace:
+    """Event stream of one algorithm run with periodic keyframes"""
+
+    def __init__(self, data: Iterable[int], checkpoint_interval: Optional[int] = None):
+        """
+        Args:
+            data: Input array of the run
+            checkpoint_interval: Events between checkpoints, by default
+                CHECKPOINT_INTERVAL
+        """
+        self.initial: List[int] = list(data)
+        self.checkpoint_interval = checkpoint_interval or CHECKPOINT_INTERVAL
+        self.complete = False
+
+        # One column per event field; `previous` holds what an event
+        # overwrote (old value for writes, old counter for STEPS, old worker
+        # for WORKER) so it can be undone
+        self.ops = array('b')
+        self.first = array('q')
+        self.second = array('q')
+        self.previous = array('q')
+
+        self._head = ArrayState(self.initial)
+        self.keyframes = KeyframeStore(self.initial, self.checkpoint_interval)
+
+        # Checkpoint c holds the counters after c * checkpoint_interval events
+        # and, in changes[change_offsets[c - 1]:change_offsets[c]], the
+        # (index, value) pairs of the slots changed since checkpoint c - 1
+        self.checkpoint_counts = array('q', [0, 0])
+        self.change_offsets = array('q', [0])
+        self.changes = array('q')
+
+        # Access totals of instrumented runs, sampled at event positions
+        self.count_positions = array('q')
+        self.counts: List[AccessCounts] = []
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    @property
+    def checkpoint_count(self) -> int:
+        return len(self.change_offsets)
+
+    @property
+    def keyframe_interval(self) -> int:
+        return self.keyframes.interval
+
+    def append(self, event: StepEvent) -> None:
+        """Record the next event of the run"""
+        op, a, b = event
+        head = self._head
+        previous = record_previous(head, event)
+        head.apply(event)
+
+        self.ops.append(op)
+        self.first.append(a)
+        self.second.append(b)
+        self.previous.append(previous)
+
+        if len(self.ops) % self.checkpoint_interval == 0:
+            self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        head = self._head
+        values = head.array
+        for index in head.take_dirty():
+            self.changes.extend((index, values[index]))
+        self.change_offsets.append(len(self.changes))
+        self.checkpoint_counts.extend((head.steps, head.comparisons))
+        self.keyframes.add(len(self.ops), values, head.steps, head.comparisons)
+
+    def extend(self, events: Iterable[StepEvent]) -> None:
+        """Record several events"""
+        for event in events:
+            self.append(event)
+
+    def mark_counts(self, position: int, counts: AccessCounts) -> None:
+        """Record the access totals of the run after `position` events"""
+        self.count_positions.append(position)
+        self.counts.append(counts)
+
+    def counts_at(self, position: int) -> Optional[AccessCounts]:
+        """Access totals at the latest sample at or before a position, if instrumented"""
+        sample = bisect_right(self.count_positions, position) - 1
+        return self.counts[sample] if sample >= 0 else None
+
+    def finish(self) -> None:
+        """Mark the run as fully recorded"""
+        self.complete = True
+        self._head.dirty.clear()
+
+    @property
+    def final_state(self) -> ArrayState:
+        """Array state after the last recorded event"""
+        return self._head
+
+    def event(self, position: int) -> Tuple[int, int, int, int]:
+        """The (op, a, b, previous) record of the event at a position"""
+        return self.ops[position], self.first[position], self.second[position], self.previous[position]
+
+
+def record_trace(function: Callable, data: Iterable[int],
+                 checkpoint_interval: Optional[int] = None,
+                 counter: Optional[AccessCounter] = None) -> Trace:
+    """Run an algorithm to completion and record its trace"""
+    data = list(data)
+    trace = Trace(data, checkpoint_interval)
+    if counter is None:
+        trace.extend(iter_events(function, data))
+    else:
+        trace.mark_counts(0, counter.snapshot())
+        for event in iter_events(function, data, counter):
+            trace.append(event)
+            if len(trace) % COUNT_INTERVAL == 0:
+                trace.mark_counts(len(trace), counter.snapshot())
+        trace.mark_counts(len(trace), counter.snapshot())
+    trace.finish()
+    return trace
+
+
+class TraceCursor:
+    """Position within a Trace together with the array state at that position"""
+
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self.position = 0
+        self.state = ArrayState(trace.initial)
+        self._full_redraw = True
+
+    def take_changed(self) -> Optional[Set[int]]:
+        """Indices changed since the last call, or None if everything may have changed"""
+        if self._full_redraw:
+            self._full_redraw = False
+            self.state.dirty.clear()
+            return None
+        return self.state.take_dirty()
+
+    def seek(self, position: int) -> None:
+        """Move to the state after `position` events"""
+        trace = self.trace
+        position = max(0, min(position, len(trace)))
+        interval = trace.checkpoint_interval
+
+        # Jump via the nearest checkpoint, before or after the target, when it
+        # is closer than walking event by event
+        checkpoint = position // interval
+        if checkpoint + 1 < trace.checkpoint_count and \
+                (checkpoint + 1) * interval - position < position - checkpoint * interval:
+            checkpoint += 1
+        if abs(position - self.position) > abs(position - checkpoint * interval):
+            self._load_checkpoint(checkpoint)
+
+        while self.position < position:
+            self._apply(self.position)
+            self.position += 1
+        while self.position > position:
+            self.position -= 1
+            self._undo(self.position)
+
+    def step_forward(self) -> bool:
+        """Move past the next event that changes the array; False at the end"""
+        trace = self.trace
+        while self.position < len(trace):
+            op = trace.ops[self.position]
+            self._apply(self.position)
+            self.position += 1
+            if op != COMPARE and op != WORKER:
+                return True
+        return False
+
+    def step_backward(self) -> bool:
+        """Undo back to before the previous event that changes the array; False at the start"""
+        trace = self.trace
+        while self.position > 0:
+            self.position -= 1
+            op = trace.ops[self.position]
+            self._undo(self.position)
+            if op != COMPARE and op != WORKER:
+                return True
+        return False
+
+    @property
+    def at_end(self) -> bool:
+        return self.position >= len(self.trace)
+
+    def _load_checkpoint(self, index: int) -> None:
+        trace = self.trace
+        per_keyframe = trace.keyframe_interval // trace.checkpoint_interval
+        first = index - index % per_keyframe
+        values = np.array(np.frombuffer(trace.keyframes[first // per_keyframe][0], dtype=np.int64))
+
+        # Each checkpoint changes an index at most once, so one assignment
+        # per checkpoint applies its changes exactly
+        offsets = trace.change_offsets
+        base = offsets[first]
+        changes = np.frombuffer(memoryview(trace.changes)[base:offsets[index]], dtype=np.int64)
+        for checkpoint in range(first + 1, index + 1):
+            pairs = changes[offsets[checkpoint - 1] - base:offsets[checkpoint] - base]
+            values[pairs[0::2]] = pairs[1::2]
+
+        self.state.array = values.tolist()
+        self.state.steps = trace.checkpoint_counts[2 * index]
+        self.state.comparisons = trace.checkpoint_counts[2 * index + 1]
+        self.position = index * trace.checkpoint_interval
+        self._full_redraw = True
+
+    def _apply(self, position: int) -> None:
+        trace = self.trace
+        self.state.apply((trace.ops[position], trace.first[position], trace.second[position]))
+
+    def _undo(self, position: int) -> None:
+        op, a, b, previous = self.trace.event(position)
+        state = self.state
+        if op == SWAP:
+            arr = state.array
+            arr[a], arr[b] = arr[b], arr[a]
+            state.steps -= 1
+            state.dirty.add(a)
+            state.dirty.add(b)
+        elif op == WRITE:
+            state.array[a] = previous
+            state.steps -= 1
+            state.dirty.add(a)
+        elif op == COMPARE:
+            state.comparisons -= 1
+        elif op == STEPS:
+            state.steps = previous
+        elif op == WORKER:
+            # Owners are not rewound: they show who last moved each element
+            # in the order the run was played
+            state.worker = previous
+
+
+class TraceCache:
+    """Least recently used store of completed traces keyed by (algorithm, input)"""
+
+    def __init__(self, max_entries: int = 8):
+        self.max_entries = max_entries
+        self._traces: "OrderedDict[Tuple[Hashable, int], Trace]" = OrderedDict()
+
+    def get(self, algorithm: Hashable, data: List[int]) -> Optional[Trace]:
+        """Return the recorded trace for this algorithm and input, if any"""
+        key = (algorithm, hash(tuple(data)))
+        trace = self._traces.get(key)
+        if trace is None or trace.initial != data:
+            return None
+        self._traces.move_to_end(key)
+        return trace
+
+    def put(self, algorithm: Hashable, trace: Trace) -> None:
+        """Store a completed trace"""
+        key = (algorithm, hash(tuple(trace.initial)))
+        self._traces[key] = trace
+        self._traces.move_to_end(key)
+        while len(self._traces) > self.max_entries:
+            self._traces.popitem(last=False)
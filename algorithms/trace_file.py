@@ -0,0 +1,298 @@
+"""
+Binary trace files with memory-mapped reading.
+
+Layout (all integers in the byte order recorded in the header):
+
+    header          fixed-size struct, see _HEADER
+    metadata        JSON (algorithm name, complexity, access count samples),
+                    padded to 8 bytes
+    initial array   size x int64
+    events          event_count fixed-width records of 4 x int64:
+                    (op, a, b, previous)
+    keyframes       keyframe_count x size x int64 array states
+    keyframe index  keyframe_count x (steps, comparisons) int64 pairs
+    checkpoints     checkpoint_count x (steps, comparisons) int64 pairs
+    change offsets  checkpoint_count x int64 end offsets into the changes
+    changes         change_count x int64, (index, value) pairs
+
+Keyframe j holds the state after j * keyframe_interval events and
+checkpoint c the counters and changes after c * checkpoint_interval events,
+as described in the trace module. A MappedTrace reads the file through mmap and exposes the same interface as
+an in-memory Trace, so opening a file is instant regardless of its size and
+a TraceCursor seek only touches the pages of one keyframe and the changes
+and events replayed after it.
+"""
+
+import json
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_right
+from typing import Callable, Dict, Iterable, List, Optional
+
+from .steps import StepEvent, ArrayState, iter_events
+from .trace import CHECKPOINT_INTERVAL, Keyframe, KeyframeStore, record_previous
+from .tracking import AccessCounts
+
+MAGIC = b'SVTRACE2'
+_HEADER = struct.Struct('<8sBB6xQQQQQQQQQQQQ')
+_BYTE_ORDERS = {'little': 0, 'big': 1}
+_FIELDS_PER_EVENT = 4
+_FLUSH_EVENTS = 65536
+
+
+class TraceWriter:
+    """Streams the events of a run to a trace file as they are produced"""
+
+    def __init__(self, path: str, data: Iterable[int], checkpoint_interval: Optional[int] = None,
+                 metadata: Optional[Dict] = None):
+        """
+        Args:
+            path: Output file
+            data: Input array of the run
+            checkpoint_interval: Events between checkpoints, by default
+                CHECKPOINT_INTERVAL
+            metadata: JSON-serializable details stored with the trace, such as
+                the algorithm name and complexity
+        """
+        self.initial = list(data)
+        self.checkpoint_interval = checkpoint_interval or CHECKPOINT_INTERVAL
+        self.event_count = 0
+        # Cleared by callers that stop a run early
+        self.complete = True
+
+        self._head = ArrayState(self.initial)
+        self._buffer = array('q')
+        self._keyframes = KeyframeStore(self.initial, self.checkpoint_interval)
+        self._checkpoint_counts = array('q', [0, 0])
+        self._change_offsets = array('q', [0])
+        self._change_count = 0
+        self._changes = tempfile.TemporaryFile()
+
+        self._file = open(path, 'wb')
+        meta = json.dumps(metadata or {}).encode('utf-8')
+        self._metadata = meta + b' ' * (-len(meta) % 8)
+        self._file.write(b'\0' * _HEADER.size)
+        self._file.write(self._metadata)
+        self._initial_offset = self._file.tell()
+        array('q', self.initial).tofile(self._file)
+        self._events_offset = self._file.tell()
+
+    def append(self, event: StepEvent) -> None:
+        """Write the next event of the run"""
+        op, a, b = event
+        previous = record_previous(self._head, event)
+        self._head.apply(event)
+        self._buffer.extend((op, a, b, previous))
+        self.event_count += 1
+
+        if self.event_count % self.checkpoint_interval == 0:
+            self._checkpoint()
+        if len(self._buffer) >= _FLUSH_EVENTS * _FIELDS_PER_EVENT:
+            self._flush()
+
+    def _checkpoint(self) -> None:
+        head = self._head
+        values = head.array
+        changes = array('q')
+        for index in head.take_dirty():
+            changes.extend((index, values[index]))
+        changes.tofile(self._changes)
+        self._change_count += len(changes)
+        self._change_offsets.append(self._change_count)
+        self._checkpoint_counts.extend((head.steps, head.comparisons))
+        self._keyframes.add(self.event_count, values, head.steps, head.comparisons)
+
+    @property
+    def keyframe_interval(self) -> int:
+        return self._keyframes.interval
+
+    def extend(self, events: Iterable[StepEvent]) -> None:
+        """Write several events"""
+        for event in events:
+            self.append(event)
+
+    def _flush(self) -> None:
+        self._buffer.tofile(self._file)
+        self._buffer = array('q')
+
+    def close(self) -> None:
+        """Write the keyframes and header and close the file"""
+        if self._file.closed:
+            return
+        self._flush()
+        keyframes_offset = self._file.tell()
+        self._keyframes.write_to(self._file)
+        self._keyframes.close()
+        checkpoints_offset = self._file.tell()
+        self._checkpoint_counts.tofile(self._file)
+        self._change_offsets.tofile(self._file)
+        self._changes.seek(0)
+        shutil.copyfileobj(self._changes, self._file)
+        self._changes.close()
+
+        self._file.seek(0)
+        self._file.write(_HEADER.pack(
+            MAGIC, _BYTE_ORDERS[sys.byteorder], int(self.complete),
+            len(self.initial), self.event_count, self.keyframe_interval,
+            len(self._keyframes), len(self._metadata),
+            self._initial_offset, self._events_offset, keyframes_offset,
+            self.checkpoint_interval, len(self._change_offsets), self._change_count,
+            checkpoints_offset
+        ))
+        self._file.close()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is not None:
+            self.complete = False
+        self.close()
+
+
+def write_trace_file(trace, path: str, metadata: Optional[Dict] = None) -> None:
+    """Save a recorded trace (in memory or mapped) to a trace file"""
+    metadata = dict(metadata or {})
+    if trace.counts:
+        metadata['access_counts'] = [[position, *counts] for position, counts
+                                     in zip(trace.count_positions, trace.counts)]
+    with TraceWriter(path, trace.initial, trace.checkpoint_interval, metadata) as writer:
+        ops, first, second = trace.ops, trace.first, trace.second
+        for position in range(len(trace)):
+            writer.append((ops[position], first[position], second[position]))
+        writer.complete = trace.complete
+
+
+def record_trace_file(function: Callable, data: Iterable[int], path: str,
+                      checkpoint_interval: Optional[int] = None,
+                      metadata: Optional[Dict] = None) -> int:
+    """
+    Run an algorithm and stream its trace straight to a file.
+
+    Returns:
+        int: Number of events written
+    """
+    data = list(data)
+    with TraceWriter(path, data, checkpoint_interval, metadata) as writer:
+        writer.extend(iter_events(function, data))
+    return writer.event_count
+
+
+class _MappedKeyframes:
+    """Keyframe states read lazily from a mapped trace file"""
+
+    def __init__(self, states: memoryview, index: memoryview, size: int):
+        self._states = states
+        self._index = index
+        self._size = size
+
+    def __len__(self) -> int:
+        return len(self._index) // 2
+
+    def __getitem__(self, j: int) -> Keyframe:
+        if not 0 <= j < len(self):
+            raise IndexError(j)
+        size = self._size
+        return self._states[j * size:(j + 1) * size], self._index[2 * j], self._index[2 * j + 1]
+
+
+class MappedTrace:
+    """Read-only trace backed by a memory-mapped trace file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._open()
+        except Exception:
+            self.close()
+            raise
+
+    def _open(self) -> None:
+        if len(self._map) < _HEADER.size:
+            raise ValueError(f"{self.path} is truncated")
+        (magic, byte_order, complete, size, event_count, interval, keyframe_count,
+         metadata_length, initial_offset, events_offset, keyframes_offset,
+         checkpoint_interval, checkpoint_count, change_count, checkpoints_offset) = \
+            _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a trace file")
+        if byte_order != _BYTE_ORDERS[sys.byteorder]:
+            raise ValueError(f"{self.path} was written on a machine with a different byte order")
+        # Sections follow each other, so the changes must end within the file
+        changes_offset = checkpoints_offset + checkpoint_count * 24
+        if not (_HEADER.size + metadata_length <= initial_offset
+                and initial_offset + size * 8 <= events_offset
+                and events_offset + event_count * _FIELDS_PER_EVENT * 8 <= keyframes_offset
+                and keyframes_offset + keyframe_count * (size * 8 + 16) <= checkpoints_offset
+                and changes_offset + change_count * 8 <= len(self._map)):
+            raise ValueError(f"{self.path} is truncated")
+
+        self.complete = bool(complete)
+        self.keyframe_interval = interval
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_count = checkpoint_count
+        self._length = event_count
+        start = _HEADER.size
+        self.metadata = json.loads(bytes(self._map[start:start + metadata_length]) or b'{}')
+        samples = self.metadata.pop('access_counts', [])
+        self.count_positions = [sample[0] for sample in samples]
+        self.counts = [AccessCounts(*sample[1:]) for sample in samples]
+
+        # Zero-copy views; pages are only read from disk when indexed
+        self._views: List[memoryview] = []
+        view = self._track(memoryview(self._map))
+        self.initial = self._track(view[initial_offset:initial_offset + size * 8].cast('q')).tolist()
+        records = self._track(
+            view[events_offset:events_offset + event_count * _FIELDS_PER_EVENT * 8].cast('q'))
+        self.ops = self._track(records[0::_FIELDS_PER_EVENT])
+        self.first = self._track(records[1::_FIELDS_PER_EVENT])
+        self.second = self._track(records[2::_FIELDS_PER_EVENT])
+        self.previous = self._track(records[3::_FIELDS_PER_EVENT])
+
+        index_offset = keyframes_offset + keyframe_count * size * 8
+        states = self._track(view[keyframes_offset:index_offset].cast('q'))
+        index = self._track(view[index_offset:index_offset + keyframe_count * 16].cast('q'))
+        self.keyframes = _MappedKeyframes(states, index, size)
+
+        offsets_offset = checkpoints_offset + checkpoint_count * 16
+        self.checkpoint_counts = self._track(view[checkpoints_offset:offsets_offset].cast('q'))
+        self.change_offsets = self._track(view[offsets_offset:changes_offset].cast('q'))
+        self.changes = self._track(
+            view[changes_offset:changes_offset + change_count * 8].cast('q'))
+
+    def _track(self, view: memoryview) -> memoryview:
+        self._views.append(view)
+        return view
+
+    def __len__(self) -> int:
+        return self._length
+
+    def event(self, position: int):
+        """The (op, a, b, previous) record of the event at a position"""
+        return self.ops[position], self.first[position], self.second[position], self.previous[position]
+
+    def counts_at(self, position: int) -> Optional[AccessCounts]:
+        """Access totals at the latest sample at or before a position, if instrumented"""
+        sample = bisect_right(self.count_positions, position) - 1
+        return self.counts[sample] if sample >= 0 else None
+
+    def close(self) -> None:
+        """Release the mapping and the file"""
+        for view in reversed(getattr(self, '_views', [])):
+            view.release()
+        self._views = []
+        if hasattr(self, '_map'):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedTrace":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
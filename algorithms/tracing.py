@@ -0,0 +1,160 @@
+"""
+Span tracing in the Chrome Trace Event format.
+
+    tracing.enable()
+    with tracing.span("load", path=path):
+        ...
+
+    @tracing.traced()
+    def render(): ...
+
+    tracing.write("run.json")  # open in chrome://tracing or ui.perfetto.dev
+
+Tracing is off by default. While it is off, span() hands out one shared
+no-op context manager and traced functions check a single global before
+calling straight through, so instrumented code costs next to nothing.
+Spans are stamped with time.perf_counter_ns, which every process on the
+machine shares, so spans recorded in worker processes can be shipped back
+with take() and merged with add() into one timeline.
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+
+# Environment variable naming the file the GUI writes its trace to on exit
+TRACE_ENV = 'SORTING_VISUALIZER_TRACE'
+
+# Recorded events, or None while tracing is off
+_events: Optional[List[Dict]] = None
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name: str, args: Dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        complete(self.name, self.start, **self.args)
+        return False
+
+
+def is_enabled() -> bool:
+    return _events is not None
+
+
+def enable() -> None:
+    """Start recording spans in this process"""
+    global _events
+    if _events is None:
+        _events = []
+        _name_process()
+
+
+def disable() -> None:
+    """Stop recording and drop what was recorded"""
+    global _events
+    _events = None
+
+
+def _name_process() -> None:
+    _events.append({'name': 'process_name', 'ph': 'M', 'pid': os.getpid(), 'tid': 0,
+                    'args': {'name': multiprocessing.current_process().name}})
+
+
+def now() -> int:
+    """Timestamp to pass to complete() later as a span's start"""
+    return time.perf_counter_ns()
+
+
+def complete(name: str, start: int, **args) -> None:
+    """Record a span that started at a now() timestamp and ends now"""
+    events = _events
+    if events is None:
+        return
+    end = time.perf_counter_ns()
+    event = {'name': name, 'ph': 'X', 'ts': start / 1000, 'dur': (end - start) / 1000,
+             'pid': os.getpid(), 'tid': threading.get_ident()}
+    if args:
+        event['args'] = args
+    events.append(event)
+
+
+def span(name: str, **args):
+    """
+    Context manager recording the time spent in its block.
+
+    Args:
+        name: Span name shown on the timeline
+        **args: JSON-serializable details shown with the span
+    """
+    if _events is None:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorator recording a span for every call, named after the function by default"""
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _events is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                complete(label, start)
+        return wrapper
+    return decorator
+
+
+def take() -> List[Dict]:
+    """Remove and return the events recorded so far, to ship them to another process"""
+    global _events
+    if _events is None:
+        return []
+    events, _events = _events, []
+    return events
+
+
+def add(events: List[Dict]) -> None:
+    """Merge events recorded in another process"""
+    if _events is not None:
+        _events.extend(events)
+
+
+def write(path: str) -> int:
+    """
+    Write the recorded events as Chrome Trace Event JSON.
+
+    Returns:
+        int: Number of events written
+    """
+    events = list(_events or [])
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f)
+    return len(events)
@@ -0,0 +1,336 @@
+"""
+Instrumented arrays for counting element accesses.
+
+Step counts depend on how each algorithm reports its work, so they are not
+comparable across algorithms. A TrackedArray is handed to the algorithm in
+place of its input list and counts reads, writes, comparisons and swaps the
+same way for every algorithm. Values read from it compare like ints but
+count each comparison on the shared AccessCounter.
+
+Instrumentation is opt-in: runs without a counter get a plain list and pay
+nothing for it.
+"""
+
+import operator
+from array import array
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+# Events between samples of the access totals when recording a run
+COUNT_INTERVAL = 32
+
+
+class AccessCounts(NamedTuple):
+    """Snapshot of an AccessCounter"""
+    reads: int
+    writes: int
+    comparisons: int
+    swaps: int
+
+    def format(self) -> str:
+        return (f"Reads: {self.reads} | Writes: {self.writes} | "
+                f"Comparisons: {self.comparisons} | Swaps: {self.swaps}")
+
+
+class AccessCounter:
+    """Running totals shared by a TrackedArray, its copies and its values"""
+    __slots__ = ('reads', 'writes', 'comparisons', 'swaps', 'value_type')
+
+    def __init__(self):
+        self.reads = 0
+        self.writes = 0
+        self.comparisons = 0
+        self.swaps = 0
+        # Int subclass bound to this counter; ints cannot carry instance slots
+        self.value_type = type('TrackedValue', (TrackedValue,), {'counter': self, '__slots__': ()})
+
+    def snapshot(self) -> AccessCounts:
+        return AccessCounts(self.reads, self.writes, self.comparisons, self.swaps)
+
+
+class TrackedValue(int):
+    """Int read from a TrackedArray that counts the comparisons it takes part in"""
+    __slots__ = ()
+    counter: AccessCounter
+
+    def __lt__(self, other):
+        self.counter.comparisons += 1
+        return int.__lt__(self, other)
+
+    def __le__(self, other):
+        self.counter.comparisons += 1
+        return int.__le__(self, other)
+
+    def __gt__(self, other):
+        self.counter.comparisons += 1
+        return int.__gt__(self, other)
+
+    def __ge__(self, other):
+        self.counter.comparisons += 1
+        return int.__ge__(self, other)
+
+    def __eq__(self, other):
+        self.counter.comparisons += 1
+        return int.__eq__(self, other)
+
+    def __ne__(self, other):
+        self.counter.comparisons += 1
+        return int.__ne__(self, other)
+
+    __hash__ = int.__hash__
+
+    def __reduce__(self):
+        # Sent to other processes (e.g. inside events) as a plain int
+        return (int, (int(self),))
+
+
+class TrackedArray:
+    """
+    Integer sequence that counts element accesses on an AccessCounter.
+
+    Supports the list protocol: indexing, slicing and deletion, len,
+    iteration, ``in``, concatenation and repetition, equality with lists,
+    and the list methods. Copies and slices share the counter, so accesses
+    to temporary buffers are counted too. A swap is counted when two
+    back-to-back writes exchange the values at two distinct indices, as in
+    ``arr[i], arr[j] = arr[j], arr[i]``; a read in between (as when shifting
+    elements) keeps them separate writes. Copies count a read of every
+    element, including the ``arr.copy()`` snapshots of the legacy protocol.
+    Searches count a read and a comparison per element they look at.
+
+    Values are stored as 64-bit integers; storing anything else raises
+    TypeError rather than truncating it.
+    """
+    __slots__ = ('_data', 'counter', '_value', '_last_write')
+
+    def __init__(self, data: Iterable[int], counter: AccessCounter):
+        self._data = data if isinstance(data, array) else array('q', data)
+        self.counter = counter
+        self._value = counter.value_type
+        # (index, overwritten value) of the previous write, for swap detection
+        self._last_write = None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __getitem__(self, index):
+        self._last_write = None
+        if isinstance(index, slice):
+            part = self._data[index]
+            self.counter.reads += len(part)
+            return TrackedArray(part, self.counter)
+        self.counter.reads += 1
+        return self._value(self._data[index])
+
+    def __setitem__(self, index, value) -> None:
+        data = self._data
+        if isinstance(index, slice):
+            values = value._data if isinstance(value, TrackedArray) else array('q', value)
+            self.counter.writes += len(values)
+            data[index] = values
+            self._last_write = None
+            return
+
+        counter = self.counter
+        counter.writes += 1
+        value = _integer(value)
+        if index < 0:
+            index += len(data)
+        old = data[index]
+        last = self._last_write
+        if last is not None and last[0] != index and last[1] == value and data[last[0]] == old:
+            counter.swaps += 1
+            self._last_write = None
+        else:
+            self._last_write = (index, old)
+        data[index] = value
+
+    def __delitem__(self, index) -> None:
+        self._last_write = None
+        del self._data[index]
+
+    def __iter__(self) -> Iterator[int]:
+        self._last_write = None
+        value = self._value
+        for item in self._data:
+            self.counter.reads += 1
+            yield value(item)
+
+    def __reversed__(self) -> Iterator[int]:
+        self._last_write = None
+        value = self._value
+        for item in reversed(self._data):
+            self.counter.reads += 1
+            yield value(item)
+
+    def __contains__(self, value) -> bool:
+        return self._find(value, 0, len(self._data)) >= 0
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, TrackedArray):
+            self.counter.reads += len(other._data)
+            other = other._data
+        elif not isinstance(other, list):
+            return NotImplemented
+        if len(other) != len(self._data):
+            return False
+        self._last_write = None
+        counter = self.counter
+        for mine, theirs in zip(self._data, other):
+            counter.reads += 1
+            counter.comparisons += 1
+            if mine != _plain(theirs):
+                return False
+        return True
+
+    def __ne__(self, other) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    # Mutable like a list, so unhashable like one
+    __hash__ = None
+
+    def __add__(self, other) -> "TrackedArray":
+        if not isinstance(other, (list, TrackedArray)):
+            return NotImplemented
+        result = self.copy()
+        result.extend(other)
+        return result
+
+    def __radd__(self, other) -> "TrackedArray":
+        if not isinstance(other, list):
+            return NotImplemented
+        result = TrackedArray(_values(other), self.counter)
+        self.counter.writes += len(other)
+        result.extend(self)
+        return result
+
+    def __iadd__(self, other) -> "TrackedArray":
+        self.extend(other)
+        return self
+
+    def __mul__(self, times: int) -> "TrackedArray":
+        self.counter.reads += len(self._data)
+        data = self._data * times
+        self.counter.writes += len(data)
+        return TrackedArray(data, self.counter)
+
+    __rmul__ = __mul__
+
+    def __repr__(self) -> str:
+        return f"TrackedArray({self._data.tolist()!r})"
+
+    def _find(self, value, start: int, stop: int) -> int:
+        """Index of the first occurrence of value in [start, stop), or -1"""
+        self._last_write = None
+        start, stop, _ = slice(start, stop).indices(len(self._data))
+        try:
+            # array.index only takes start and stop from Python 3.10 on
+            found = self._data[start:stop].index(_plain(value)) + start if start < stop else -1
+        except ValueError:
+            found = -1
+        looked_at = (found + 1 if found >= 0 else stop) - start
+        self.counter.reads += max(looked_at, 0)
+        self.counter.comparisons += max(looked_at, 0)
+        return found
+
+    def copy(self) -> "TrackedArray":
+        self.counter.reads += len(self._data)
+        return TrackedArray(array('q', self._data), self.counter)
+
+    def append(self, value: int) -> None:
+        self.counter.writes += 1
+        self._data.append(_integer(value))
+
+    def extend(self, values: Iterable[int]) -> None:
+        if isinstance(values, TrackedArray):
+            self.counter.reads += len(values._data)
+            values = values._data
+        else:
+            values = _values(values)
+        self.counter.writes += len(values)
+        self._last_write = None
+        self._data.extend(values)
+
+    def insert(self, index: int, value: int) -> None:
+        self.counter.writes += 1
+        self._data.insert(index, _integer(value))
+
+    def pop(self, index: int = -1) -> int:
+        self.counter.reads += 1
+        return self._value(self._data.pop(index))
+
+    def remove(self, value: int) -> None:
+        index = self._find(value, 0, len(self._data))
+        if index < 0:
+            raise ValueError(f"{value!r} is not in TrackedArray")
+        del self._data[index]
+
+    def clear(self) -> None:
+        self._last_write = None
+        del self._data[:]
+
+    def index(self, value: int, start: int = 0, stop: int = 2 ** 63 - 1) -> int:
+        index = self._find(value, start, stop)
+        if index < 0:
+            raise ValueError(f"{value!r} is not in TrackedArray")
+        return index
+
+    def count(self, value: int) -> int:
+        self._last_write = None
+        self.counter.reads += len(self._data)
+        self.counter.comparisons += len(self._data)
+        return self._data.count(_plain(value))
+
+    def reverse(self) -> None:
+        """Reverse in place, counted as the swaps of the mirrored pairs"""
+        pairs = len(self._data) // 2
+        self.counter.reads += 2 * pairs
+        self.counter.writes += 2 * pairs
+        self.counter.swaps += pairs
+        self._last_write = None
+        self._data.reverse()
+
+    def sort(self, key: Optional[Callable] = None, reverse: bool = False) -> None:
+        """Sort in place, counting the comparisons of the values list.sort makes"""
+        self._last_write = None
+        data = self._data
+        self.counter.reads += len(data)
+        values = [self._value(item) for item in data]
+        values.sort(key=key, reverse=reverse)
+        self.counter.writes += len(data)
+        data[:] = array('q', values)
+
+    def tolist(self) -> List[int]:
+        """Plain list of the values, without counting reads"""
+        return self._data.tolist()
+
+
+def _integer(value) -> int:
+    """An int for a value to store, refusing values int() would truncate"""
+    try:
+        return operator.index(value)
+    except TypeError:
+        raise TypeError(f"TrackedArray holds integers, not {type(value).__name__}") from None
+
+
+def _plain(value):
+    """The value itself, or a tracked value as a plain int that compares uncounted"""
+    return int(value) if isinstance(value, TrackedValue) else value
+
+
+def _values(values: Iterable[int]) -> array:
+    return array('q', (_integer(value) for value in values))
+
+
+def untracked(values: Iterable[int]) -> List[int]:
+    """Copy a possibly tracked sequence into a plain list without counting reads"""
+    if isinstance(values, TrackedArray):
+        return values.tolist()
+    return list(values)
+
+
+def instrument(data: Iterable[int], counter: Optional[AccessCounter]):
+    """Input to pass to an algorithm: tracked when a counter is given, else a plain list"""
+    if counter is None:
+        return list(data)
+    return TrackedArray(data, counter)
@@ -0,0 +1,163 @@
+"""
+Background execution of sorting algorithms.
+
+A StepWorker runs an algorithm in a separate process, or a thread when the
+algorithm cannot be sent to another process, and streams its events back in
+batches through a bounded queue. A full queue blocks the producer, so a
+consumer that falls behind caps memory use instead of letting it grow.
+"""
+
+import multiprocessing
+import pickle
+import queue
+import threading
+from typing import Callable, Iterable, List, Optional
+
+from . import tracing
+from .steps import iter_events
+from .tracking import AccessCounter, COUNT_INTERVAL
+
+# Message kinds sent from the producer to the consumer
+EVENTS = 'events'
+COUNTS = 'counts'  # (event position, AccessCounts) samples of instrumented runs
+SPANS = 'spans'  # Trace events recorded in a worker process, sent before DONE
+DONE = 'done'
+ERROR = 'error'
+
+# Poll interval used by a blocked producer to notice cancellation
+_PUT_TIMEOUT = 0.1
+
+
+def _put(channel, message, cancelled) -> bool:
+    """Put a message on the queue, giving up if the run is cancelled"""
+    while not cancelled.is_set():
+        try:
+            channel.put(message, timeout=_PUT_TIMEOUT)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _produce(function: Callable, data: List[int], channel, cancelled, batch_size: int,
+             instrumented: bool = False, traced: bool = False) -> None:
+    """
+    Run an algorithm and send its events to the queue in batches.
+
+    With traced set, the producer runs in a process of its own: it records
+    a span per batch and sends the spans back before finishing. Producer
+    threads record into the consumer's process directly.
+    """
+    if traced:
+        tracing.enable()
+    counter = AccessCounter() if instrumented else None
+    # (event position, totals) samples taken since the last batch was sent
+    samples = [(0, counter.snapshot())] if counter is not None else []
+
+    def send(batch) -> bool:
+        if batch and not _put(channel, (EVENTS, batch), cancelled):
+            return False
+        if samples:
+            if not _put(channel, (COUNTS, list(samples)), cancelled):
+                return False
+            samples.clear()
+        return True
+
+    batch = []
+    produced = 0
+    started = tracing.now()
+    try:
+        for event in iter_events(function, data, counter):
+            batch.append(event)
+            produced += 1
+            if counter is not None and produced % COUNT_INTERVAL == 0:
+                samples.append((produced, counter.snapshot()))
+            if len(batch) >= batch_size:
+                tracing.complete("generator steps", started, events=len(batch))
+                if not send(batch):
+                    return
+                batch = []
+                started = tracing.now()
+        tracing.complete("generator steps", started, events=len(batch))
+        if counter is not None:
+            samples.append((produced, counter.snapshot()))
+        if not send(batch):
+            return
+        if traced and not _put(channel, (SPANS, tracing.take()), cancelled):
+            return
+        _put(channel, (DONE, None), cancelled)
+    except Exception as e:
+        _put(channel, (ERROR, f"{type(e).__name__}: {e}"), cancelled)
+
+
+def can_run_in_process(function: Callable) -> bool:
+    """Check whether a function can be sent to a spawned worker process"""
+    try:
+        pickle.dumps(function)
+        return True
+    except Exception:
+        return False
+
+
+class StepWorker:
+    """Runs a sorting algorithm in the background and buffers its event batches"""
+
+    def __init__(self, function: Callable, data: Iterable[int], batch_size: int = 1024,
+                 max_batches: int = 64, use_process: Optional[bool] = None,
+                 instrumented: bool = False):
+        """
+        Args:
+            function: Sorting algorithm generator function
+            data: Input array
+            batch_size: Events sent per queue message
+            max_batches: Queue capacity in batches before the producer blocks
+            use_process: Force process (True) or thread (False) execution;
+                by default a process is used whenever the function is picklable
+            instrumented: Run the algorithm on a TrackedArray and send samples
+                of its access counts along with the events
+        """
+        if use_process is None:
+            use_process = can_run_in_process(function)
+        self.use_process = use_process
+
+        if use_process:
+            # Spawned rather than forked so the GUI's Qt state is never copied
+            context = multiprocessing.get_context('spawn')
+            self._queue = context.Queue(maxsize=max_batches)
+            self._cancelled = context.Event()
+            self._runner = context.Process(
+                target=_produce,
+                args=(function, list(data), self._queue, self._cancelled, batch_size, instrumented,
+                      tracing.is_enabled()),
+                daemon=True
+            )
+        else:
+            self._queue = queue.Queue(maxsize=max_batches)
+            self._cancelled = threading.Event()
+            self._runner = threading.Thread(
+                target=_produce,
+                args=(function, list(data), self._queue, self._cancelled, batch_size, instrumented),
+                daemon=True
+            )
+
+    def start(self) -> None:
+        """Start producing events"""
+        self._runner.start()
+
+    def poll(self):
+        """Return the next (kind, payload) message without blocking, or None"""
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def cancel(self) -> None:
+        """Stop the producer and release the queue"""
+        self._cancelled.set()
+        if self.use_process:
+            if self._runner.is_alive():
+                self._runner.terminate()
+            self._runner.join(timeout=1.0)
+            self._queue.cancel_join_thread()
+            self._queue.close()
+
@@ -0,0 +1,521 @@
+"""
+Headless benchmark runner for the registered sorting algorithms.
+
+Runs every selected algorithm over a matrix of input sizes and distributions
+without importing Qt, and reports wall time, step and comparison counts,
+peak memory and an estimate of the generator resume overhead. Each
+algorithm's NumPy counterpart can be timed alongside it, or on its own for
+inputs too large for the Python implementations.
+
+With --seeds, every (algorithm, distribution, size, seed) job is fanned out
+across a process pool and the runs are aggregated into per-algorithm
+statistics instead.
+
+Usage:
+    python -m sorting_visualizer.bench --sizes 100 1000 --format json -o results.json
+    python -m sorting_visualizer.bench --reference-only --sizes 10000000 -d uniform
+    python -m sorting_visualizer.bench --seeds 50 --sizes 1000 --jobs 8
+    python -m sorting_visualizer.bench -a "Parallel Merge Sort" --baseline "Merge Sort" -n 100000
+    python -m sorting_visualizer.bench -a Timsort -n 100000 --trace-events timsort.json
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .algorithms import AlgorithmRegistry, SortingAlgorithm, initialize_algorithms, tracing
+from .algorithms.distributions import DISTRIBUTIONS, generate
+from .algorithms.reference import as_array, verify_sorted
+from .algorithms.steps import COMPARE, StepRunner
+from .algorithms.trace_file import record_trace_file
+from .algorithms.tracking import AccessCounter
+
+FIELDS = [
+    'algorithm', 'distribution', 'size', 'seed', 'wall_time', 'speedup', 'steps',
+    'comparisons', 'events', 'generator_overhead', 'peak_memory', 'reads', 'writes',
+    'value_comparisons', 'swaps', 'sorted', 'error'
+]
+
+# Columns of the aggregated batch statistics
+STATS_FIELDS = [
+    'algorithm', 'distribution', 'size', 'runs', 'failures', 'mean_time', 'p50_time',
+    'p99_time', 'speedup', 'mean_steps'
+]
+
+# Columns of the --parity report
+PARITY_FIELDS = [
+    'algorithm', 'distribution', 'size', 'steps', 'comparisons', 'generator_steps',
+    'generator_comparisons', 'same_array', 'sorted', 'mismatch'
+]
+
+
+# The distributions run unless others are selected
+DEFAULT_DISTRIBUTIONS = ['uniform', 'sorted', 'reversed', 'few-unique', 'nearly-sorted']
+
+
+def measure_resume_cost(samples: int = 200_000) -> float:
+    """Estimate the cost in seconds of resuming a generator once"""
+    def empty():
+        for _ in range(samples):
+            yield (COMPARE, 0, 0)
+
+    start = time.perf_counter()
+    for _ in empty():
+        pass
+    return (time.perf_counter() - start) / samples
+
+
+def run_once(algorithm: SortingAlgorithm, data: List[int]) -> Dict:
+    """Time one fast-forward run of an algorithm and check its result"""
+    with tracing.span("run", algorithm=algorithm.name, size=len(data)):
+        start = time.perf_counter()
+        result = algorithm.run(data)
+        wall_time = time.perf_counter() - start
+    return {
+        'wall_time': wall_time,
+        'steps': result.steps,
+        'comparisons': result.comparisons,
+        'events': result.events,
+        'sorted': verify_sorted(result.array, data).ok,
+    }
+
+
+def run_reference_once(algorithm: SortingAlgorithm, values) -> Dict:
+    """Time one run of an algorithm's NumPy counterpart on an ndarray"""
+    start = time.perf_counter()
+    result = algorithm.run_reference(values)
+    wall_time = time.perf_counter() - start
+    return {'wall_time': wall_time, 'sorted': verify_sorted(result, values).ok}
+
+
+def measure_reference_memory(algorithm: SortingAlgorithm, values) -> Dict:
+    """Peak memory of a NumPy counterpart run; NumPy reports its buffers to tracemalloc"""
+    tracemalloc.start()
+    try:
+        algorithm.run_reference(values)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'peak_memory': peak}
+
+
+def count_accesses(algorithm: SortingAlgorithm, data: List[int]) -> Dict:
+    """Run an algorithm on a TrackedArray and report its access counts"""
+    counter = AccessCounter()
+    algorithm.run(data, counter)
+    counts = counter.snapshot()
+    return {
+        'reads': counts.reads,
+        'writes': counts.writes,
+        'value_comparisons': counts.comparisons,
+        'swaps': counts.swaps,
+    }
+
+
+def measure_memory(function: Callable, data: List[int]) -> Dict:
+    """Run an algorithm through a StepRunner under tracemalloc, as the GUI does"""
+    tracemalloc.start()
+    try:
+        runner = StepRunner(function, data)
+        while runner.step() is not None:
+            pass
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {'peak_memory': peak}
+
+
+def check_parity(registry: AlgorithmRegistry, algorithms: List[str], sizes: List[int],
+                 distributions: List[str], seed: int = 0) -> List[Dict]:
+    """
+    Check that the fast-forward mode matches the step-by-step generator path,
+    and that both give the same array as sorted().
+
+    Returns:
+        List[Dict]: One record per combination, with a description of what
+            differs under 'mismatch' if anything does
+    """
+    records = []
+    for size in sizes:
+        for distribution in distributions:
+            data = generate(distribution, size, seed)
+            for name in algorithms:
+                algorithm = registry[name]
+                result = algorithm.run(data)
+                runner = StepRunner(algorithm.function, data)
+                while runner.step() is not None:
+                    pass
+                state = runner.state
+                record = dict.fromkeys(PARITY_FIELDS)
+                record.update(algorithm=name, distribution=distribution, size=size,
+                              steps=result.steps, comparisons=result.comparisons,
+                              generator_steps=state.steps,
+                              generator_comparisons=state.comparisons,
+                              same_array=result.array == state.array,
+                              sorted=result.array == sorted(data))
+                problems = []
+                if (result.steps, result.comparisons) != (state.steps, state.comparisons):
+                    problems.append("counters differ from the generator path")
+                if not record['same_array']:
+                    problems.append("arrays differ")
+                if not record['sorted']:
+                    problems.append("result differs from sorted()")
+                if problems:
+                    record['mismatch'] = ", ".join(problems)
+                records.append(record)
+    return records
+
+
+def run_benchmarks(registry: AlgorithmRegistry, algorithms: List[str], sizes: List[int],
+                   distributions: List[str], repeat: int = 3, seed: int = 0,
+                   memory: bool = True, trace_dir: Optional[str] = None,
+                   accesses: bool = False, reference: bool = False,
+                   python: bool = True) -> List[Dict]:
+    """
+    Benchmark every combination of algorithm, size and distribution.
+
+    Args:
+        registry: Registry holding the algorithms
+        algorithms: Names of the algorithms to run
+        sizes: Input sizes
+        distributions: Names of input distributions from DISTRIBUTIONS
+        repeat: Number of timed runs per combination, the fastest is reported
+        seed: Seed for the input generator
+        memory: Whether to do an extra traced run for peak memory
+        trace_dir: Directory to save a trace file of each combination in
+        accesses: Whether to do an extra instrumented run for access counts
+        reference: Whether to also time each algorithm's NumPy counterpart
+        python: Whether to run the Python implementations themselves
+
+    Returns:
+        List[Dict]: One result record per combination
+    """
+    resume_cost = measure_resume_cost()
+    results = []
+    for size in sizes:
+        for distribution in distributions:
+            data = generate(distribution, size, seed)
+            values = as_array(data) if reference else None
+            for name in algorithms:
+                algorithm = registry[name]
+                if python:
+                    results.append(_benchmark_python(algorithm, data, distribution, size, seed,
+                                                     repeat, resume_cost, memory, trace_dir,
+                                                     accesses))
+                if reference and algorithm.reference is not None:
+                    results.append(_benchmark_reference(algorithm, values, distribution, size,
+                                                        seed, repeat, memory))
+    return results
+
+
+def _benchmark_python(algorithm: SortingAlgorithm, data: List[int], distribution: str,
+                      size: int, seed: int, repeat: int, resume_cost: float, memory: bool,
+                      trace_dir: Optional[str], accesses: bool) -> Dict:
+    name = algorithm.name
+    record = dict.fromkeys(FIELDS)
+    record.update(algorithm=name, distribution=distribution, size=size, seed=seed)
+    try:
+        runs = [run_once(algorithm, data) for _ in range(max(repeat, 1))]
+        record.update(min(runs, key=lambda run: run['wall_time']))
+        record['generator_overhead'] = record['events'] * resume_cost
+        if memory:
+            record.update(measure_memory(algorithm.function, data))
+        if accesses:
+            record.update(count_accesses(algorithm, data))
+        if trace_dir:
+            record_trace_file(
+                algorithm.function, data,
+                os.path.join(trace_dir, _trace_file_name(name, distribution, size)),
+                metadata={'name': name, 'complexity': algorithm.complexity}
+            )
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def _benchmark_reference(algorithm: SortingAlgorithm, values, distribution: str, size: int,
+                         seed: int, repeat: int, memory: bool) -> Dict:
+    record = dict.fromkeys(FIELDS)
+    record.update(algorithm=f"{algorithm.name} [numpy {algorithm.reference}]",
+                  distribution=distribution, size=size, seed=seed)
+    try:
+        runs = [run_reference_once(algorithm, values) for _ in range(max(repeat, 1))]
+        record.update(min(runs, key=lambda run: run['wall_time']))
+        if memory:
+            record.update(measure_reference_memory(algorithm, values))
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    return record
+
+
+class BatchJob(NamedTuple):
+    """One run of a batch, small enough to send to a pool worker"""
+    algorithm: str
+    function: Callable
+    distribution: str
+    size: int
+    seed: int
+    # np.sort kind to time instead of the Python implementation
+    reference: Optional[str] = None
+
+
+def run_batch_job(job: BatchJob) -> Dict:
+    """Generate a job's input and time one run of it; runs in a pool worker"""
+    record = dict.fromkeys(FIELDS)
+    record.update(algorithm=job.algorithm, distribution=job.distribution, size=job.size,
+                  seed=job.seed)
+    try:
+        # Inputs are generated in the worker rather than pickled over from the parent
+        data = generate(job.distribution, job.size, job.seed)
+        algorithm = SortingAlgorithm(job.algorithm, job.function, "", job.reference)
+        if job.reference is None:
+            record.update(run_once(algorithm, data))
+        else:
+            record.update(run_reference_once(algorithm, as_array(data)))
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def run_batch(registry: AlgorithmRegistry, algorithms: List[str], sizes: List[int],
+              distributions: List[str], seeds: List[int], jobs: Optional[int] = None,
+              reference: bool = False, python: bool = True) -> List[Dict]:
+    """
+    Run every combination of algorithm, size, distribution and seed across a process pool.
+
+    Args:
+        registry: Registry holding the algorithms
+        algorithms: Names of the algorithms to run
+        sizes: Input sizes
+        distributions: Names of input distributions from DISTRIBUTIONS
+        seeds: Input seeds, one run per seed
+        jobs: Number of worker processes (default: one per core)
+        reference: Whether to also time each algorithm's NumPy counterpart
+        python: Whether to run the Python implementations themselves
+
+    Returns:
+        List[Dict]: One result record per run, in job order
+    """
+    batch = []
+    for size in sizes:
+        for distribution in distributions:
+            for name in algorithms:
+                algorithm = registry[name]
+                if python:
+                    batch.extend(BatchJob(name, algorithm.function, distribution, size, seed)
+                                 for seed in seeds)
+                if reference and algorithm.reference is not None:
+                    batch.extend(BatchJob(f"{name} [numpy {algorithm.reference}]",
+                                          algorithm.function, distribution, size, seed,
+                                          algorithm.reference)
+                                 for seed in seeds)
+    workers = jobs or os.cpu_count() or 1
+    # Chunks amortize the pickling round trip without starving workers at the end
+    chunksize = max(1, len(batch) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(run_batch_job, batch, chunksize=chunksize))
+
+
+def summarize(results: List[Dict]) -> List[Dict]:
+    """
+    Aggregate batch runs into statistics per algorithm, distribution and size.
+
+    Failed runs (errors or unsorted output) are counted but left out of the
+    timing statistics.
+    """
+    groups: Dict[tuple, List[Dict]] = {}
+    for record in results:
+        key = (record['algorithm'], record['distribution'], record['size'])
+        groups.setdefault(key, []).append(record)
+
+    stats = []
+    for (name, distribution, size), records in groups.items():
+        good = [record for record in records if not record['error'] and record['sorted']]
+        summary = dict.fromkeys(STATS_FIELDS)
+        summary.update(algorithm=name, distribution=distribution, size=size, runs=len(records),
+                       failures=len(records) - len(good))
+        if good:
+            times = np.array([record['wall_time'] for record in good])
+            summary.update(mean_time=float(times.mean()),
+                           p50_time=float(np.percentile(times, 50)),
+                           p99_time=float(np.percentile(times, 99)))
+            steps = [record['steps'] for record in good if record['steps'] is not None]
+            if steps:
+                summary['mean_steps'] = float(np.mean(steps))
+        stats.append(summary)
+    return stats
+
+
+def add_speedups(results: List[Dict], baseline: str, time_field: str = 'wall_time') -> None:
+    """
+    Fill in every record's speedup over a baseline algorithm on the same inputs.
+
+    Args:
+        results: Result records or batch statistics, updated in place
+        baseline: Name of the algorithm to compare against
+        time_field: Timing to compare, wall_time for results or mean_time for statistics
+    """
+    times = {(record['distribution'], record['size']): record[time_field]
+             for record in results if record['algorithm'] == baseline and record[time_field]}
+    for record in results:
+        base = times.get((record['distribution'], record['size']))
+        if base and record[time_field]:
+            record['speedup'] = base / record[time_field]
+
+
+def _trace_file_name(name: str, distribution: str, size: int) -> str:
+    slug = "".join(c if c.isalnum() else "_" for c in name.lower())
+    return f"{slug}-{distribution}-{size}.svtrace"
+
+
+def write_table(results: List[Dict], stream, fields: Optional[List[str]] = None) -> None:
+    """Write results as an aligned plain-text table, of the given columns if any"""
+    if fields is not None:
+        columns = fields
+    else:
+        columns = ['algorithm', 'distribution', 'size', 'wall_time', 'steps',
+                   'comparisons', 'generator_overhead', 'peak_memory', 'sorted']
+        if any(record['speedup'] is not None for record in results):
+            columns.insert(4, 'speedup')
+        if any(record['reads'] is not None for record in results):
+            columns[-1:-1] = ['reads', 'writes', 'value_comparisons', 'swaps']
+    rows = [[_format_cell(record[column]) for column in columns] for record in results]
+    widths = [max([len(column)] + [len(row[i]) for row in rows]) for i, column in enumerate(columns)]
+    stream.write("  ".join(c.ljust(w) for c, w in zip(columns, widths)).rstrip() + "\n")
+    for record, row in zip(results, rows):
+        line = "  ".join(cell.ljust(w) for cell, w in zip(row, widths)).rstrip()
+        if record.get('error'):
+            line += f"  [{record['error']}]"
+        stream.write(line + "\n")
+
+
+def _format_cell(value) -> str:
+    if value is None:
+        return "-"
+    if isinstance(value, float):
+        return f"{value:.6f}"
+    return str(value)
+
+
+def write_json(results: List[Dict], stream, fields: Optional[List[str]] = None) -> None:
+    """Write results as a JSON document"""
+    json.dump({'python': sys.version.split()[0], 'results': results}, stream, indent=2)
+    stream.write("\n")
+
+
+def write_csv(results: List[Dict], stream, fields: Optional[List[str]] = None) -> None:
+    """Write results as CSV with one row per combination"""
+    writer = csv.DictWriter(stream, fieldnames=fields or FIELDS)
+    writer.writeheader()
+    writer.writerows(results)
+
+
+WRITERS = {'table': write_table, 'json': write_json, 'csv': write_csv}
+
+
+def write_results(results: List[Dict], format: str, output: Optional[str] = None,
+                  fields: Optional[List[str]] = None) -> None:
+    """Write results in a format from WRITERS to a file, or to stdout without one"""
+    if output:
+        with open(output, 'w', newline='') as stream:
+            WRITERS[format](results, stream, fields)
+    else:
+        WRITERS[format](results, sys.stdout, fields)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    registry = AlgorithmRegistry()
+    initialize_algorithms(registry)
+
+    parser = argparse.ArgumentParser(
+        prog="python -m sorting_visualizer.bench",
+        description="Benchmark the registered sorting algorithms without the GUI."
+    )
+    parser.add_argument('-a', '--algorithms', nargs='+', choices=registry.get_names(),
+                        default=registry.get_names(), metavar='NAME',
+                        help="algorithms to run (default: all registered)")
+    parser.add_argument('-n', '--sizes', nargs='+', type=int, default=[100, 1000],
+                        help="input sizes (default: 100 1000)")
+    parser.add_argument('-d', '--distributions', nargs='+', choices=list(DISTRIBUTIONS),
+                        default=DEFAULT_DISTRIBUTIONS, metavar='NAME',
+                        help=f"input distributions, from: {', '.join(DISTRIBUTIONS)} "
+                             f"(default: {' '.join(DEFAULT_DISTRIBUTIONS)})")
+    parser.add_argument('-r', '--repeat', type=int, default=3,
+                        help="timed runs per combination, fastest is kept (default: 3)")
+    parser.add_argument('-s', '--seed', type=int, default=0, help="input seed (default: 0)")
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the traced run for peak memory")
+    parser.add_argument('--count-accesses', action='store_true',
+                        help="also count reads, writes, comparisons and swaps on a tracked array")
+    parser.add_argument('--reference', action='store_true',
+                        help="also time each algorithm's NumPy counterpart (np.sort)")
+    parser.add_argument('--reference-only', action='store_true',
+                        help="only time the NumPy counterparts, e.g. for very large sizes")
+    parser.add_argument('--seeds', type=int, metavar='N',
+                        help="run each combination on N seeds from --seed on across a process "
+                             "pool and report per-algorithm statistics")
+    parser.add_argument('-j', '--jobs', type=int,
+                        help="worker processes for --seeds (default: one per core)")
+    parser.add_argument('--baseline', metavar='NAME', choices=registry.get_names(),
+                        help="also report each result's speedup over this algorithm, "
+                             "e.g. 'Merge Sort' for the parallel sorts")
+    parser.add_argument('--parity', action='store_true',
+                        help="only check that fast-forward runs match the generator path and sorted()")
+    parser.add_argument('--trace-dir', metavar='DIR',
+                        help="also save a trace file of every run to this directory")
+    parser.add_argument('--trace-events', metavar='FILE',
+                        help="write spans of the runs as Chrome trace JSON (not with --seeds)")
+    parser.add_argument('-f', '--format', choices=list(WRITERS), default='table',
+                        help="output format (default: table)")
+    parser.add_argument('-o', '--output', help="write results to this file instead of stdout")
+    args = parser.parse_args(argv)
+    if args.baseline and args.baseline not in args.algorithms:
+        args.algorithms.append(args.baseline)
+
+    if args.parity:
+        records = check_parity(registry, args.algorithms, args.sizes,
+                               args.distributions, seed=args.seed)
+        write_results(records, args.format, args.output, PARITY_FIELDS)
+        return 1 if any(record['mismatch'] for record in records) else 0
+
+    if args.seeds:
+        runs = run_batch(registry, args.algorithms, args.sizes, args.distributions,
+                         list(range(args.seed, args.seed + args.seeds)), jobs=args.jobs,
+                         reference=args.reference or args.reference_only,
+                         python=not args.reference_only)
+        stats = summarize(runs)
+        if args.baseline:
+            add_speedups(stats, args.baseline, 'mean_time')
+        write_results(stats, args.format, args.output, STATS_FIELDS)
+        return 1 if any(summary['failures'] for summary in stats) else 0
+
+    if args.trace_dir:
+        os.makedirs(args.trace_dir, exist_ok=True)
+    if args.trace_events:
+        tracing.enable()
+    results = run_benchmarks(registry, args.algorithms, args.sizes, args.distributions,
+                             repeat=args.repeat, seed=args.seed, memory=not args.no_memory,
+                             trace_dir=args.trace_dir, accesses=args.count_accesses,
+                             reference=args.reference or args.reference_only,
+                             python=not args.reference_only)
+    if args.baseline:
+        add_speedups(results, args.baseline)
+    if args.trace_events:
+        tracing.write(args.trace_events)
+
+    write_results(results, args.format, args.output)
+
+    return 1 if any(record['error'] or record['sorted'] is False for record in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Headless export of sorting animations.
+
+Records a run of an algorithm, takes the array state every N steps and
+rasterizes those frames offscreen with the same drawing as the GUI's
+SortingVisualization, without importing Qt or opening a window. Frames are
+drawn in chunks across a process pool, each worker reusing one figure and
+blitting only the bars and title over a cached background, then assembled
+into an animated GIF or PNG, or written as a numbered PNG sequence.
+
+Usage:
+    python -m sorting_visualizer.export "Quick Sort" quick.gif -n 100 --every 10
+    python -m sorting_visualizer.export Timsort timsort.png -n 500 --every 50 --fps 20
+    python -m sorting_visualizer.export "Heap Sort" frames/ -n 200 -d reversed
+"""
+
+import argparse
+import os
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+from PIL import Image
+
+from .algorithms import AlgorithmRegistry, initialize_algorithms
+from .algorithms.distributions import DISTRIBUTIONS, generate
+from .algorithms.trace import TraceCursor, record_trace
+from .ui.plotting import BAR_COLOR, bar_color, draw_array, frame_title
+
+# Output kinds, chosen from the output path
+GIF = 'gif'
+APNG = 'apng'
+FRAMES = 'frames'
+_EXTENSIONS = {'.gif': GIF, '.png': APNG, '.apng': APNG}
+
+# Fewest frames a pool task draws, to amortize setting up its figure
+MIN_CHUNK_SIZE = 32
+
+
+class Frame(NamedTuple):
+    """Array state drawn as one frame"""
+    array: List[int]
+    steps: int
+    owners: Optional[List[int]]
+
+
+class RenderJob(NamedTuple):
+    """A chunk of consecutive frames and how to draw them"""
+    frames: List[Frame]
+    first: int  # Index of the chunk's first frame in the animation
+    name: str
+    complexity: str
+    top: int  # Y axis limit shared by every frame
+    width: int
+    height: int
+    kind: str
+    directory: Optional[str]
+
+
+def output_kind(path: str) -> str:
+    """GIF or APNG for those file extensions, otherwise a directory of frames"""
+    return _EXTENSIONS.get(os.path.splitext(path)[1].lower(), FRAMES)
+
+
+def collect_frames(function: Callable, data: Iterable[int], every: int = 1) -> List[Frame]:
+    """
+    Run an algorithm and take its array state every `every` steps.
+
+    The input and the final state are always included.
+    """
+    cursor = TraceCursor(record_trace(function, data))
+    state = cursor.state
+
+    def snapshot() -> Frame:
+        owners = None if state.owners is None else list(state.owners)
+        return Frame(list(state.array), state.steps, owners)
+
+    frames = [snapshot()]
+    moved = 0
+    while cursor.step_forward():
+        moved += 1
+        if moved % every == 0:
+            frames.append(snapshot())
+    if moved % every:
+        frames.append(snapshot())
+    return frames
+
+
+def _frame_mode(kind: str) -> str:
+    return 'P' if kind == GIF else 'RGB'
+
+
+def _web_palette() -> List[int]:
+    """The fixed palette GIF frames are reduced to"""
+    return Image.new('RGB', (1, 1)).convert('P', palette=Image.Palette.WEB).getpalette()
+
+
+def render_chunk(job: RenderJob) -> Union[List[bytes], int]:
+    """
+    Draw a chunk of frames.
+
+    Returns:
+        The frames' pixels compressed with zlib, palette indices for GIF
+        output, or for a frame sequence the number of files written
+    """
+    dpi = 100
+    # The half pixel keeps the canvas from rounding down to one pixel short
+    figure = Figure(figsize=((job.width + 0.5) / dpi, (job.height + 0.5) / dpi), dpi=dpi)
+    canvas = FigureCanvasAgg(figure)
+    ax = figure.add_subplot()
+
+    first = job.frames[0]
+    bars, title = draw_array(ax, first.array, "", job.complexity, first.owners, animated=True)
+    ax.set_ylim(0, job.top * 1.05)
+    canvas.draw()
+    background = canvas.copy_from_bbox(figure.bbox)
+
+    # The animated bars are drawn as one collection of the same rectangles:
+    # a single draw call per frame instead of one per bar. Every frame starts
+    # from the clean background, so unlike the widget the bars can be
+    # antialiased. Snapping to pixels is off: it would round bars narrower
+    # than a pixel to nothing
+    lefts = np.array([bar.get_x() for bar in bars])
+    rights = lefts + np.array([bar.get_width() for bar in bars])
+    verts = np.zeros((len(bars), 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = lefts
+    verts[:, 2, 0] = verts[:, 3, 0] = rights
+    collection = PolyCollection(verts, antialiased=True, snap=False, animated=True,
+                                linewidth=0)
+    ax.add_collection(collection, autolim=False)
+
+    encoded = []
+    for offset, frame in enumerate(job.frames):
+        canvas.restore_region(background)
+        verts[:, 1, 1] = verts[:, 2, 1] = frame.array
+        collection.set_verts(verts)
+        if frame.owners is None:
+            collection.set_facecolor(BAR_COLOR)
+        else:
+            collection.set_facecolor([bar_color(owner) for owner in frame.owners])
+        title.set_text(frame_title(job.name, frame.steps))
+        ax.draw_artist(collection)
+        ax.draw_artist(title)
+
+        image = Image.frombuffer('RGBA', canvas.get_width_height(), canvas.buffer_rgba(),
+                                 'raw', 'RGBA', 0, 1).convert('RGB')
+        if job.kind == FRAMES:
+            image.save(os.path.join(job.directory, f"frame_{job.first + offset:05d}.png"),
+                       compress_level=1)
+            continue
+        if job.kind == GIF:
+            # One fixed palette keeps colours stable from frame to frame
+            image = image.convert('P', palette=Image.Palette.WEB, dither=Image.Dither.NONE)
+        # Mostly blank frames compress well and fast; PNG's row filters would not pay off
+        encoded.append(zlib.compress(image.tobytes(), 1))
+    return len(job.frames) if job.kind == FRAMES else encoded
+
+
+def export_animation(function: Callable, data: Iterable[int], path: str, every: int = 1,
+                     name: str = "", complexity: str = "", fps: int = 30,
+                     size: Sequence[int] = (640, 480), jobs: Optional[int] = None,
+                     chunk_size: Optional[int] = None) -> int:
+    """
+    Render a run of a sorting algorithm to an animation or frame sequence.
+
+    Args:
+        function: Sorting algorithm generator function
+        data: Input array
+        path: Output file ending in .gif, .png or .apng, or otherwise a
+            directory to write frame_00000.png, frame_00001.png, ... into
+        every: Steps between frames
+        name: Algorithm name shown in the title
+        complexity: Time complexity label
+        fps: Frame rate of an animation
+        size: Frame width and height in pixels
+        jobs: Processes drawing frames; one per core by default, and drawn in
+            this process when that is 1
+        chunk_size: Frames per pool task; by default two tasks per process
+
+    Returns:
+        int: Number of frames written
+    """
+    frames = collect_frames(function, data, max(every, 1))
+    kind = output_kind(path)
+    if kind == FRAMES:
+        os.makedirs(path, exist_ok=True)
+    top = max(max((max(frame.array, default=0) for frame in frames), default=0), 1)
+    width, height = size
+    workers = max(jobs or os.cpu_count() or 1, 1)
+    if chunk_size is None:
+        chunk_size = max(-(-len(frames) // (2 * workers)), MIN_CHUNK_SIZE)
+    chunks = [RenderJob(frames[start:start + chunk_size], start, name, complexity, top,
+                        width, height, kind, path if kind == FRAMES else None)
+              for start in range(0, len(frames), chunk_size)]
+
+    workers = min(workers, len(chunks))
+    if workers <= 1:
+        results = [render_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(render_chunk, chunks))
+
+    if kind == FRAMES:
+        return sum(results)
+    mode = _frame_mode(kind)
+    images = [Image.frombytes(mode, (width, height), zlib.decompress(pixels))
+              for chunk in results for pixels in chunk]
+    if kind == GIF:
+        palette = _web_palette()
+        for image in images:
+            image.putpalette(palette)
+    duration = max(1000 // max(fps, 1), 1)
+    if kind == GIF:
+        # Frames already share one palette; optimizing it again is slow and gains nothing
+        images[0].save(path, format='GIF', save_all=True, append_images=images[1:],
+                       duration=duration, loop=0, optimize=False)
+    else:
+        images[0].save(path, format='PNG', save_all=True, append_images=images[1:],
+                       duration=duration, loop=0, compress_level=1)
+    return len(images)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point"""
+    registry = AlgorithmRegistry()
+    initialize_algorithms(registry)
+
+    parser = argparse.ArgumentParser(
+        prog="python -m sorting_visualizer.export",
+        description="Render a sorting algorithm's run to an animation without the GUI."
+    )
+    parser.add_argument('algorithm', choices=registry.get_names(), help="algorithm to run")
+    parser.add_argument('output',
+                        help="animated .gif or .png (APNG) file, or a directory for numbered frames")
+    parser.add_argument('-n', '--size', type=int, default=100, help="array size (default: 100)")
+    parser.add_argument('-d', '--distribution', choices=list(DISTRIBUTIONS), default='uniform',
+                        help="input distribution (default: uniform)")
+    parser.add_argument('-s', '--seed', type=int, default=0, help="input seed (default: 0)")
+    parser.add_argument('-e', '--every', type=int, default=1,
+                        help="steps between frames (default: 1)")
+    parser.add_argument('--fps', type=int, default=30, help="animation frame rate (default: 30)")
+    parser.add_argument('--width', type=int, default=640, help="frame width in pixels (default: 640)")
+    parser.add_argument('--height', type=int, default=480,
+                        help="frame height in pixels (default: 480)")
+    parser.add_argument('-j', '--jobs', type=int,
+                        help="processes drawing frames (default: one per core)")
+    args = parser.parse_args(argv)
+
+    algorithm = registry[args.algorithm]
+    data = generate(args.distribution, args.size, args.seed)
+    count = export_animation(algorithm.function, data, args.output, every=args.every,
+                             name=algorithm.name, complexity=algorithm.complexity, fps=args.fps,
+                             size=(args.width, args.height), jobs=args.jobs)
+    print(f"Wrote {count} frames to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
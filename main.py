@@ -5,14 +5,20 @@ Main entry point for the Sorting Algorithm Visualizer application.
 
 import sys
 import os
+import time
 import logging
+
+# Taken before the heavy imports, for the time-to-first-window log line
+_START = time.perf_counter()
+
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
 
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Local imports
-from sorting_visualizer.algorithms import AlgorithmRegistry, initialize_algorithms
+from sorting_visualizer.algorithms import AlgorithmRegistry, initialize_algorithms, tracing
 from sorting_visualizer.ui import MainWindow
 from sorting_visualizer.utils import handle_errors
 
@@ -34,6 +40,11 @@ def main():
         sys.exit(1)
     sys.excepthook = exception_hook
     
+    # Spans of the whole session are written to this file on exit
+    trace_path = os.environ.get(tracing.TRACE_ENV)
+    if trace_path:
+        tracing.enable()
+    
     try:
         # Initialize QApplication
         app = QApplication(sys.argv)
@@ -47,10 +58,16 @@ def main():
         logger.info("Creating main window...")
         window = MainWindow(registry)
         window.show()
+        # Runs once the event loop has shown the window
+        QTimer.singleShot(0, lambda: logger.info(
+            "Window shown %.2f s after start", time.perf_counter() - _START))
         
         # Start event loop
         logger.info("Starting application...")
-        sys.exit(app.exec())
+        status = app.exec()
+        if trace_path:
+            logger.info("Wrote %d trace events to %s", tracing.write(trace_path), trace_path)
+        sys.exit(status)
         
     except Exception as e:
         logger.critical(f"Fatal error: {str(e)}", exc_info=True)
@@ -7,6 +7,7 @@ setup(
     install_requires=[
         'PyQt6',
         'matplotlib',
+        'numpy',
     ],
     author="Your Name",
     author_email="your.email@example.com",
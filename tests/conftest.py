@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Import the package the way main.py does, from the directory above the checkout
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
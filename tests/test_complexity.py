@@ -0,0 +1,36 @@
+from sorting_visualizer.algorithms.complexity import CANDIDATES, ComplexityAnalyzer
+from sorting_visualizer.algorithms.custom import CustomAlgorithm
+
+FLOAT_SORT = """
+def float_sort(arr):
+    for i in range(len(arr)):
+        arr[i] = arr[i] * 1.0
+    arr.sort()
+    yield arr, len(arr)
+"""
+
+REVERSING_SORT = """
+def reversing_sort(arr):
+    arr = arr.copy()
+    arr.reverse()
+    arr.sort()
+    yield arr, len(arr)
+"""
+
+
+def analyze(code):
+    return ComplexityAnalyzer(time_budget=0.5, max_size=1024).estimate_complexity(
+        CustomAlgorithm(code))
+
+
+def test_counts_operations_of_list_methods():
+    estimate = analyze(REVERSING_SORT)
+    assert estimate.label in CANDIDATES
+    assert len(estimate.operations) == len(estimate.sizes)
+
+
+def test_falls_back_to_timings():
+    estimate = analyze(FLOAT_SORT)
+    assert estimate.label in CANDIDATES
+    assert estimate.operations == [] and estimate.operation_fits == []
+    assert len(estimate.timings) == len(estimate.sizes) >= 3
@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from sorting_visualizer.algorithms import AlgorithmRegistry, initialize_algorithms
+from sorting_visualizer.algorithms.implementations import COUNTING_SORT_MAX_RANGE, counting_sort
+from sorting_visualizer.algorithms.steps import run_to_completion
+
+REGISTRY = AlgorithmRegistry()
+initialize_algorithms(REGISTRY)
+ALGORITHMS = REGISTRY.get_names()
+
+LARGE_N = 2000
+
+INPUTS = {
+    'empty': [],
+    'single': [42],
+    'pair': [2, 1],
+    'duplicates': [5, 1, 5, 3, 1, 5, 3, 3, 1, 5] * 7,
+    'all-equal': [7] * 50,
+    'negative': [-3, 10, -250, 0, 7, -1, 99, -250, 4, -999],
+    'random': random.Random(0).choices(range(-1000, 1000), k=300),
+    'large-sorted': list(range(LARGE_N)),
+    'large-reversed': list(range(LARGE_N, 0, -1)),
+}
+
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+@pytest.mark.parametrize('case', list(INPUTS))
+def test_matches_sorted(name, case):
+    data = INPUTS[case]
+    result = REGISTRY[name].run(data)
+    assert result.array == sorted(data)
+
+
+@pytest.mark.parametrize('name', ALGORITHMS)
+def test_input_is_not_modified(name):
+    data = [3, 1, 2]
+    REGISTRY[name].run(data)
+    assert data == [3, 1, 2]
+
+
+def test_counting_sort_huge_range():
+    data = [10 ** 12, -5, 3, 3, -10 ** 12, 0, COUNTING_SORT_MAX_RANGE]
+    assert run_to_completion(counting_sort, data).array == sorted(data)
@@ -0,0 +1,171 @@
+import random
+
+import pytest
+
+from sorting_visualizer.algorithms import AlgorithmRegistry, initialize_algorithms
+from sorting_visualizer.algorithms.distributions import generate
+from sorting_visualizer.algorithms.steps import ArrayState, StepRunner, iter_events, run_to_completion
+
+REGISTRY = AlgorithmRegistry()
+initialize_algorithms(REGISTRY)
+
+SIZES = [0, 1, 2, 10, 100]
+DISTRIBUTIONS = ['uniform', 'sorted', 'reversed', 'few-unique', 'all-equal']
+
+
+# Algorithms as they were written against the original (arr, steps) snapshot protocol
+
+def legacy_bubble_sort(arr):
+    n = len(arr)
+    arr = arr.copy()
+    steps = 0
+    yield arr.copy(), steps
+    for i in range(n):
+        for j in range(0, n-i-1):
+            if arr[j] > arr[j+1]:
+                steps += 1
+                arr[j], arr[j+1] = arr[j+1], arr[j]
+                yield arr.copy(), steps
+    yield arr, steps
+
+
+def legacy_insertion_sort(arr):
+    arr = arr.copy()
+    steps = 0
+    yield arr.copy(), steps
+    for i in range(1, len(arr)):
+        key = arr[i]
+        j = i-1
+        while j >= 0 and key < arr[j]:
+            arr[j+1] = arr[j]
+            j -= 1
+        steps += 1
+        arr[j+1] = key
+        yield arr.copy(), steps
+    yield arr, steps
+
+
+def legacy_selection_sort(arr):
+    arr = arr.copy()
+    steps = 0
+    yield arr.copy(), steps
+    for i in range(len(arr)):
+        min_idx = i
+        for j in range(i+1, len(arr)):
+            if arr[j] < arr[min_idx]:
+                min_idx = j
+        if min_idx != i:
+            steps += 1
+            arr[i], arr[min_idx] = arr[min_idx], arr[i]
+            yield arr.copy(), steps
+    yield arr, steps
+
+
+def legacy_heap_sort(arr):
+    arr = arr.copy()
+    steps = 0
+    yield arr.copy(), steps
+
+    def heapify(n, i):
+        nonlocal steps
+        largest = i
+        left = 2 * i + 1
+        right = 2 * i + 2
+        if left < n and arr[left] > arr[largest]:
+            largest = left
+        if right < n and arr[right] > arr[largest]:
+            largest = right
+        if largest != i:
+            arr[i], arr[largest] = arr[largest], arr[i]
+            steps += 1
+            yield arr.copy(), steps
+            yield from heapify(n, largest)
+
+    n = len(arr)
+    for i in range(n // 2 - 1, -1, -1):
+        yield from heapify(n, i)
+    for i in range(n - 1, 0, -1):
+        arr[0], arr[i] = arr[i], arr[0]
+        steps += 1
+        yield arr.copy(), steps
+        yield from heapify(i, 0)
+    yield arr, steps
+
+
+# Each legacy generator, the built-in that replaced it, and whether the
+# built-in still counts steps the same way
+LEGACY = {
+    'Bubble Sort': (legacy_bubble_sort, True),
+    'Insertion Sort': (legacy_insertion_sort, False),
+    'Selection Sort': (legacy_selection_sort, True),
+    'Heap Sort': (legacy_heap_sort, True),
+}
+
+INPUTS = {f'{distribution}-{size}': generate(distribution, size, seed=0)
+          for size in SIZES for distribution in DISTRIBUTIONS}
+INPUTS['negative'] = random.Random(1).choices(range(-50, 50), k=60)
+
+
+def final_snapshot(function, data):
+    """Array and steps of a legacy generator's last snapshot"""
+    arr, steps = list(data), 0
+    for arr, steps in function(list(data)):
+        pass
+    return list(arr), steps
+
+
+def replay(events, data):
+    state = ArrayState(data)
+    for event in events:
+        state.apply(event)
+    return state
+
+
+@pytest.mark.parametrize('name', list(LEGACY))
+@pytest.mark.parametrize('case', list(INPUTS))
+def test_snapshot_adapter_matches_legacy_generator(name, case):
+    data = INPUTS[case]
+    function, _ = LEGACY[name]
+    expected = final_snapshot(function, data)
+
+    result = run_to_completion(function, data)
+    assert (result.array, result.steps) == expected
+
+    runner = StepRunner(function, data)
+    while runner.step() is not None:
+        pass
+    assert (runner.state.array, runner.state.steps) == expected
+
+    state = replay(iter_events(function, data), data)
+    assert (state.array, state.steps) == expected
+
+
+@pytest.mark.parametrize('name', list(LEGACY))
+@pytest.mark.parametrize('case', list(INPUTS))
+def test_builtin_matches_legacy_generator(name, case):
+    data = INPUTS[case]
+    function, same_steps = LEGACY[name]
+    array, steps = final_snapshot(function, data)
+    result = REGISTRY[name].run(data)
+    assert result.array == array
+    if same_steps:
+        assert result.steps == steps
+
+
+@pytest.mark.parametrize('name', REGISTRY.get_names())
+@pytest.mark.parametrize('distribution', DISTRIBUTIONS)
+def test_fast_forward_matches_generator_path(name, distribution):
+    data = generate(distribution, 100, seed=0)
+    algorithm = REGISTRY[name]
+    result = algorithm.run(data)
+
+    runner = StepRunner(algorithm.function, data)
+    while runner.step() is not None:
+        pass
+    state = runner.state
+    assert (result.array, result.steps, result.comparisons) == \
+        (state.array, state.steps, state.comparisons)
+
+    replayed = replay(iter_events(algorithm.function, data), data)
+    assert (replayed.array, replayed.steps, replayed.comparisons) == \
+        (state.array, state.steps, state.comparisons)
@@ -0,0 +1,65 @@
+import os
+import random
+
+import pytest
+
+from sorting_visualizer.algorithms import AlgorithmRegistry, initialize_algorithms
+from sorting_visualizer.algorithms import trace
+from sorting_visualizer.algorithms.steps import ArrayState
+from sorting_visualizer.algorithms.trace import TraceCursor, record_trace
+from sorting_visualizer.algorithms.trace_file import MappedTrace, record_trace_file
+
+REGISTRY = AlgorithmRegistry()
+initialize_algorithms(REGISTRY)
+
+DATA = random.Random(0).sample(range(200), 200)
+
+
+@pytest.fixture
+def trace_path(tmp_path, monkeypatch):
+    # Small enough that the keyframes get thinned out several times
+    monkeypatch.setattr(trace, 'KEYFRAME_BUDGET', 8 * len(DATA) * 8)
+    path = str(tmp_path / 'run.trace')
+    record_trace_file(REGISTRY['Heap Sort'].function, DATA, path, checkpoint_interval=64)
+    return path
+
+
+def replayed_states(recorded):
+    """(array, steps, comparisons) after every event, applied one at a time"""
+    state = ArrayState(recorded.initial)
+    states = [(list(state.array), state.steps, state.comparisons)]
+    for position in range(len(recorded)):
+        state.apply(recorded.event(position)[:3])
+        states.append((list(state.array), state.steps, state.comparisons))
+    return states
+
+
+def test_seeks_match_replay(trace_path):
+    recorded = record_trace(REGISTRY['Heap Sort'].function, DATA, checkpoint_interval=64)
+    assert recorded.keyframe_interval > recorded.checkpoint_interval
+    states = replayed_states(recorded)
+    with MappedTrace(trace_path) as mapped:
+        assert len(mapped) == len(recorded)
+        assert mapped.keyframe_interval == recorded.keyframe_interval
+        for source in (recorded, mapped):
+            cursor = TraceCursor(source)
+            for position in random.Random(1).choices(range(len(source) + 1), k=100):
+                cursor.seek(position)
+                assert (cursor.state.array, cursor.state.steps, cursor.state.comparisons) == \
+                    states[position]
+
+
+def test_empty_file_is_rejected(tmp_path):
+    path = tmp_path / 'empty.trace'
+    path.write_bytes(b'')
+    with pytest.raises(ValueError):
+        MappedTrace(str(path))
+
+
+@pytest.mark.parametrize('keep', [0.25, 0.5, 0.9, 0.999])
+def test_truncated_file_is_rejected(trace_path, keep):
+    size = os.path.getsize(trace_path)
+    with open(trace_path, 'r+b') as file:
+        file.truncate(int(size * keep) // 8 * 8)
+    with pytest.raises(ValueError, match='truncated'):
+        MappedTrace(trace_path)
@@ -0,0 +1,78 @@
+import pytest
+
+from sorting_visualizer.algorithms.steps import run_to_completion
+from sorting_visualizer.algorithms.tracking import AccessCounter, TrackedArray
+
+
+def tracked(values):
+    counter = AccessCounter()
+    return TrackedArray(values, counter), counter
+
+
+def test_list_methods_match_list():
+    values = [5, 3, 8, 3, 1, 9]
+    arr, _ = tracked(values)
+    expected = list(values)
+    for name, args in [('reverse', ()), ('append', (4,)), ('extend', ([7, 7],)),
+                       ('insert', (2, 6)), ('remove', (3,)), ('sort', ()),
+                       ('sort', ()), ('pop', ())]:
+        getattr(arr, name)(*args)
+        getattr(expected, name)(*args)
+        assert arr == expected
+    arr.sort(key=lambda value: -value, reverse=True)
+    expected.sort(key=lambda value: -value, reverse=True)
+    assert arr.tolist() == expected
+    assert arr.index(7) == expected.index(7)
+    assert arr.count(7) == expected.count(7)
+    assert (8 in arr) and (100 not in arr)
+    assert list(reversed(arr)) == list(reversed(expected))
+
+
+def test_concatenation_and_equality():
+    arr, counter = tracked([2, 1])
+    assert isinstance(arr + [3], TrackedArray)
+    assert (arr + [3]).tolist() == [2, 1, 3]
+    assert ([0] + arr).tolist() == [0, 2, 1]
+    assert (arr * 2).tolist() == [2, 1, 2, 1]
+    assert arr == [2, 1] and arr != [1, 2] and [2, 1] == arr
+    assert arr == arr.copy()
+    arr += [4]
+    assert arr.tolist() == [2, 1, 4]
+    assert (arr + arr[:1]).counter is counter
+
+
+def test_reverse_counts_swaps():
+    arr, counter = tracked([1, 2, 3, 4, 5])
+    arr.reverse()
+    assert counter.snapshot() == (4, 4, 0, 2)
+
+
+def test_sort_counts_comparisons():
+    arr, counter = tracked([3, 1, 2])
+    arr.sort()
+    assert counter.comparisons > 0
+    assert arr.tolist() == [1, 2, 3]
+
+
+@pytest.mark.parametrize('store', [
+    lambda arr: arr.__setitem__(0, 1.5),
+    lambda arr: arr.append(2.5),
+    lambda arr: arr.extend([1.0]),
+])
+def test_non_integers_are_refused(store):
+    arr, _ = tracked([1, 2])
+    with pytest.raises(TypeError):
+        store(arr)
+
+
+def custom_sort(arr):
+    arr.reverse()
+    arr.sort()
+    yield arr, 1
+
+
+def test_list_methods_in_instrumented_runs():
+    counter = AccessCounter()
+    result = run_to_completion(custom_sort, [2, 3, 1], counter)
+    assert result.array == [1, 2, 3]
+    assert counter.swaps == 1
@@ -1,12 +1,30 @@
-from .main_window import MainWindow
-from .visualization import SortingVisualization
-from .custom_widgets import CustomAlgorithmWidget
-from .complexity_analyzer import ComplexityAnalyzer, analyze_sorting_algorithm
+import importlib
 
 __all__ = [
     'MainWindow',
     'SortingVisualization',
+    'RasterVisualization',
     'CustomAlgorithmWidget',
     'ComplexityAnalyzer',
+    'ComplexityEstimate',
     'analyze_sorting_algorithm'
-]
\ No newline at end of file
+]
+
+# The widgets pull in PyQt6, so they are only imported when used; headless
+# code such as the frame exporter can then use the Qt-free plotting module
+_LAZY_EXPORTS = {
+    'MainWindow': 'main_window',
+    'SortingVisualization': 'visualization',
+    'RasterVisualization': 'raster_visualization',
+    'CustomAlgorithmWidget': 'custom_widgets',
+    'ComplexityAnalyzer': 'complexity_analyzer',
+    'ComplexityEstimate': 'complexity_analyzer',
+    'analyze_sorting_algorithm': 'complexity_analyzer',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(f'.{_LAZY_EXPORTS[name]}', __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,56 @@
+import ast
+import hashlib
+import time
+from typing import Dict, Optional, Tuple
+
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, 
                             QLabel, QTextEdit, QPushButton, QLineEdit)
-from .complexity_analyzer import analyze_sorting_algorithm
+from ..algorithms.complexity import ComplexityEstimate, analyze_code, static_estimate
+from ..algorithms.custom import find_algorithm_name
+from ..algorithms.sandbox import SandboxJob
+from ..algorithms.workers import ERROR
+from .complexity_analyzer import ANALYSIS_TIMEOUT, analyze_sorting_algorithm
+
+# Quiet time after the last edit before the code is analyzed
+ANALYSIS_DELAY_MS = 600
+# How often a running analysis is checked for its result
+ANALYSIS_POLL_MS = 50
+
+
+def _ast_key(code: str) -> str:
+    """
+    Hash of the code's syntax tree, equal for edits that only touch comments or layout.
+
+    Raises:
+        SyntaxError: If the code cannot be parsed
+    """
+    return hashlib.sha256(ast.dump(ast.parse(code)).encode('utf-8')).hexdigest()
+
 
 class CustomAlgorithmWidget(QWidget):
     """Widget for adding custom sorting algorithms"""
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, sandbox=None):
         super().__init__(parent)
+        # Pool the analysis runs user code in, keeping it out of the GUI process
+        self.sandbox = sandbox
+        
+        # Empirical analyses by syntax tree, with the seconds each one took
+        self._analyses: Dict[str, Tuple[ComplexityEstimate, float]] = {}
+        self._job: Optional[SandboxJob] = None
+        self._job_key: Optional[str] = None
+        self._job_started = 0.0
+        self._static = ""
+        
+        # Edits restart the countdown; only the last one is analyzed
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(ANALYSIS_DELAY_MS)
+        self._debounce.timeout.connect(self.analyze_complexity)
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(ANALYSIS_POLL_MS)
+        self._poll_timer.timeout.connect(self._poll_analysis)
+        
         self.setup_ui()
 
     def setup_ui(self):
@@ -24,6 +69,8 @@ class CustomAlgorithmWidget(QWidget):
         # Code input
         self.code_input = QTextEdit()
         self.code_input.setText(self.get_template())
+        if self.sandbox is not None:
+            self.code_input.textChanged.connect(self._schedule_analysis)
         input_layout.addWidget(self.code_input)
         
         # Complexity display
@@ -47,11 +94,122 @@ class CustomAlgorithmWidget(QWidget):
         
         layout.addLayout(button_layout)
 
+    def _schedule_analysis(self):
+        """Analyze the code once editing pauses"""
+        self._debounce.start()
+
     def analyze_complexity(self):
-        """Analyze the current code and update complexity label"""
+        """
+        Analyze the current code and update complexity label.
+
+        The label fills in as results arrive: the syntax check and a static
+        estimate at once, then the empirical fit from a sandbox worker. A
+        newer request cancels a running one, and code whose syntax tree was
+        analyzed before is answered from the cache.
+        """
+        self._debounce.stop()
         code = self.get_code()
-        complexity = analyze_sorting_algorithm(code)
-        self.complexity_label.setText(complexity)
+        if self.sandbox is None:
+            self.complexity_label.setText(analyze_sorting_algorithm(code))
+            return
+        
+        try:
+            key = _ast_key(code)
+            has_function = find_algorithm_name(code) is not None
+        except SyntaxError as e:
+            self.cancel_analysis()
+            self.complexity_label.setText(f"Invalid code (line {e.lineno})")
+            return
+        if not has_function:
+            self.cancel_analysis()
+            self.complexity_label.setText("Analysis error: no function found")
+            return
+        if key == self._job_key:
+            return  # Already being measured
+        
+        self.cancel_analysis()
+        self._static = static_estimate(code)
+        cached = self._analyses.get(key)
+        if cached is not None:
+            self._show_estimate(cached[0])
+            return
+        
+        self.complexity_label.setText(f"Syntax OK | static estimate {self._static} | measuring...")
+        self._job = self.sandbox.submit_call(analyze_code, code, timeout=ANALYSIS_TIMEOUT)
+        self._job_key = key
+        self._job_started = time.perf_counter()
+        self._job.start()
+        self._poll_timer.start()
+
+    def _poll_analysis(self):
+        """Show the empirical fit once the sandbox worker returns it"""
+        message = self._job.poll() if self._job is not None else None
+        if message is None:
+            return
+        key, seconds = self._job_key, time.perf_counter() - self._job_started
+        self._job = self._job_key = None
+        self._poll_timer.stop()
+        self._finish(key, message, seconds)
+
+    def _finish(self, key: str, message, seconds: float):
+        kind, payload = message
+        if kind == ERROR:
+            # Failures such as timeouts are not cached; the next edit retries
+            self.complexity_label.setText(f"Analysis error: {payload}")
+            return
+        self._analyses[key] = (payload, seconds)
+        self._show_estimate(payload)
+
+    def _show_estimate(self, estimate: ComplexityEstimate):
+        self.complexity_label.setText(f"{estimate.format()} | static estimate {self._static}")
+
+    def cancel_analysis(self):
+        """Stop the running analysis, if any"""
+        self._debounce.stop()
+        self._poll_timer.stop()
+        if self._job is not None:
+            self._job.cancel()
+        self._job = self._job_key = None
+
+    def cached_analysis(self, code: str) -> Optional[Tuple[ComplexityEstimate, float]]:
+        """Empirical analysis of code with the same syntax tree and the seconds it took, if any"""
+        try:
+            return self._analyses.get(_ast_key(code))
+        except SyntaxError:
+            return None
+
+    def take_analysis(self, code: str) -> Optional[Tuple[SandboxJob, float]]:
+        """
+        Hand over the running analysis of the code, if there is one.
+
+        The widget stops polling the job; whoever takes it reports its
+        result back with analysis_done.
+
+        Returns:
+            Optional[Tuple[SandboxJob, float]]: The job and its perf_counter start time
+        """
+        try:
+            key = _ast_key(code)
+        except SyntaxError:
+            return None
+        if self._job is None or key != self._job_key:
+            return None
+        taken = (self._job, self._job_started)
+        self._poll_timer.stop()
+        self._job = self._job_key = None
+        return taken
+
+    def analysis_done(self, code: str, message, seconds: float):
+        """Cache the (kind, payload) result of an analysis polled elsewhere, showing it if still current"""
+        key = _ast_key(code)
+        try:
+            current = _ast_key(self.get_code())
+        except SyntaxError:
+            current = None
+        if key == current and self._job is None:
+            self._finish(key, message, seconds)
+        elif message[0] != ERROR:
+            self._analyses[key] = (message[1], seconds)
 
     def get_template(self):
         return """# Template for custom sorting algorithm:
@@ -0,0 +1,67 @@
+import time
+from typing import Dict, Hashable, Optional
+
+class FrameScheduler:
+    """
+    Paces algorithm steps against a fixed display frame rate.
+
+    Each pane is credited with steps at its own steps-per-second rate and
+    consumes as many of them per frame as the frame's time budget allows.
+    Credit is capped at a few frames so a stalled event loop cannot build up
+    a burst of catch-up work.
+    """
+
+    MAX_CREDIT_FRAMES = 4
+
+    def __init__(self, fps: int = 60, budget: float = 0.6):
+        """
+        Args:
+            fps: Target display frame rate
+            budget: Fraction of each frame that may be spent advancing algorithms
+        """
+        self.fps = fps
+        self.frame_interval = 1.0 / fps
+        self.step_budget = budget * self.frame_interval
+        self._credit: Dict[Hashable, float] = {}
+        self._last: Dict[Hashable, float] = {}
+
+    @property
+    def interval_ms(self) -> int:
+        """Timer interval for the target frame rate"""
+        return max(int(1000 * self.frame_interval), 1)
+
+    def start(self, key: Hashable, now: Optional[float] = None) -> None:
+        """Begin pacing a pane"""
+        self._credit[key] = 0.0
+        self._last[key] = time.perf_counter() if now is None else now
+
+    def stop(self, key: Hashable) -> None:
+        """Stop pacing a pane"""
+        self._credit.pop(key, None)
+        self._last.pop(key, None)
+
+    def steps_due(self, key: Hashable, rate: float, now: Optional[float] = None) -> int:
+        """
+        Number of steps a pane should consume this frame.
+
+        Args:
+            key: Pane identifier passed to start()
+            rate: Requested speed in steps per second
+            now: Current time from time.perf_counter()
+        """
+        if key not in self._last:
+            return 0
+        now = time.perf_counter() if now is None else now
+        elapsed = now - self._last[key]
+        self._last[key] = now
+
+        credit = self._credit[key] + elapsed * rate
+        credit = min(credit, rate * self.frame_interval * self.MAX_CREDIT_FRAMES)
+        due = int(credit)
+        self._credit[key] = credit - due
+        return due
+
+    def deadline(self, panes: int, now: Optional[float] = None) -> float:
+        """Time by which one of several active panes must finish stepping"""
+        now = time.perf_counter() if now is None else now
+        return now + self.step_budget / max(panes, 1)
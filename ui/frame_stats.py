@@ -0,0 +1,134 @@
+import csv
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QLabel
+
+# Where a pane's frame time goes: the interval between frame timer ticks
+# (event loop lag shows up here), taking in what the algorithm produced,
+# applying it to the displayed state, and drawing it
+PHASES = ('frame', 'advance', 'update', 'paint')
+PERCENTILES = (50, 95, 99)
+
+
+class RingBuffer:
+    """Fixed-size buffer of float samples that overwrites the oldest once full"""
+
+    def __init__(self, capacity: int):
+        self._samples = np.zeros(capacity, dtype=np.float64)
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float) -> None:
+        self._samples[self._next] = value
+        self._next = (self._next + 1) % len(self._samples)
+        self._count = min(self._count + 1, len(self._samples))
+
+    def clear(self) -> None:
+        self._next = self._count = 0
+
+    def values(self) -> np.ndarray:
+        """The samples held, oldest first"""
+        if self._count < len(self._samples):
+            return self._samples[:self._count].copy()
+        return np.roll(self._samples, -self._next)
+
+    def percentiles(self, q: Iterable[float] = PERCENTILES) -> Optional[np.ndarray]:
+        """Percentiles of the samples held, or None while empty"""
+        if self._count == 0:
+            return None
+        return np.percentile(self._samples[:self._count], list(q))
+
+
+class FrameStats:
+    """Rolling per-phase timings of one pane's frames"""
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Samples kept per phase; older ones are overwritten
+        """
+        self.phases: Dict[str, RingBuffer] = {phase: RingBuffer(capacity) for phase in PHASES}
+
+    def record(self, phase: str, seconds: float) -> None:
+        self.phases[phase].append(seconds)
+
+    def clear(self) -> None:
+        for buffer in self.phases.values():
+            buffer.clear()
+
+    @property
+    def fps(self) -> float:
+        """Frame rate over the most recent frames"""
+        intervals = self.phases['frame'].values()[-60:]
+        if len(intervals) == 0 or intervals.mean() <= 0:
+            return 0.0
+        return 1.0 / intervals.mean()
+
+    def format(self) -> str:
+        """FPS and the p50/p95/p99 of every phase in milliseconds"""
+        lines = [f"{self.fps:5.1f} fps   p50 / p95 / p99 ms"]
+        for phase, buffer in self.phases.items():
+            quantiles = buffer.percentiles()
+            if quantiles is None:
+                lines.append(f"{phase:>7}      -")
+            else:
+                lines.append(f"{phase:>7} " + " / ".join(f"{1000 * q:6.2f}" for q in quantiles))
+        return "\n".join(lines)
+
+    def rows(self) -> List[Tuple[str, int, float]]:
+        """Raw (phase, sample index, seconds) samples, oldest first"""
+        return [(phase, i, float(value))
+                for phase, buffer in self.phases.items()
+                for i, value in enumerate(buffer.values())]
+
+
+def export_frame_stats(path: str, panes: Iterable[Tuple[str, FrameStats]]) -> int:
+    """
+    Write the raw samples of several panes to a CSV file.
+
+    Args:
+        path: Output file
+        panes: (pane label, stats) pairs
+
+    Returns:
+        int: Number of samples written
+    """
+    written = 0
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['pane', 'phase', 'sample', 'seconds'])
+        for label, stats in panes:
+            for phase, index, seconds in stats.rows():
+                writer.writerow([label, phase, index, f"{seconds:.9f}"])
+                written += 1
+    return written
+
+
+class FrameHud(QLabel):
+    """Translucent frame-time overlay floated over a pane's visualization"""
+
+    MARGIN = 8
+    # Clears the title both visualization backends draw across the top
+    TOP = 40
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 160); color: white;"
+                           "font-family: monospace; font-size: 10px; padding: 4px;")
+        self.hide()
+
+    def show_stats(self, stats: FrameStats, over) -> None:
+        """Show the stats in the top right corner of the given sibling widget"""
+        self.setText(stats.format())
+        self.adjustSize()
+        area = over.geometry()
+        self.move(area.right() - self.width() - self.MARGIN, area.top() + self.TOP)
+        self.show()
+        # The visualization is replaced when the backend changes; stay above it
+        self.raise_()
@@ -1,6 +1,8 @@
+import math
 import random
-import inspect
-from typing import List, Optional, Generator, Tuple
+import logging
+import time
+from typing import Dict, List, NamedTuple, Optional, Union
 
 from PyQt6.QtWidgets import (
     QMainWindow, 
@@ -12,138 +14,384 @@ from PyQt6.QtWidgets import (
     QComboBox, 
     QSpinBox, 
     QPushButton, 
+    QSlider,
+    QCheckBox,
+    QMenu,
+    QToolButton,
+    QFileDialog,
     QMessageBox
 )
-from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import Qt, QTimer
+import numpy as np
 
 # Using relative imports
 from .visualization import SortingVisualization
-from .custom_widgets import CustomAlgorithmWidget
+from .raster_visualization import RasterVisualization
+from .frame_scheduler import FrameScheduler
+from .frame_stats import FrameHud, FrameStats, export_frame_stats
+from .custom_widgets import ANALYSIS_POLL_MS, CustomAlgorithmWidget
 from ..algorithms.base import AlgorithmRegistry, SortingAlgorithm
-from .complexity_analyzer import analyze_sorting_algorithm
+from ..algorithms.trace import Trace, TraceCursor, TraceCache
+from ..algorithms.trace_file import MappedTrace, write_trace_file
+from ..algorithms.workers import StepWorker, COUNTS, DONE, ERROR, SPANS
+from ..algorithms import tracing
+from ..algorithms.custom import CustomAlgorithm, find_algorithm_name
+from ..algorithms.sandbox import RESULT, SandboxPool, SandboxJob
+from ..algorithms.complexity import analyze_code
+from ..algorithms.store import AlgorithmStore, benchmark_metadata
+from ..algorithms.shared_array import SharedArray, SharedArrayWorker, play_shared
+from ..algorithms.reference import verify_sorted
+from ..algorithms.distributions import DISTRIBUTIONS, generate
+from .complexity_analyzer import ANALYSIS_TIMEOUT
+
+# Arrays larger than this are drawn by the raster backend instead of matplotlib
+RASTER_THRESHOLD = 1000
+MAX_ARRAY_SIZE = 1_000_000
+MAX_SPEED = 10_000_000
+MAX_SEED = 2**31 - 1
+# Number of positions on the scrub sliders, mapped proportionally onto traces
+SCRUB_RESOLUTION = 10_000
+TRACE_FILE_FILTER = "Sorting traces (*.svtrace);;All files (*)"
+FRAME_STATS_FILTER = "CSV files (*.csv);;All files (*)"
+# Seconds between refreshes of the frame time overlays
+HUD_REFRESH = 0.25
+
+# Complexity label of custom algorithms whose analysis is still running
+PENDING_COMPLEXITY = "Measuring complexity..."
+
+logger = logging.getLogger(__name__)
+
+
+class PendingAnalysis(NamedTuple):
+    """Background complexity analysis of custom algorithm source"""
+    job: SandboxJob
+    started: float
+    # (registry name, function) of every algorithm added with this source
+    algorithms: List[tuple]
 
 
 class MainWindow(QMainWindow):
     """Main window for the sorting algorithm visualizer application"""
     
-    def __init__(self, algorithm_registry: AlgorithmRegistry):
+    def __init__(self, algorithm_registry: AlgorithmRegistry,
+                 algorithm_store: Optional[AlgorithmStore] = None):
         super().__init__()
         self.algorithm_registry = algorithm_registry
+        self.algorithm_store = algorithm_store or AlgorithmStore()
         
         # Setup window properties
-        self.setWindowTitle("Dual Sorting Algorithm Visualizer")
+        self.setWindowTitle("Sorting Algorithm Visualizer")
         self.setGeometry(100, 100, 1600, 900)
         
-        # Initialize state
+        # Initialize state; the per-pane lists are built with the panes
         self.current_data: List[int] = []
-        self.sorting_generators: List[Optional[Generator]] = [None, None]
-        self.is_sorting: List[bool] = [False, False]
+        self.trace_cache = TraceCache()
+        self.pane_widgets: List[QWidget] = []
+        self.visualizations: List[QWidget] = []
+        
+        # Custom algorithms only ever run in these warm, resource-limited processes
+        self.sandbox = SandboxPool()
+        self.sandbox.start()
+        
+        # A single frame timer drives every visualization
+        self.frame_scheduler = FrameScheduler(fps=60)
+        self.frame_timer = QTimer()
+        self.frame_timer.timeout.connect(self.update_frame)
+        self._last_frame: Optional[float] = None
+        self._hud_refreshed = 0.0
+        
+        # Analyses of added custom algorithms by source, polled off the frame timer
+        self.pending_analyses: Dict[str, PendingAnalysis] = {}
+        self.analysis_timer = QTimer()
+        self.analysis_timer.setInterval(ANALYSIS_POLL_MS)
+        self.analysis_timer.timeout.connect(self.poll_analyses)
+        
+        # Slider moves queued while a seek runs collapse into one seek per pane
+        self.pending_scrubs: Dict[int, int] = {}
+        self.scrub_timer = QTimer()
+        self.scrub_timer.setSingleShot(True)
+        self.scrub_timer.timeout.connect(self.apply_scrubs)
         
-        # Initialize timers
-        self.timers: List[QTimer] = [QTimer(), QTimer()]
-        self.timers[0].timeout.connect(lambda: self.update_sort(0))
-        self.timers[1].timeout.connect(lambda: self.update_sort(1))
+        # Custom algorithms of earlier sessions, listed before the combos are built
+        self.load_stored_algorithms()
         
         # Setup UI components
         self.setup_ui()
         
+    def load_stored_algorithms(self) -> None:
+        """Register the saved custom algorithms, reading none of their code yet"""
+        for name in self.algorithm_store.names():
+            algorithm_name = f"Custom: {name}"
+            if algorithm_name in self.algorithm_registry:
+                continue
+            # Analyses made by another Python version are not reused
+            complexity = self.algorithm_store.complexity(name) or "Unknown complexity"
+            self.algorithm_registry.register(algorithm_name, self.algorithm_store.get(name),
+                                             complexity)
+        
     def setup_ui(self) -> None:
         """Initialize and setup all UI components"""
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
         main_layout = QVBoxLayout(central_widget)
         
-        # Create visualizations
-        vis_layout = QHBoxLayout()
-        self.visualizations: List[SortingVisualization] = []
-        for _ in range(2):
-            vis = SortingVisualization()
-            self.visualizations.append(vis)
-            vis_layout.addWidget(vis)
-        
         # Setup controls
         control_panel = self.setup_control_panel()
-        custom_panel = CustomAlgorithmWidget()
+        custom_panel = CustomAlgorithmWidget(sandbox=self.sandbox)
         custom_panel.add_button.clicked.connect(self.add_custom_algorithm)
         self.custom_widget = custom_panel
         
+        # One pane per selected algorithm, arranged in a grid
+        self.pane_grid = QGridLayout()
+        
         # Add widgets to main layout
         main_layout.addWidget(control_panel)
         main_layout.addWidget(custom_panel)
-        main_layout.addLayout(vis_layout)
+        main_layout.addLayout(self.pane_grid, stretch=1)
         
-        self.generate_new_arrays()
+        self.set_pane_algorithms(self.algorithm_registry.get_names()[:2])
     
     def setup_control_panel(self) -> QWidget:
-        """Create and setup the control panel widget"""
+        """Create the controls shared by every pane"""
         panel = QWidget()
-        layout = QGridLayout(panel)
+        layout = QHBoxLayout(panel)
+        
+        # Algorithms shown side by side, one pane each
+        self.algorithms_btn = QToolButton()
+        self.algorithms_btn.setText("Algorithms")
+        self.algorithms_btn.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
+        self.algorithms_menu = QMenu(self.algorithms_btn)
+        for name in self.algorithm_registry.get_names():
+            self.add_algorithm_action(name)
+        self.algorithms_btn.setMenu(self.algorithms_menu)
+        layout.addWidget(self.algorithms_btn)
+        
+        # Size control
+        self.size_spin = QSpinBox()
+        self.size_spin.setRange(5, MAX_ARRAY_SIZE)
+        self.size_spin.setValue(30)
+        layout.addWidget(QLabel("Array Size:"))
+        layout.addWidget(self.size_spin)
+        
+        # Input distribution and the seed it was generated from
+        self.distribution_combo = QComboBox()
+        self.distribution_combo.addItems(list(DISTRIBUTIONS))
+        self.distribution_combo.currentTextChanged.connect(lambda text: self.regenerate_arrays())
+        layout.addWidget(QLabel("Distribution:"))
+        layout.addWidget(self.distribution_combo)
+        
+        # Shows the seed of the current input; entering one reproduces that input
+        self.seed_spin = QSpinBox()
+        self.seed_spin.setRange(0, MAX_SEED)
+        self.seed_spin.setValue(random.randint(0, MAX_SEED))
+        self.seed_spin.editingFinished.connect(self.regenerate_arrays)
+        layout.addWidget(QLabel("Seed:"))
+        layout.addWidget(self.seed_spin)
+        
+        self.generate_btn = QPushButton("Generate New Arrays")
+        self.generate_btn.clicked.connect(self.generate_new_arrays)
+        layout.addWidget(self.generate_btn)
+        
+        # Unrecorded runs can't be replayed but skip storing every event
+        self.record_check = QCheckBox("Record Runs for Playback")
+        self.record_check.setChecked(True)
+        layout.addWidget(self.record_check)
+        
+        # Opt-in instrumentation; uninstrumented runs sort plain lists
+        self.count_accesses_check = QCheckBox("Count Array Accesses")
+        layout.addWidget(self.count_accesses_check)
+        
+        # Frames are only timed while the overlay is shown
+        self.frame_hud_check = QCheckBox("Frame Time HUD")
+        self.frame_hud_check.toggled.connect(self.toggle_frame_hud)
+        layout.addWidget(self.frame_hud_check)
         
-        # Initialize control lists
+        export_frames_btn = QPushButton("Export Frame Times")
+        export_frames_btn.clicked.connect(self.export_frame_times)
+        layout.addWidget(export_frames_btn)
+        layout.addStretch()
+        
+        return panel
+    
+    def add_algorithm_action(self, name: str) -> None:
+        """Offer an algorithm in the pane selection menu"""
+        action = self.algorithms_menu.addAction(name)
+        action.setCheckable(True)
+        action.toggled.connect(self.apply_algorithm_selection)
+    
+    def apply_algorithm_selection(self) -> None:
+        """Rebuild the panes for the algorithms checked in the menu"""
+        names = [action.text() for action in self.algorithms_menu.actions() if action.isChecked()]
+        if not names:
+            # Keep at least one pane
+            self.sync_algorithm_menu()
+            return
+        self.set_pane_algorithms(names)
+    
+    def sync_algorithm_menu(self) -> None:
+        """Check the menu entries of the algorithms currently shown"""
+        shown = {combo.currentText() for combo in self.algo_combos}
+        for action in self.algorithms_menu.actions():
+            action.blockSignals(True)
+            action.setChecked(action.text() in shown)
+            action.blockSignals(False)
+    
+    def set_pane_algorithms(self, names: List[str]) -> None:
+        """Replace the panes with one pane per named algorithm"""
+        for i in range(len(self.pane_widgets)):
+            self.stop_sorting(i)
+            self.clear_trace(i)
+        for pane in self.pane_widgets:
+            self.pane_grid.removeWidget(pane)
+            pane.deleteLater()
+        for vis in self.visualizations:
+            vis.cleanup()
+        
+        count = len(names)
+        self.is_sorting: List[bool] = [False] * count
+        self.is_playing: List[bool] = [False] * count
+        
+        # Recorded runs: each pane replays a trace that its worker fills in
+        self.traces: List[Optional[Trace]] = [None] * count
+        self.cursors: List[Optional[TraceCursor]] = [None] * count
+        self.workers: List[Optional[Union[StepWorker, SandboxJob]]] = [None] * count
+        self.pane_algorithms: List[Optional[SortingAlgorithm]] = [None] * count
+        
+        # Unrecorded runs mirror their worker's array through shared memory
+        self.shared_arrays: List[Optional[SharedArray]] = [None] * count
+        self.live_arrays: List[Optional[np.ndarray]] = [None] * count
+        
+        self.pane_widgets = []
+        self.pane_layouts: List[QVBoxLayout] = []
+        self.visualizations: List[QWidget] = []
         self.algo_combos: List[QComboBox] = []
-        self.size_spins: List[QSpinBox] = []
         self.speed_spins: List[QSpinBox] = []
         self.start_btns: List[QPushButton] = []
         self.stop_btns: List[QPushButton] = []
+        self.pause_btns: List[QPushButton] = []
+        self.back_btns: List[QPushButton] = []
+        self.forward_btns: List[QPushButton] = []
+        self.position_labels: List[QLabel] = []
+        self.scrub_sliders: List[QSlider] = []
+        self.frame_stats: List[FrameStats] = [FrameStats() for _ in range(count)]
+        self.frame_huds: List[FrameHud] = []
         
-        # Create controls for both visualizations
-        for i in range(2):
-            # Algorithm selection
-            algo_combo = QComboBox()
-            algo_combo.addItems(self.algorithm_registry.get_names())
-            layout.addWidget(QLabel(f"Algorithm {i+1}:"), 0, i*4)
-            layout.addWidget(algo_combo, 0, i*4 + 1)
-            self.algo_combos.append(algo_combo)
-            
-            # Size control
-            size_spin = QSpinBox()
-            size_spin.setRange(5, 100)
-            size_spin.setValue(30)
-            layout.addWidget(QLabel("Array Size:"), 1, i*4)
-            layout.addWidget(size_spin, 1, i*4 + 1)
-            self.size_spins.append(size_spin)
-            
-            # Speed control
-            speed_spin = QSpinBox()
-            speed_spin.setRange(1, 1000)
-            speed_spin.setValue(50)
-            layout.addWidget(QLabel("Speed (ms):"), 2, i*4)
-            layout.addWidget(speed_spin, 2, i*4 + 1)
-            self.speed_spins.append(speed_spin)
-            
-            # Buttons
-            start_btn = QPushButton("Start Sorting")
-            start_btn.clicked.connect(lambda checked, idx=i: self.start_sorting(idx))
-            layout.addWidget(start_btn, 3, i*4)
-            self.start_btns.append(start_btn)
-            
-            stop_btn = QPushButton("Stop")
-            stop_btn.clicked.connect(lambda checked, idx=i: self.stop_sorting(idx))
-            stop_btn.setEnabled(False)
-            layout.addWidget(stop_btn, 3, i*4 + 1)
-            self.stop_btns.append(stop_btn)
+        columns = math.ceil(math.sqrt(count))
+        for i, name in enumerate(names):
+            pane = self.create_pane(i, name)
+            self.pane_grid.addWidget(pane, i // columns, i % columns)
+            self.pane_widgets.append(pane)
+        self.sync_algorithm_menu()
         
-        # Common controls
-        self.generate_btn = QPushButton("Generate New Arrays")
-        self.generate_btn.clicked.connect(self.generate_new_arrays)
-        layout.addWidget(self.generate_btn, 4, 0, 1, 8)
+        # The panes share the current input, so changing them keeps it
+        self.regenerate_arrays()
+    
+    def create_pane(self, i: int, name: str) -> QWidget:
+        """Create the controls and visualization of one pane"""
+        pane = QWidget()
+        pane_layout = QVBoxLayout(pane)
+        controls = QGridLayout()
+        pane_layout.addLayout(controls)
         
-        return panel
+        # Algorithm selection
+        algo_combo = QComboBox()
+        algo_combo.addItems(self.algorithm_registry.get_names())
+        algo_combo.setCurrentText(name)
+        algo_combo.currentTextChanged.connect(lambda text, idx=i: self.change_algorithm(idx))
+        controls.addWidget(QLabel(f"Algorithm {i+1}:"), 0, 0)
+        controls.addWidget(algo_combo, 0, 1)
+        self.algo_combos.append(algo_combo)
+        
+        # Speed control
+        speed_spin = QSpinBox()
+        speed_spin.setRange(1, MAX_SPEED)
+        speed_spin.setValue(20)
+        controls.addWidget(QLabel("Speed (steps/s):"), 0, 2)
+        controls.addWidget(speed_spin, 0, 3)
+        self.speed_spins.append(speed_spin)
+        
+        # Buttons
+        start_btn = QPushButton("Start Sorting")
+        start_btn.clicked.connect(lambda checked, idx=i: self.start_sorting(idx))
+        controls.addWidget(start_btn, 1, 0)
+        self.start_btns.append(start_btn)
+        
+        stop_btn = QPushButton("Stop")
+        stop_btn.clicked.connect(lambda checked, idx=i: self.stop_sorting(idx))
+        stop_btn.setEnabled(False)
+        controls.addWidget(stop_btn, 1, 1)
+        self.stop_btns.append(stop_btn)
+        
+        pause_btn = QPushButton("Pause")
+        pause_btn.clicked.connect(lambda checked, idx=i: self.toggle_pause(idx))
+        pause_btn.setEnabled(False)
+        controls.addWidget(pause_btn, 1, 2)
+        self.pause_btns.append(pause_btn)
+        
+        save_btn = QPushButton("Save Trace")
+        save_btn.clicked.connect(lambda checked, idx=i: self.save_trace(idx))
+        controls.addWidget(save_btn, 1, 3)
+        
+        # Playback controls over the recorded trace
+        back_btn = QPushButton("◀ Step")
+        back_btn.clicked.connect(lambda checked, idx=i: self.step_trace(idx, -1))
+        controls.addWidget(back_btn, 2, 0)
+        self.back_btns.append(back_btn)
+        
+        forward_btn = QPushButton("Step ▶")
+        forward_btn.clicked.connect(lambda checked, idx=i: self.step_trace(idx, 1))
+        controls.addWidget(forward_btn, 2, 1)
+        self.forward_btns.append(forward_btn)
+        
+        position_label = QLabel()
+        controls.addWidget(position_label, 2, 2)
+        self.position_labels.append(position_label)
+        
+        load_btn = QPushButton("Load Trace")
+        load_btn.clicked.connect(lambda checked, idx=i: self.load_trace(idx))
+        controls.addWidget(load_btn, 2, 3)
+        
+        scrub_slider = QSlider(Qt.Orientation.Horizontal)
+        scrub_slider.setRange(0, SCRUB_RESOLUTION)
+        scrub_slider.valueChanged.connect(lambda value, idx=i: self.scrub_trace(idx, value))
+        controls.addWidget(scrub_slider, 3, 0, 1, 4)
+        self.scrub_sliders.append(scrub_slider)
+        
+        vis = SortingVisualization()
+        pane_layout.addWidget(vis, stretch=1)
+        self.visualizations.append(vis)
+        self.frame_huds.append(FrameHud(pane))
+        self.pane_layouts.append(pane_layout)
+        return pane
+    
+    def change_algorithm(self, idx: int) -> None:
+        """Drop the pane's trace and show its new algorithm in the menu"""
+        self.clear_trace(idx)
+        self.sync_algorithm_menu()
     
     def generate_new_arrays(self) -> None:
-        """Generate new random arrays for both visualizations"""
+        """Generate a new input from a fresh seed for every visualization"""
+        self.seed_spin.setValue(random.randint(0, MAX_SEED))
+        self.regenerate_arrays()
+    
+    def regenerate_arrays(self) -> None:
+        """Generate the input of the selected distribution, size and seed for every visualization"""
         try:
             # Stop any ongoing sorting
-            for i in range(2):
+            for i in range(len(self.pane_widgets)):
                 if self.is_sorting[i]:
                     self.stop_sorting(i)
             
-            # Generate same array for both visualizations
-            size = self.size_spins[0].value()
-            self.current_data = [random.randint(1, 100) for _ in range(size)]
+            # Generate same array for all visualizations
+            size = self.size_spin.value()
+            self.current_data = generate(self.distribution_combo.currentText(), size,
+                                         self.seed_spin.value())
+            self.select_visualization_backend(size)
+            for i in range(len(self.pane_widgets)):
+                self.clear_trace(i)
             
-            # Plot initial state for both visualizations
-            for i in range(2):
+            # Plot initial state for every visualization
+            for i in range(len(self.pane_widgets)):
                 algorithm = self.algorithm_registry[self.algo_combos[i].currentText()]
                 self.visualizations[i].plot_array(
                     self.current_data.copy(), 
@@ -155,6 +403,19 @@ class MainWindow(QMainWindow):
         except Exception as e:
             self.show_error("Generation Error", str(e))
     
+    def select_visualization_backend(self, size: int) -> None:
+        """Swap the visualization widgets for the backend suited to the array size"""
+        backend = RasterVisualization if size > RASTER_THRESHOLD else SortingVisualization
+        for i, vis in enumerate(self.visualizations):
+            if type(vis) is backend:
+                continue
+            replacement = backend()
+            self.pane_layouts[i].replaceWidget(vis, replacement)
+            vis.cleanup()
+            vis.deleteLater()
+            self.visualizations[i] = replacement
+    
+    @tracing.traced()
     def start_sorting(self, idx: int) -> None:
         """Start the sorting visualization for the specified index"""
         try:
@@ -162,62 +423,420 @@ class MainWindow(QMainWindow):
                 return
                 
             self.is_sorting[idx] = True
+            self.is_playing[idx] = True
             self.start_btns[idx].setEnabled(False)
             self.stop_btns[idx].setEnabled(True)
+            self.pause_btns[idx].setEnabled(True)
+            self.pause_btns[idx].setText("Pause")
             self.generate_btn.setEnabled(False)
+            self.distribution_combo.setEnabled(False)
+            self.seed_spin.setEnabled(False)
             self.algo_combos[idx].setEnabled(False)
-            self.size_spins[idx].setEnabled(False)
+            self.size_spin.setEnabled(False)
             
-            algorithm = self.algorithm_registry[self.algo_combos[idx].currentText()]
-            self.sorting_generators[idx] = algorithm.function(self.current_data.copy())
+            instrumented = self.count_accesses_check.isChecked()
+            if isinstance(self.traces[idx], MappedTrace):
+                # A loaded trace plays from where it was scrubbed to
+                if self.cursors[idx].at_end:
+                    self.cursors[idx].seek(0)
+            elif self.record_check.isChecked():
+                algorithm = self.algorithm_registry[self.algo_combos[idx].currentText()]
+                self.pane_algorithms[idx] = algorithm
+                self.start_recorded(idx, algorithm, instrumented)
+            else:
+                algorithm = self.algorithm_registry[self.algo_combos[idx].currentText()]
+                self.pane_algorithms[idx] = algorithm
+                self.start_live(idx, algorithm, instrumented)
             
-            # Start the timer for this visualization
-            self.timers[idx].start(self.speed_spins[idx].value())
+            # Start pacing this visualization on the shared frame timer
+            self.frame_scheduler.start(idx)
+            if not self.frame_timer.isActive():
+                self.frame_timer.start(self.frame_scheduler.interval_ms)
             
         except Exception as e:
             self.show_error("Start Error", str(e))
             self.stop_sorting(idx)
     
-    def update_sort(self, idx: int) -> None:
-        """Update the sorting visualization for the specified index"""
+    def start_recorded(self, idx: int, algorithm: SortingAlgorithm, instrumented: bool) -> None:
+        """Play back a trace of the run, recording it first if it isn't cached"""
+        # Replay a recorded run of this algorithm on this input if there is one,
+        # otherwise record one in a worker process while playing it back
+        trace = self.trace_cache.get((algorithm.function, instrumented), self.current_data)
+        if trace is None:
+            trace = Trace(self.current_data)
+            if isinstance(algorithm.function, CustomAlgorithm):
+                self.workers[idx] = self.sandbox.submit(algorithm.function, self.current_data,
+                                                        instrumented=instrumented)
+            else:
+                self.workers[idx] = StepWorker(algorithm.function, self.current_data,
+                                               instrumented=instrumented)
+            self.workers[idx].start()
+        self.release_trace(idx)
+        self.traces[idx] = trace
+        self.cursors[idx] = TraceCursor(trace)
+    
+    def start_live(self, idx: int, algorithm: SortingAlgorithm, instrumented: bool) -> None:
+        """Run the algorithm on a shared array that the pane mirrors without recording"""
+        self.release_trace(idx)
+        
+        shared = SharedArray(self.current_data)
+        self.shared_arrays[idx] = shared
+        self.live_arrays[idx] = np.array(self.current_data, dtype=np.int64)
+        # Paced by the pane rather than bounded in time. Custom code still gets
+        # the sandbox's CPU limit; trusted algorithms run unrestricted
+        if isinstance(algorithm.function, CustomAlgorithm):
+            self.workers[idx] = self.sandbox.submit_call(
+                play_shared, algorithm.function, shared.name, shared.size, shared.max_ranges,
+                instrumented, timeout=math.inf
+            )
+        else:
+            self.workers[idx] = SharedArrayWorker(algorithm.function, shared, instrumented)
+        self.workers[idx].start()
+        self.position_labels[idx].setText("Live (not recorded)")
+    
+    @tracing.traced()
+    def update_frame(self) -> None:
+        """Advance every running visualization by one display frame"""
+        active = [idx for idx in range(len(self.pane_widgets)) if self.is_sorting[idx]]
+        now = time.perf_counter()
+        timed = self.frame_hud_check.isChecked()
+        if timed and self._last_frame is not None:
+            for idx in active:
+                self.frame_stats[idx].record('frame', now - self._last_frame)
+        self._last_frame = now if active else None
+        
+        for idx in active:
+            self.update_sort(idx, self.frame_scheduler.deadline(len(active)))
+        
+        if timed and now - self._hud_refreshed >= HUD_REFRESH:
+            self.refresh_frame_huds()
+            self._hud_refreshed = now
+    
+    @tracing.traced()
+    def update_sort(self, idx: int, deadline: Optional[float] = None) -> None:
+        """
+        Advance the sorting visualization for the specified index by one frame.
+        
+        Records the events the worker has produced, plays back the steps due
+        at the pane's speed, stopping early once the deadline passes, and
+        renders the coalesced state once.
+        """
         try:
             if not self.is_sorting[idx]:
                 return
-                
-            try:
-                # Get next state from generator
-                generator = self.sorting_generators[idx]
-                if generator is not None:
-                    arr, steps = next(generator)
-                    algorithm = self.algorithm_registry[self.algo_combos[idx].currentText()]
-                    self.visualizations[idx].plot_array(
-                        arr, 
-                        steps,
-                        algorithm.name,
-                        algorithm.complexity
-                    )
-            except StopIteration:
+            
+            if self.shared_arrays[idx] is not None:
+                self.update_live(idx)
+                return
+            
+            stats = self.frame_stats[idx] if self.frame_hud_check.isChecked() else None
+            started = time.perf_counter()
+            self.collect_events(idx, deadline)
+            collected = time.perf_counter()
+            if stats is not None:
+                stats.record('advance', collected - started)
+            
+            trace, cursor = self.traces[idx], self.cursors[idx]
+            due = self.frame_scheduler.steps_due(idx, self.speed_spins[idx].value())
+            if not self.is_playing[idx] or due == 0:
+                self.update_scrubber(idx)
+                return
+            
+            # Apply the changes due this frame
+            for done in range(1, due + 1):
+                # Stops at the end of what has been recorded so far
+                if not cursor.step_forward():
+                    break
+                if deadline is not None and done % 64 == 0 and time.perf_counter() > deadline:
+                    break
+            
+            stepped = time.perf_counter()
+            self.render_pane(idx)
+            if stats is not None:
+                stats.record('update', stepped - collected)
+                stats.record('paint', time.perf_counter() - stepped)
+            # A loaded trace of a stopped run ends where its recording did
+            if cursor.at_end and (trace.complete or self.workers[idx] is None):
                 self.stop_sorting(idx)
+                if trace.complete:
+                    self.check_result(idx, cursor.state.array, trace.initial)
                 
         except Exception as e:
             self.show_error("Update Error", str(e))
             self.stop_sorting(idx)
     
+    def update_live(self, idx: int) -> None:
+        """Let a live run apply the changes due this frame and draw what changed"""
+        shared, worker = self.shared_arrays[idx], self.workers[idx]
+        if worker is not None:
+            message = worker.poll()
+            if message is not None:
+                kind, payload = message
+                if kind == ERROR:
+                    raise RuntimeError(f"Algorithm failed: {payload}")
+                # The worker has published its final state
+                self.workers[idx] = None
+        
+        stats = self.frame_stats[idx] if self.frame_hud_check.isChecked() else None
+        started = time.perf_counter()
+        due = self.frame_scheduler.steps_due(idx, self.speed_spins[idx].value())
+        if self.is_playing[idx] and due:
+            shared.advance(due)
+        
+        # Copy only the ranges the worker logged since the last frame
+        advanced = time.perf_counter()
+        changed = shared.sync(self.live_arrays[idx])
+        synced = time.perf_counter()
+        if stats is not None:
+            stats.record('advance', advanced - started)
+            stats.record('update', synced - advanced)
+        if changed is None or changed:
+            algorithm = self.pane_algorithms[idx]
+            self.visualizations[idx].plot_array(
+                self.live_arrays[idx],
+                shared.steps,
+                algorithm.name,
+                algorithm.complexity,
+                changed=changed,
+                counts=shared.counts()
+            )
+            if stats is not None:
+                stats.record('paint', time.perf_counter() - synced)
+        if self.workers[idx] is None:
+            final = self.live_arrays[idx]
+            self.stop_sorting(idx)
+            self.check_result(idx, final, self.current_data)
+    
+    def toggle_frame_hud(self, shown: bool) -> None:
+        """Show or hide the frame time overlay of every pane"""
+        if shown:
+            self.refresh_frame_huds()
+        else:
+            for hud in self.frame_huds:
+                hud.hide()
+    
+    def refresh_frame_huds(self) -> None:
+        """Redraw the frame time overlays with the latest statistics"""
+        for stats, hud, vis in zip(self.frame_stats, self.frame_huds, self.visualizations):
+            hud.show_stats(stats, vis)
+    
+    def export_frame_times(self) -> None:
+        """Write the raw frame time samples of every pane to a CSV file"""
+        try:
+            if not any(len(buffer) for stats in self.frame_stats for buffer in stats.phases.values()):
+                self.show_error("Export Error", "Enable the frame time HUD and run an algorithm first")
+                return
+            path, _ = QFileDialog.getSaveFileName(self, "Export Frame Times", "", FRAME_STATS_FILTER)
+            if not path:
+                return
+            panes = [(f"{i + 1}: {combo.currentText()}", stats)
+                     for i, (combo, stats) in enumerate(zip(self.algo_combos, self.frame_stats))]
+            written = export_frame_stats(path, panes)
+            QMessageBox.information(self, "Export Complete", f"Wrote {written} frame time samples")
+        except Exception as e:
+            self.show_error("Export Error", str(e))
+    
+    def check_result(self, idx: int, array, initial) -> None:
+        """Report a finished run whose output is not the sorted input"""
+        verification = verify_sorted(array, initial)
+        if not verification.ok:
+            self.show_error(
+                "Invalid Result",
+                f"{self.pane_algorithms[idx].name} did not sort its input: {verification.format()}"
+            )
+    
+    @tracing.traced()
+    def collect_events(self, idx: int, deadline: Optional[float] = None) -> None:
+        """Append the event batches the pane's worker has produced to its trace"""
+        worker, trace = self.workers[idx], self.traces[idx]
+        while worker is not None:
+            message = worker.poll()
+            if message is None:
+                return
+            kind, payload = message
+            if kind == DONE:
+                trace.finish()
+                instrumented = bool(trace.counts)
+                self.trace_cache.put((self.pane_algorithms[idx].function, instrumented), trace)
+                self.workers[idx] = None
+                return
+            if kind == ERROR:
+                raise RuntimeError(f"Algorithm failed: {payload}")
+            if kind == COUNTS:
+                for position, counts in payload:
+                    trace.mark_counts(position, counts)
+                continue
+            if kind == SPANS:
+                tracing.add(payload)
+                continue
+            trace.extend(payload)
+            if deadline is not None and time.perf_counter() > deadline:
+                return
+    
+    def render_pane(self, idx: int) -> None:
+        """Draw the pane's trace at its current cursor position"""
+        trace, cursor, algorithm = self.traces[idx], self.cursors[idx], self.pane_algorithms[idx]
+        self.visualizations[idx].plot_array(
+            cursor.state.array, 
+            cursor.state.steps,
+            algorithm.name,
+            algorithm.complexity,
+            changed=cursor.take_changed(),
+            counts=trace.counts_at(cursor.position),
+            owners=cursor.state.owners
+        )
+        self.update_scrubber(idx)
+    
+    def update_scrubber(self, idx: int) -> None:
+        """Sync the pane's scrub slider and position label with its cursor"""
+        trace, cursor = self.traces[idx], self.cursors[idx]
+        slider = self.scrub_sliders[idx]
+        if trace is None:
+            self.position_labels[idx].setText("")
+            value = 0
+        else:
+            status = "" if trace.complete else " (recording)"
+            self.position_labels[idx].setText(f"Event {cursor.position} / {len(trace)}{status}")
+            value = cursor.position * SCRUB_RESOLUTION // max(len(trace), 1)
+        if not slider.isSliderDown():
+            slider.blockSignals(True)
+            slider.setValue(value)
+            slider.blockSignals(False)
+    
+    def toggle_pause(self, idx: int) -> None:
+        """Pause or resume playback for the specified index"""
+        if not self.is_sorting[idx]:
+            return
+        self.is_playing[idx] = not self.is_playing[idx]
+        self.pause_btns[idx].setText("Pause" if self.is_playing[idx] else "Resume")
+        if self.is_playing[idx]:
+            # Don't credit the time spent paused
+            self.frame_scheduler.start(idx)
+    
+    def pause(self, idx: int) -> None:
+        """Pause playback for the specified index if it is playing"""
+        if self.is_playing[idx]:
+            self.toggle_pause(idx)
+    
+    def step_trace(self, idx: int, direction: int) -> None:
+        """Move the pane one change forward or backward in its trace"""
+        try:
+            cursor = self.cursors[idx]
+            if cursor is None:
+                return
+            self.pause(idx)
+            if direction < 0:
+                cursor.step_backward()
+            else:
+                cursor.step_forward()
+            self.render_pane(idx)
+        except Exception as e:
+            self.show_error("Playback Error", str(e))
+    
+    def scrub_trace(self, idx: int, value: int) -> None:
+        """Queue a seek of the pane's trace to the slider position"""
+        self.pending_scrubs[idx] = value
+        if not self.scrub_timer.isActive():
+            self.scrub_timer.start(0)
+    
+    def apply_scrubs(self) -> None:
+        """Seek each scrubbed pane to the latest slider position it was given"""
+        pending, self.pending_scrubs = self.pending_scrubs, {}
+        try:
+            for idx, value in pending.items():
+                if idx >= len(self.cursors) or self.cursors[idx] is None:
+                    continue
+                trace, cursor = self.traces[idx], self.cursors[idx]
+                self.pause(idx)
+                cursor.seek(value * len(trace) // SCRUB_RESOLUTION)
+                self.render_pane(idx)
+        except Exception as e:
+            self.show_error("Playback Error", str(e))
+    
+    def save_trace(self, idx: int) -> None:
+        """Write the pane's recorded trace to a file"""
+        try:
+            trace, algorithm = self.traces[idx], self.pane_algorithms[idx]
+            if trace is None:
+                self.show_error("Save Error", "Run an algorithm before saving its trace")
+                return
+            self.pause(idx)
+            path, _ = QFileDialog.getSaveFileName(self, "Save Trace", "", TRACE_FILE_FILTER)
+            if not path:
+                return
+            write_trace_file(trace, path, {'name': algorithm.name, 'complexity': algorithm.complexity})
+        except Exception as e:
+            self.show_error("Save Error", str(e))
+    
+    def load_trace(self, idx: int) -> None:
+        """Open a trace file in the pane for playback"""
+        try:
+            if self.is_sorting[idx]:
+                self.stop_sorting(idx)
+            path, _ = QFileDialog.getOpenFileName(self, "Load Trace", "", TRACE_FILE_FILTER)
+            if not path:
+                return
+            trace = MappedTrace(path)
+            self.clear_trace(idx)
+            
+            metadata = trace.metadata
+            self.select_visualization_backend(len(trace.initial))
+            self.traces[idx] = trace
+            self.cursors[idx] = TraceCursor(trace)
+            self.pane_algorithms[idx] = SortingAlgorithm(
+                metadata.get('name', "Loaded Trace"), None, metadata.get('complexity', "")
+            )
+            self.render_pane(idx)
+        except Exception as e:
+            self.show_error("Load Error", str(e))
+    
+    def clear_trace(self, idx: int) -> None:
+        """Drop the pane's trace, e.g. when its algorithm or input changes"""
+        if self.is_sorting[idx]:
+            return
+        self.release_trace(idx)
+        self.pane_algorithms[idx] = None
+        self.update_scrubber(idx)
+    
+    def release_trace(self, idx: int) -> None:
+        """Detach the pane's trace, closing it if it was loaded from a file"""
+        if isinstance(self.traces[idx], MappedTrace):
+            self.traces[idx].close()
+        self.traces[idx] = None
+        self.cursors[idx] = None
+    
     def stop_sorting(self, idx: int) -> None:
         """Stop the sorting visualization for the specified index"""
         try:
             self.is_sorting[idx] = False
-            self.timers[idx].stop()
-            self.sorting_generators[idx] = None
+            self.is_playing[idx] = False
+            self.frame_scheduler.stop(idx)
+            if not any(self.is_sorting):
+                self.frame_timer.stop()
+            
+            # An unfinished recording is kept for scrubbing but never cached
+            if self.workers[idx] is not None:
+                self.workers[idx].cancel()
+                self.workers[idx] = None
+            
+            if self.shared_arrays[idx] is not None:
+                self.shared_arrays[idx].cancel()
+                self.shared_arrays[idx].close()
+                self.shared_arrays[idx] = None
+                self.live_arrays[idx] = None
             
             self.start_btns[idx].setEnabled(True)
             self.stop_btns[idx].setEnabled(False)
+            self.pause_btns[idx].setEnabled(False)
+            self.pause_btns[idx].setText("Pause")
             self.algo_combos[idx].setEnabled(True)
-            self.size_spins[idx].setEnabled(True)
             
-            # Only enable generate button if both visualizations are stopped
+            # Only enable the shared controls once every visualization is stopped
             if not any(self.is_sorting):
                 self.generate_btn.setEnabled(True)
+                self.size_spin.setEnabled(True)
+                self.distribution_combo.setEnabled(True)
+                self.seed_spin.setEnabled(True)
             
         except Exception as e:
             self.show_error("Stop Error", str(e))
@@ -233,53 +852,115 @@ class MainWindow(QMainWindow):
                 
             code = self.custom_widget.get_code()
             
-            # Analyze the complexity before executing the code
-            complexity = analyze_sorting_algorithm(code)
-            if complexity == "Invalid code":
+            try:
+                function_name = find_algorithm_name(code)
+            except SyntaxError:
                 self.show_error("Analysis Error", "The provided code is invalid")
                 return
-            elif complexity.startswith("Analysis error"):
-                complexity = "Unknown complexity"
             
-            # Execute the code
-            local_namespace = {}
-            exec(code, local_namespace)
-            
-            # Find the first function defined in the code
-            func = None
-            for _, obj in local_namespace.items():
-                if inspect.isfunction(obj):
-                    func = obj
-                    break
-            
-            if func is None:
+            if function_name is None:
                 self.show_error("Input Error", "No function found in the code")
                 return
+            
+            # The code is only ever executed in the sandbox, starting with
+            # measuring its complexity on growing inputs, unless this source
+            # was already analyzed in an earlier session or while editing
+            cached = self.algorithm_store.lookup(code)
+            benchmark = None
+            analysis = None
+            if cached is not None and 'complexity' in cached:
+                complexity = cached['complexity']
+            else:
+                analysis = self.custom_widget.cached_analysis(code)
+                if analysis is None:
+                    complexity = None
+                else:
+                    complexity = analysis[0].format()
+                    benchmark = benchmark_metadata(*analysis)
+            
+            # Keep it for later sessions; an unwritable store only costs persistence
+            try:
+                func = self.algorithm_store.save(custom_name, code, complexity, benchmark)
+            except OSError as e:
+                logger.warning("Could not save custom algorithm %r: %s", custom_name, e)
+                func = CustomAlgorithm(code)
                 
-            # Add the algorithm to registry with analyzed complexity
+            # Add the algorithm to registry with analyzed complexity, or
+            # measure it in the background and fill it in once known
             algorithm_name = f"Custom: {custom_name}"
-            self.algorithm_registry.register(
-                algorithm_name,
-                func,
-                complexity  # Use the analyzed complexity instead of "Custom Implementation"
-            )
+            self.algorithm_registry.register(algorithm_name, func,
+                                             complexity or PENDING_COMPLEXITY)
+            if complexity is None:
+                self.analyze_in_background(code, algorithm_name, func)
             
-            # Update combo boxes
+            # Update combo boxes and the pane selection menu
             for combo in self.algo_combos:
-                combo.addItem(algorithm_name)
+                if combo.findText(algorithm_name) < 0:
+                    combo.addItem(algorithm_name)
+            if algorithm_name not in [action.text() for action in self.algorithms_menu.actions()]:
+                self.add_algorithm_action(algorithm_name)
             
             # Clear the name field
             self.custom_widget.clear_name()
             
             # Show success message with complexity information
+            if complexity is None:
+                details = "Its time complexity is being measured in the background."
+            else:
+                details = f"Estimated Time Complexity: {complexity}"
             QMessageBox.information(
                 self, 
                 "Success", 
-                f"Algorithm '{custom_name}' has been added!\nEstimated Time Complexity: {complexity}"
+                f"Algorithm '{custom_name}' has been added!\n{details}"
             )
             
         except Exception as e:
             self.show_error("Custom Algorithm Error", str(e))
+    
+    def analyze_in_background(self, code: str, algorithm_name: str, func) -> None:
+        """Measure an added algorithm's complexity in the sandbox, reusing the editor's analysis"""
+        pending = self.pending_analyses.get(code)
+        if pending is not None:
+            pending.algorithms.append((algorithm_name, func))
+            return
+        taken = self.custom_widget.take_analysis(code)
+        if taken is None:
+            job = self.sandbox.submit_call(analyze_code, code, timeout=ANALYSIS_TIMEOUT)
+            job.start()
+            taken = (job, time.perf_counter())
+        self.pending_analyses[code] = PendingAnalysis(*taken, [(algorithm_name, func)])
+        self.analysis_timer.start()
+    
+    def poll_analyses(self) -> None:
+        """Fill in the complexity of custom algorithms whose analysis finished"""
+        for code, pending in list(self.pending_analyses.items()):
+            message = pending.job.poll()
+            if message is None:
+                continue
+            del self.pending_analyses[code]
+            seconds = time.perf_counter() - pending.started
+            self.custom_widget.analysis_done(code, message, seconds)
+            
+            kind, payload = message
+            if kind == RESULT:
+                complexity = payload.format()
+                try:
+                    self.algorithm_store.record_analysis(code, complexity,
+                                                         benchmark_metadata(payload, seconds))
+                except OSError as e:
+                    logger.warning("Could not save complexity analysis: %s", e)
+            else:
+                complexity = "Unknown complexity"
+                logger.warning("Complexity analysis of %s failed: %s",
+                               ", ".join(name for name, _ in pending.algorithms), payload)
+            
+            # Unless the name was given to other code in the meantime
+            for algorithm_name, func in pending.algorithms:
+                if algorithm_name in self.algorithm_registry and \
+                        self.algorithm_registry[algorithm_name].function is func:
+                    self.algorithm_registry.register(algorithm_name, func, complexity)
+        if not self.pending_analyses:
+            self.analysis_timer.stop()
             
     def show_error(self, title: str, message: str) -> None:
         """Show an error message dialog"""
@@ -289,8 +970,15 @@ class MainWindow(QMainWindow):
         """Handle the window close event"""
         try:
             # Stop all sorting operations
-            for i in range(2):
+            for i in range(len(self.pane_widgets)):
                 self.stop_sorting(i)
+                self.release_trace(i)
+            self.custom_widget.cancel_analysis()
+            self.analysis_timer.stop()
+            for pending in self.pending_analyses.values():
+                pending.job.cancel()
+            self.pending_analyses.clear()
+            self.sandbox.shutdown()
             
             # Clean up matplotlib resources
             for visualization in self.visualizations:
@@ -0,0 +1,58 @@
+"""
+Figure drawing shared by the on-screen visualization and the offscreen
+frame exporter. Only matplotlib's figure API is used here, never Qt, so
+exporter worker processes can draw frames without a display.
+"""
+
+from typing import Optional, Sequence
+
+BAR_COLOR = 'skyblue'
+# Bar colours of elements last moved by each worker of a parallel algorithm
+WORKER_COLORS = ['#e6194b', '#3cb44b', '#4363d8', '#f58231',
+                 '#911eb4', '#42d4f4', '#f032e6', '#9a6324']
+
+
+def bar_color(owner: int) -> str:
+    return BAR_COLOR if owner < 0 else WORKER_COLORS[owner % len(WORKER_COLORS)]
+
+
+def bar_colors(owners: Optional[Sequence[int]]):
+    if owners is None:
+        return BAR_COLOR
+    return [bar_color(owner) for owner in owners]
+
+
+def frame_title(algorithm_name: str, steps: int, counts=None) -> str:
+    title = f"{algorithm_name}\nSteps: {steps}"
+    if counts is not None:
+        title += f" | {counts.format()}"
+    return title
+
+
+def draw_array(ax, arr: Sequence[int], title: str, complexity: str,
+               owners: Optional[Sequence[int]] = None, animated: bool = False):
+    """
+    Draw one array state as bars with its title and labels on cleared axes.
+
+    Args:
+        ax: Axes to draw on
+        arr: Array state
+        title: Title above the bars, see frame_title
+        complexity: Time complexity label
+        owners: Worker id that last moved each element, to colour the bars by
+        animated: Leave the bars and title out of normal draws so they can be
+            blitted over a cached background
+
+    Returns:
+        Tuple: The bar container and the title artist
+    """
+    ax.clear()
+    # Aliased bars make redrawing a neighbour idempotent when slots share pixels
+    bars = ax.bar(range(len(arr)), arr, color=bar_colors(owners),
+                  animated=animated, antialiased=not animated)
+    title_artist = ax.set_title(title, animated=animated)
+    ax.set_xlabel("Index")
+    ax.set_ylabel("Value")
+    ax.text(0.02, 0.98, f"Time Complexity: {complexity}",
+            transform=ax.transAxes, verticalalignment='top')
+    return bars, title_artist
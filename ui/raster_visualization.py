@@ -0,0 +1,178 @@
+import numpy as np
+from PyQt6.QtCore import Qt, QRect
+from PyQt6.QtGui import QImage, QPainter
+from PyQt6.QtWidgets import QWidget
+
+from ..algorithms import tracing
+from .plotting import frame_title
+
+class RasterVisualization(QWidget):
+    """
+    Widget for visualizing very large arrays without matplotlib.
+
+    The array is drawn straight into a QImage backed by a NumPy buffer with
+    one pixel column per group of elements. Each column shows the minimum of
+    its group as a solid bar and the range up to the maximum as a lighter
+    band, so the shape of the data stays visible at any size.
+    """
+
+    # Colours as 0xAARRGGBB
+    BACKGROUND = 0xFFFFFFFF
+    BAR = 0xFF87CEEB
+    RANGE = 0xFFC8E9F6
+    # Bars of columns whose first element was last moved by each worker
+    WORKER_BARS = np.array([0xFFE6194B, 0xFF3CB44B, 0xFF4363D8, 0xFFF58231,
+                            0xFF911EB4, 0xFF42D4F4, 0xFFF032E6, 0xFF9A6324], dtype=np.uint32)
+    HEADER_HEIGHT = 40
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumSize(200, 150)
+
+        self._values = np.zeros(0, dtype=np.int64)
+        self._owners = None
+        self._top = 1
+        self._title = ""
+        self._complexity = ""
+
+        # Pixel buffer backing the image and the element range of each column
+        self._pixels = None
+        self._image = None
+        self._starts = np.zeros(0, dtype=np.intp)
+        self._ends = np.zeros(0, dtype=np.intp)
+
+    @tracing.traced()
+    def plot_array(self, arr, steps, algorithm_name, complexity, changed=None, counts=None,
+                   owners=None):
+        """
+        Update the visualization with new array state.
+
+        Args:
+            arr: Current array state
+            steps: Step count shown in the title
+            algorithm_name: Name of the algorithm being visualized
+            complexity: Time complexity label
+            changed: Indices changed since the last frame, or None to
+                reload the whole array
+            counts: Access totals of an instrumented run, shown next to the steps
+            owners: Worker id that last moved each element, to colour the bars by
+        """
+        try:
+            self._title = frame_title(algorithm_name, steps, counts)
+            self._complexity = f"Time Complexity: {complexity}"
+
+            if changed is None or len(arr) != len(self._values) or \
+                    (owners is None) != (self._owners is None):
+                self._values = np.array(arr, dtype=np.int64)
+                self._owners = None if owners is None else np.array(owners, dtype=np.int64)
+                self._top = max(int(self._values.max(initial=0)), 1)
+                self._layout_columns()
+                self._render_columns()
+            elif changed:
+                indices = np.fromiter(changed, dtype=np.intp, count=len(changed))
+                self._values[indices] = [arr[i] for i in indices]
+                if owners is not None:
+                    self._owners[indices] = [owners[i] for i in indices]
+                if self._values[indices].max() > self._top:
+                    self._top = int(self._values[indices].max())
+                    self._render_columns()
+                else:
+                    self._render_columns(self._columns_for(indices))
+
+            self.update()
+        except Exception as e:
+            raise Exception(f"Plot Error: {str(e)}")
+
+    def _layout_columns(self):
+        """Map every pixel column to the range of elements it aggregates"""
+        width = self._pixels.shape[1] if self._pixels is not None else 0
+        n = len(self._values)
+        if width == 0 or n == 0:
+            self._starts = self._ends = np.zeros(0, dtype=np.intp)
+            return
+        self._starts = (np.arange(width, dtype=np.intp) * n) // width
+        # Columns outnumbering the elements show one element each
+        self._ends = np.maximum(np.append(self._starts[1:], n), self._starts + 1)
+
+    def _columns_for(self, indices):
+        """Pixel columns whose element range contains any of the given indices, in order"""
+        left = np.searchsorted(self._starts, indices, side='left')
+        right = np.searchsorted(self._starts, indices, side='right')
+        first = np.minimum(left, right - 1)
+        columns = set()
+        for lo, hi in zip(first.tolist(), right.tolist()):
+            columns.update(range(lo, hi))
+        # _render_columns relies on the final column coming last
+        return np.sort(np.fromiter(columns, dtype=np.intp, count=len(columns)))
+
+    def _render_columns(self, columns=None):
+        """Aggregate and rasterize the given pixel columns in ascending order, or all of them"""
+        if self._pixels is None:
+            return
+        if len(self._starts) == 0:
+            self._pixels.fill(self.BACKGROUND)
+            return
+        if columns is None:
+            columns = np.arange(len(self._starts), dtype=np.intp)
+        if len(columns) == 0:
+            return
+
+        # Min/max of each column's range via a single reduceat over (start, end) pairs
+        # reduceat cannot take an index of len(values): single-element ranges
+        # at the end are clamped (start >= end yields that element) and a
+        # longer final range runs to the end of the array by dropping its end
+        n = len(self._values)
+        starts, ends = self._starts[columns], self._ends[columns]
+        bounds = np.empty(2 * len(columns), dtype=np.intp)
+        bounds[0::2] = starts
+        bounds[1::2] = np.minimum(ends, n - 1)
+        if ends[-1] == n and starts[-1] < n - 1:
+            bounds = bounds[:-1]
+        lows = np.minimum.reduceat(self._values, bounds)[0::2]
+        highs = np.maximum.reduceat(self._values, bounds)[0::2]
+
+        # Scale to pixel heights and fill each column bottom-up
+        plot_height = self._pixels.shape[0]
+        scale = plot_height / self._top
+        low_px = np.clip(lows * scale, 0, plot_height).astype(np.intp)
+        high_px = np.clip(highs * scale, 0, plot_height).astype(np.intp)
+        rows = np.arange(plot_height - 1, -1, -1, dtype=np.intp)[:, None]
+        bar = self.BAR
+        if self._owners is not None:
+            owners = self._owners[starts]
+            bar = np.where(owners < 0, self.BAR,
+                           self.WORKER_BARS[owners % len(self.WORKER_BARS)]).astype(np.uint32)
+        self._pixels[:, columns] = np.where(
+            rows < low_px, bar,
+            np.where(rows < high_px, self.RANGE, self.BACKGROUND)
+        ).astype(np.uint32)
+
+    def resizeEvent(self, event):
+        """Reallocate the pixel buffer to match the widget size"""
+        width = max(self.width(), 1)
+        height = max(self.height() - self.HEADER_HEIGHT, 1)
+        self._pixels = np.full((height, width), self.BACKGROUND, dtype=np.uint32)
+        self._image = QImage(self._pixels.data, width, height, width * 4,
+                             QImage.Format.Format_RGB32)
+        self._layout_columns()
+        self._render_columns()
+        super().resizeEvent(event)
+
+    @tracing.traced()
+    def paintEvent(self, event):
+        """Blit the pixel buffer and draw the labels on top"""
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), Qt.GlobalColor.white)
+        if self._image is not None:
+            painter.drawImage(0, self.HEADER_HEIGHT, self._image)
+        painter.setPen(Qt.GlobalColor.black)
+        painter.drawText(QRect(0, 0, self.width(), self.HEADER_HEIGHT),
+                         Qt.AlignmentFlag.AlignCenter, self._title)
+        painter.drawText(QRect(6, self.HEADER_HEIGHT + 4, self.width() - 12, 20),
+                         Qt.AlignmentFlag.AlignLeft, self._complexity)
+        painter.end()
+
+    def cleanup(self):
+        """Release the pixel buffer"""
+        self._image = None
+        self._pixels = None
@@ -1,35 +1,180 @@
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from bisect import bisect_left, bisect_right
+
+# The figure is built directly rather than through pyplot, which would load
+# its global figure manager and backend machinery at startup for nothing
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.figure import Figure
 from PyQt6.QtWidgets import QWidget, QVBoxLayout
 
+from ..algorithms import tracing
+from .plotting import bar_color, draw_array, frame_title
+
 class SortingVisualization(QWidget):
     """Widget for visualizing sorting algorithms"""
-    def __init__(self, parent=None):
+
+    def __init__(self, parent=None, blit: bool = True):
         super().__init__(parent)
+        self.blit = blit
+
+        # Persistent artists for the blitted rendering path
+        self._bars = None
+        self._title = None
+        self._heights = []
+        self._labels = None
+        self._background = None
+        self._slot_edges = []
+        self._coloured = False
+
         self.setup_ui()
 
     def setup_ui(self):
         layout = QVBoxLayout(self)
-        
+
         # Create figure and canvas
-        self.figure, self.ax = plt.subplots(figsize=(8, 6))
+        self.figure = Figure(figsize=(8, 6))
+        self.ax = self.figure.add_subplot()
         self.canvas = FigureCanvas(self.figure)
+        self.canvas.mpl_connect('draw_event', self._on_draw)
         layout.addWidget(self.canvas)
 
-    def plot_array(self, arr, steps, algorithm_name, complexity):
-        """Update the visualization with new array state"""
+    @tracing.traced()
+    def plot_array(self, arr, steps, algorithm_name, complexity, changed=None, counts=None,
+                   owners=None):
+        """
+        Update the visualization with new array state.
+
+        Args:
+            arr: Current array state
+            steps: Step count shown in the title
+            algorithm_name: Name of the algorithm being visualized
+            complexity: Time complexity label
+            changed: Indices changed since the last frame, or None to diff
+                against the previously drawn heights
+            counts: Access totals of an instrumented run, shown next to the steps
+            owners: Worker id that last moved each element, to colour the bars by
+        """
         try:
-            self.ax.clear()
-            self.ax.bar(range(len(arr)), arr, color='skyblue')
-            self.ax.set_title(f"{algorithm_name}\nSteps: {steps}")
-            self.ax.set_xlabel("Index")
-            self.ax.set_ylabel("Value")
-            self.ax.text(0.02, 0.98, f"Time Complexity: {complexity}", 
-                        transform=self.ax.transAxes, verticalalignment='top')
-            self.canvas.draw()
+            title = frame_title(algorithm_name, steps, counts)
+
+            if not (self.blit and self.canvas.supports_blit):
+                self._plot_full(arr, title, complexity, owners)
+                return
+
+            diffed = changed is None
+            if diffed:
+                changed = [i for i, (old, new) in enumerate(zip(self._heights, arr))
+                           if old != new]
+
+            if self._needs_layout(arr, algorithm_name, complexity, changed, diffed, owners):
+                self._setup_artists(arr, title, algorithm_name, complexity, owners)
+            else:
+                self._update_artists(arr, title, changed, owners)
         except Exception as e:
             raise Exception(f"Plot Error: {str(e)}")
 
+    def _plot_full(self, arr, title, complexity, owners):
+        """Redraw the whole figure from scratch"""
+        self._bars = None
+        draw_array(self.ax, arr, title, complexity, owners)
+        self._draw()
+
+    def _draw(self):
+        """Draw the figure now, or when first shown if the widget is still hidden"""
+        # A hidden canvas is drawn anyway once it is shown and resized, so
+        # drawing it before the window appears would only delay the window
+        if self.isVisible():
+            self.canvas.draw()
+        else:
+            self.canvas.draw_idle()
+
+    def _needs_layout(self, arr, algorithm_name, complexity, changed, diffed, owners):
+        """Check whether the persistent artists can be reused for this frame"""
+        if self._bars is None or self._background is None:
+            return True
+        # Switching between plain and worker colours repaints every bar
+        if (owners is not None) != self._coloured:
+            return True
+        if self._labels != (algorithm_name, complexity) or len(arr) != len(self._bars):
+            return True
+        # A mostly different array passed without change information is
+        # treated as new data (e.g. freshly generated) and gets new axis limits
+        if diffed and len(changed) * 2 > len(arr):
+            return True
+        top = self.ax.get_ylim()[1]
+        return any(arr[i] > top for i in changed)
+
+    def _setup_artists(self, arr, title, algorithm_name, complexity, owners):
+        """Create the bar and title artists once and draw the static background"""
+        self._bars, self._title = draw_array(self.ax, arr, title, complexity, owners,
+                                             animated=True)
+        self._coloured = owners is not None
+        self._heights = list(arr)
+        self._labels = (algorithm_name, complexity)
+        # The draw event caches the background and paints the animated artists
+        self._draw()
+
+    def _on_draw(self, event):
+        """Cache the background after a full draw and repaint the animated artists"""
+        if self._bars is None:
+            self._background = None
+            return
+        self._background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+        # Pixel columns owned by each bar, used to restore single slots
+        n = len(self._bars)
+        edges = self.ax.transData.transform([(i - 0.5, 0) for i in range(n + 1)])
+        self._slot_edges = [x for x, _ in edges]
+
+        for bar in self._bars:
+            self.ax.draw_artist(bar)
+        self.ax.draw_artist(self._title)
+
+    def _update_artists(self, arr, title, changed, owners):
+        """Redraw only the bars that changed and the title, then blit"""
+        canvas = self.canvas
+        background = self._background
+        origin = background.get_extents()[:2]
+        height = self.figure.bbox.height
+        ax_box = self.ax.bbox
+        top, bottom = height - ax_box.y1, height - ax_box.y0
+        edges = self._slot_edges
+
+        for i in changed:
+            self._bars[i].set_height(arr[i])
+            self._heights[i] = arr[i]
+            if owners is not None:
+                self._bars[i].set_facecolor(bar_color(owners[i]))
+
+        if len(changed) * 4 > len(self._bars):
+            # Many changes (e.g. several steps coalesced into one frame) are
+            # cheaper to draw over a fully restored background
+            canvas.restore_region(background)
+            redraw = range(len(self._bars))
+        else:
+            # Restore the background behind each changed slot
+            redraw = set()
+            for i in changed:
+                x0, x1 = int(edges[i]), int(edges[i + 1]) + 1
+                canvas.restore_region(background, bbox=(x0, top, x1, bottom), xy=origin)
+                # Narrow slots share pixel columns and aliased bars can spill one pixel over
+                first = max(bisect_right(edges, x0 - 1) - 1, 0)
+                last = min(bisect_left(edges, x1 + 1), len(self._bars))
+                redraw.update(range(first, last))
+            redraw = sorted(redraw)
+
+            # Title band above the axes
+            canvas.restore_region(background, bbox=(0, 0, self.figure.bbox.width, top), xy=origin)
+
+        for i in redraw:
+            self.ax.draw_artist(self._bars[i])
+        self._title.set_text(title)
+        self.ax.draw_artist(self._title)
+
+        canvas.blit(self.figure.bbox)
+
     def cleanup(self):
         """Clean up matplotlib resources"""
-        plt.close(self.figure)
\ No newline at end of file
+        # Without pyplot nothing else holds the figure; dropping its artists is enough
+        self._bars = None
+        self._background = None
+        self.figure.clear()